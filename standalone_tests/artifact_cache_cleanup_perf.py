@@ -0,0 +1,70 @@
+"""Measure artifacts cache cleanup with the object index.
+
+Fills a cache with N small files, then times the first cleanup (which lists the
+cache to build the index) and later cleanups that each evict a few files.
+
+    python standalone_tests/artifact_cache_cleanup_perf.py --files 100000 --evict 100
+"""
+
+import argparse
+import base64
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+
+from wandb.sdk.interface import artifacts
+
+
+def fill_cache(cache, nfiles, size):
+    for i in range(nfiles):
+        md5 = base64.b64encode(hashlib.md5(str(i).encode()).digest())
+        _, _, opener = cache.check_md5_obj_path(md5, size)
+        with opener() as f:
+            f.write("x" * size)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=100000)
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--evict", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        cache = artifacts.ArtifactsCache(os.path.join(tmp_dir, "cache"))
+        start = time.time()
+        fill_cache(cache, args.files, args.size)
+        print(
+            "wrote {} files: {:.1f} us per file".format(
+                args.files, (time.time() - start) / args.files * 1e6
+            )
+        )
+
+        target = args.files * args.size
+        start = time.time()
+        cache.cleanup(target)
+        print("first cleanup (lists the cache): {:.3f}s".format(time.time() - start))
+
+        for _ in range(args.rounds):
+            target -= args.evict * args.size
+            start = time.time()
+            reclaimed = cache.cleanup(target)
+            print(
+                "cleanup evicting {} files: {:.3f}s".format(
+                    reclaimed // args.size, time.time() - start
+                )
+            )
+
+        start = time.time()
+        cache.cleanup(target - args.evict * args.size, rescan=True)
+        print("cleanup with rescan: {:.3f}s".format(time.time() - start))
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Measure re-adding an unchanged directory to an artifact.
+
+Creates a tree of files, then times Artifact.add_dir and add_reference on it twice.
+The first pass hashes every file and records the digests in the index under the
+artifacts cache, the second only stats the files.
+
+    python standalone_tests/artifact_digest_index_perf.py --files 2000 --size-kb 1024
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+
+def make_tree(root, nfiles, size):
+    old = time.time() - 3600
+    block = os.urandom(size)
+    for i in range(nfiles):
+        subdir = os.path.join(root, "part{}".format(i % 16))
+        if not os.path.isdir(subdir):
+            os.makedirs(subdir)
+        path = os.path.join(subdir, "file{}.bin".format(i))
+        with open(path, "wb") as f:
+            f.write(block[i % 256 :] + block[: i % 256])
+        os.utime(path, (old, old))
+
+
+def timed(fn):
+    start = time.time()
+    fn()
+    return time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--size-kb", type=int, default=1024)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp()
+    os.environ["WANDB_CACHE_DIR"] = os.path.join(tmp_dir, "cache")
+    # imported after setting the cache dir
+    import wandb
+
+    total_mb = args.files * args.size_kb / 1024.0
+    print("{} files, {:.0f} MB".format(args.files, total_mb))
+
+    try:
+        for label, add in (
+            ("add_dir", lambda a, data_dir: a.add_dir(data_dir)),
+            (
+                "add_reference",
+                lambda a, data_dir: a.add_reference("file://" + data_dir),
+            ),
+        ):
+            # a separate tree per case, so each starts without recorded digests
+            data_dir = os.path.join(tmp_dir, label)
+            make_tree(data_dir, args.files, args.size_kb * 1024)
+            for attempt in ("first", "second"):
+                artifact = wandb.Artifact("perf", type="dataset")
+                elapsed = timed(lambda: add(artifact, data_dir))
+                print("{:>14} {:>6}: {:.2f}s".format(label, attempt, elapsed))
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Measure artifact file hashing throughput.
+
+Hashes a tree of many small files and a few large ones with the previous approach
+(md5_file_b64 on an 8 thread pool, as add_dir did) and with FileHasher at a few
+worker counts.
+
+    python standalone_tests/artifact_hash_perf.py --small 20000 --large 8
+"""
+
+import argparse
+import multiprocessing.dummy
+import os
+import shutil
+import tempfile
+import time
+
+from wandb.sdk.interface.artifacts import FileHasher, HashStats, md5_file_b64
+
+
+def make_files(root, count, size, prefix):
+    paths = []
+    block = os.urandom(size)
+    for i in range(count):
+        path = os.path.join(root, "{}{}.bin".format(prefix, i))
+        with open(path, "wb") as f:
+            f.write(block)
+        paths.append(path)
+    return paths
+
+
+def thread_pool_md5(paths):
+    pool = multiprocessing.dummy.Pool(8)
+    try:
+        return pool.map(md5_file_b64, paths)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--small", type=int, default=20000)
+    parser.add_argument("--small-kb", type=int, default=16)
+    parser.add_argument("--large", type=int, default=8)
+    parser.add_argument("--large-mb", type=int, default=128)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp()
+    try:
+        small = make_files(root, args.small, args.small_kb * 1024, "small")
+        large = make_files(root, args.large, args.large_mb * 1024 * 1024, "large")
+        for label, paths in (("small files", small), ("large files", large)):
+            total = sum(os.path.getsize(path) for path in paths)
+            start = time.time()
+            expected = thread_pool_md5(paths)
+            stats = HashStats(len(paths), total, time.time() - start)
+            print("{}, 8 threads: {}".format(label, stats))
+            for workers in sorted({1, 4, multiprocessing.cpu_count() + 4}):
+                hasher = FileHasher(max_workers=workers)
+                assert hasher.md5_files_b64(paths) == expected
+                print(
+                    "{}, FileHasher({}): {}".format(label, workers, hasher.last_stats)
+                )
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
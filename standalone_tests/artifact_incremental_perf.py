@@ -0,0 +1,64 @@
+"""Measure diffing an incremental artifact against its base version.
+
+Builds a base manifest with N entries and a new version that changes and adds a
+few of them, then times removing the unchanged entries and compares the number
+of files to upload and the size of the manifest sent with and without the diff.
+
+    python standalone_tests/artifact_incremental_perf.py --entries 1000000 --changed 100
+"""
+
+import argparse
+import json
+import time
+
+from wandb.sdk.internal import artifacts
+
+
+def make_contents(nentries, start=0, salt=""):
+    return {
+        "dir{}/file{}.bin".format(i % 100, i): {
+            "digest": "{:032x}{}".format(i, salt),
+            "size": i,
+        }
+        for i in range(start, start + nentries)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=1000000)
+    parser.add_argument("--changed", type=int, default=100)
+    parser.add_argument("--added", type=int, default=100)
+    args = parser.parse_args()
+
+    base_contents = make_contents(args.entries)
+    contents = dict(base_contents)
+    contents.update(make_contents(args.changed, salt="-changed"))
+    contents.update(make_contents(args.added, start=args.entries))
+    manifest_json = {
+        "version": 1,
+        "storagePolicy": "wandb-storage-policy-v1",
+        "storagePolicyConfig": {},
+        "contents": contents,
+    }
+
+    saver = artifacts.ArtifactSaver(None, "", manifest_json, None)
+    full_bytes = len(json.dumps(saver._manifest.to_manifest_json()))
+    start = time.time()
+    saver._remove_unchanged_entries(base_contents)
+    diff_time = time.time() - start
+    delta_bytes = len(json.dumps(saver._manifest.to_manifest_json()))
+    print(
+        " full: {} files to upload, {:.1f} MB manifest".format(
+            len(contents), full_bytes / 1024.0 / 1024
+        )
+    )
+    print(
+        "delta: {} files to upload, {:.3f} MB manifest, diffed in {:.2f}s".format(
+            len(saver._manifest.entries), delta_bytes / 1024.0 / 1024, diff_time
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
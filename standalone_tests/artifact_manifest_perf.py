@@ -0,0 +1,91 @@
+"""Measure loading and querying a large artifact manifest.
+
+Builds manifest json with N entries spread over directories, then times and
+measures the memory of ArtifactManifestV1.from_manifest_json, looking up
+single paths and directories, digest() and to_manifest_json(). The eager mode
+turns every entry into an ArtifactManifestEntry up front, which is what loading
+a manifest did before entries were loaded lazily.
+
+    python standalone_tests/artifact_manifest_perf.py --entries 1000000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from wandb.sdk import wandb_artifacts
+
+
+def make_manifest_json(nentries, ndirs):
+    contents = {}
+    for i in range(nentries):
+        path = "dir{}/file{}.bin".format(i % ndirs, i)
+        contents[path] = {"digest": "{:032x}".format(i), "size": i}
+    return {
+        "version": 1,
+        "storagePolicy": "wandb-storage-policy-v1",
+        "storagePolicyConfig": {},
+        "contents": contents,
+    }
+
+
+def timed(fn):
+    start = time.time()
+    result = fn()
+    return result, time.time() - start
+
+
+def run(manifest_json, eager, ndirs, lookups):
+    def load():
+        manifest = wandb_artifacts.ArtifactManifestV1.from_manifest_json(
+            None, manifest_json
+        )
+        if eager:
+            # look up every entry, like loading used to
+            for path in manifest.entries:
+                manifest.entries[path]
+        return manifest
+
+    manifest, load_time = timed(load)
+    del manifest
+    tracemalloc.start()
+    manifest = load()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    contents = manifest_json["contents"]
+    paths = list(contents)[:: max(1, len(contents) // lookups)]
+    _, get_time = timed(lambda: [manifest.get_entry_by_path(p) for p in paths])
+    _, dir_time = timed(lambda: manifest.get_entries_in_directory("dir0"))
+    _, digest_time = timed(manifest.digest)
+    _, json_time = timed(manifest.to_manifest_json)
+    print(
+        "{:>5}: load {:.2f}s, {:.0f} MB, {} lookups {:.3f}s, "
+        "1/{} of the dirs {:.3f}s, digest {:.2f}s, to_manifest_json {:.2f}s".format(
+            "eager" if eager else "lazy",
+            load_time,
+            memory / 1024.0 / 1024,
+            len(paths),
+            get_time,
+            ndirs,
+            dir_time,
+            digest_time,
+            json_time,
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=1000000)
+    parser.add_argument("--dirs", type=int, default=100)
+    parser.add_argument("--lookups", type=int, default=1000)
+    args = parser.parse_args()
+
+    manifest_json = make_manifest_json(args.entries, args.dirs)
+    for eager in (True, False):
+        run(manifest_json, eager, args.dirs, args.lookups)
+
+
+if __name__ == "__main__":
+    main()
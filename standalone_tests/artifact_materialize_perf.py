@@ -0,0 +1,73 @@
+"""Measure placing files from the artifacts cache into a download directory.
+
+Fills a cache with N files, then times ArtifactsCache.materialize into a fresh
+directory with each strategy, and reports how much extra disk space it used.
+Strategies that don't work on the filesystem fall back to copying.
+
+    python standalone_tests/artifact_materialize_perf.py --files 200 --size-kb 4096
+"""
+
+import argparse
+import base64
+import collections
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+
+from wandb.sdk.interface import artifacts
+
+
+def disk_free(path):
+    stat = os.statvfs(path)
+    return stat.f_bavail * stat.f_frsize
+
+
+def fill_cache(cache, nfiles, size):
+    paths = []
+    for i in range(nfiles):
+        data = os.urandom(size)
+        md5 = base64.b64encode(hashlib.md5(data).digest())
+        path, _, opener = cache.check_md5_obj_path(md5, size)
+        with opener(mode="wb") as f:
+            f.write(data)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--size-kb", type=int, default=4096)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        cache = artifacts.ArtifactsCache(os.path.join(tmp_dir, "cache"))
+        paths = fill_cache(cache, args.files, args.size_kb * 1024)
+        total_mb = args.files * args.size_kb / 1024.0
+        print("{} files, {:.0f} MB".format(args.files, total_mb))
+
+        for strategy in artifacts.MATERIALIZE_STRATEGIES:
+            root = os.path.join(tmp_dir, strategy)
+            os.mkdir(root)
+            used = collections.Counter()
+            free = disk_free(root)
+            start = time.time()
+            for i, path in enumerate(paths):
+                target = os.path.join(root, "file{}.bin".format(i))
+                used[cache.materialize(path, target, strategy)] += 1
+            elapsed = time.time() - start
+            used_mb = (free - disk_free(root)) / 1024.0 / 1024
+            print(
+                "{:>8}: {:.2f}s, {:.0f} MB/s, ~{:.0f} MB disk, used {}".format(
+                    strategy, elapsed, total_mb / elapsed, used_mb, dict(used)
+                )
+            )
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
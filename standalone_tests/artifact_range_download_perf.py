@@ -0,0 +1,100 @@
+"""Measure downloading a large artifact file in one stream versus in ranges.
+
+Serves a file from a local HTTP server that limits each connection to a fixed
+bandwidth, like most object stores do, and loads it into a fresh artifacts cache
+with WandbStoragePolicy.load_file.
+
+    python standalone_tests/artifact_range_download_perf.py --size-mb 256 --conn-mbps 50
+"""
+
+import argparse
+import base64
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+
+from six.moves import BaseHTTPServer, socketserver
+
+
+def make_server(data, conn_bytes_per_second):
+    class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            start, end = 0, len(data)
+            match = re.match(r"bytes=(\d+)-(\d+)", self.headers.get("Range") or "")
+            if match:
+                start, end = int(match.group(1)), int(match.group(2)) + 1
+                self.send_response(206)
+                self.send_header(
+                    "Content-Range", "bytes %d-%d/%d" % (start, end - 1, len(data))
+                )
+            else:
+                self.send_response(200)
+            self.send_header("Content-Length", str(end - start))
+            self.end_headers()
+            chunk = 256 * 1024
+            for offset in range(start, end, chunk):
+                self.wfile.write(data[offset : min(offset + chunk, end)])
+                time.sleep(chunk / float(conn_bytes_per_second))
+
+    class Server(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+        daemon_threads = True
+
+    server = Server(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument("--conn-mbps", type=float, default=50)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp()
+    os.environ["WANDB_CACHE_DIR"] = tmp_dir
+    # imported after setting the cache dir
+    from wandb.sdk import wandb_artifacts
+
+    data = os.urandom(args.size_mb * 1024 * 1024)
+    server = make_server(data, args.conn_mbps * 1024 * 1024)
+    url = "http://127.0.0.1:%d/file" % server.server_address[1]
+    entry = wandb_artifacts.ArtifactManifestEntry(
+        "model.bin",
+        None,
+        digest=base64.b64encode(hashlib.md5(data).digest()).decode("ascii"),
+        size=len(data),
+    )
+
+    class Parent(object):
+        entity = "entity"
+
+    try:
+        for label, min_bytes in (("stream", len(data) + 1), ("ranges", 0)):
+            wandb_artifacts._RANGE_DOWNLOAD_MIN_BYTES = min_bytes
+            policy = wandb_artifacts.WandbStoragePolicy()
+            policy._file_url = lambda *args: url
+            shutil.rmtree(os.path.join(tmp_dir, "artifacts", "obj"), True)
+            start = time.time()
+            policy.load_file(Parent(), "model.bin", entry)
+            elapsed = time.time() - start
+            print(
+                "{:>6}: {:.2f}s, {:.0f} MB/s".format(
+                    label, elapsed, args.size_mb / elapsed
+                )
+            )
+    finally:
+        server.shutdown()
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Measure per-step cost of logging scalars through the internal pipeline.
+
+Publishes a history row of N scalars the way run.log() does, then runs it through
+HandleManager.handle_history and SendManager.send_history up to the point it is
+handed to the file stream. The json mode stores every value as value_json, which
+is what all history items looked like before the typed fast path.
+
+    python standalone_tests/history_encode_perf.py --steps 2000 --keys 200
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+from six.moves import queue
+from wandb.sdk.interface.interface_queue import InterfaceQueue
+from wandb.sdk.internal.handler import HandleManager
+from wandb.sdk.internal.sender import SendManager
+from wandb.sdk.internal.settings_static import SettingsStatic
+from wandb.sdk.lib import proto_util
+
+
+class NullFileStream(object):
+    def push(self, filename, data):
+        pass
+
+    def rate_limit_seconds(self):
+        return 15
+
+
+def json_only(item, value, dumps=json.dumps):
+    item.value_json = dumps(value)
+
+
+def run(steps, nkeys, root_dir):
+    record_q = queue.Queue()
+    sender_q = queue.Queue()
+    interface = InterfaceQueue(record_q=record_q)
+    hm = HandleManager(
+        settings=SettingsStatic(dict(_offline=False)),
+        record_q=record_q,
+        result_q=queue.Queue(),
+        stopped=threading.Event(),
+        sender_q=sender_q,
+        writer_q=queue.Queue(),
+        interface=None,
+    )
+    sm = SendManager.setup(root_dir)
+    sm._fs = NullFileStream()
+
+    start = time.time()
+    for step in range(steps):
+        row = {"metric_{}".format(i): step * 0.1 + i for i in range(nkeys)}
+        interface.publish_history(row, step=step, run=object())
+        hm.handle_history(record_q.get())
+        while not sender_q.empty():
+            record = sender_q.get()
+            if record.HasField("history"):
+                sm.send_history(record)
+            elif record.HasField("summary"):
+                sm.send_summary(record)
+    return (time.time() - start) / steps
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--keys", type=int, default=200)
+    args = parser.parse_args()
+
+    root_dir = tempfile.mkdtemp()
+    os.mkdir(os.path.join(root_dir, "files"))
+
+    typed_set_value = proto_util.history_item_set_value
+    results = []
+    for mode, set_value in (("json", json_only), ("typed", typed_set_value)):
+        proto_util.history_item_set_value = set_value
+        per_step = run(args.steps, args.keys, root_dir)
+        results.append(per_step)
+        print(
+            "{:>5}: {:.1f} us per step, {:.0f} steps/s".format(
+                mode, per_step * 1e6, 1 / per_step
+            )
+        )
+    proto_util.history_item_set_value = typed_set_value
+    print("speedup: {:.2f}x".format(results[0] / results[1]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Measure exporting the history of many runs, serially and with export_history.
+
+Fetches the sampled history of some keys for the runs of a project, first one run
+at a time into row dicts with scan_history, as an export script would, and then
+with Api.export_history writing a parquet or csv file. Needs a project with many
+runs and an API key.
+
+    python standalone_tests/history_export_perf.py my_entity/my_project --keys loss
+"""
+
+import argparse
+import itertools
+import os
+import tempfile
+import time
+
+
+def main():
+    import wandb
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path")
+    parser.add_argument("--keys", nargs="+", default=["loss"])
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--format", default="parquet")
+    parser.add_argument("--max-workers", type=int, default=8)
+    args = parser.parse_args()
+
+    api = wandb.Api(timeout=60)
+    runs = api.runs(args.path, fields=["name"], per_page=100)
+    runs = list(itertools.islice(runs, args.runs))
+    keys = ["_step"] + args.keys
+
+    start = time.time()
+    rows = [row for run in runs for row in run.scan_history(keys=keys)]
+    print("  serial: {} rows in {:.3f}s".format(len(rows), time.time() - start))
+
+    out = os.path.join(tempfile.mkdtemp(), "history." + args.format)
+    start = time.time()
+    count = api.export_history(
+        runs, keys, out, format=args.format, max_workers=args.max_workers
+    )
+    print(
+        "exported: {} rows in {:.3f}s, {:.2f}MB".format(
+            count, time.time() - start, os.path.getsize(out) / 1e6
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Measure logging a list of thumbnails with and without the image atlas.
+
+Logs N thumbnails for a number of steps, as a run logging a batch of samples
+every epoch would, and reports the time spent and the files written to the run's
+media directory, each of which is hashed and uploaded separately.
+
+    python standalone_tests/image_atlas_perf.py --images 100 --size 32 --steps 20
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+
+def run(images, size, steps, atlas):
+    import wandb
+    from wandb.sdk import data_types
+
+    os.environ["WANDB_MEDIA_IMAGE_ATLAS"] = "true" if atlas else "false"
+    root = tempfile.mkdtemp()
+    wandb_run = wandb.init(mode="offline", dir=root)
+    arrays = np.random.randint(0, 256, size=(images, size, size, 3), dtype=np.uint8)
+
+    start = time.time()
+    for step in range(steps):
+        wb_images = [wandb.Image(array) for array in arrays]
+        data_types.val_to_json(wandb_run, "thumbnails", wb_images, namespace=step)
+    elapsed = time.time() - start
+
+    media_dir = os.path.join(wandb_run.dir, "media", "images")
+    files = os.listdir(media_dir)
+    total = sum(os.path.getsize(os.path.join(media_dir, f)) for f in files)
+    print(
+        "{:>9}: {:.3f}s, {} files, {:.2f}MB".format(
+            "atlas" if atlas else "separated", elapsed, len(files), total / 1e6
+        )
+    )
+    wandb_run.finish()
+    shutil.rmtree(root)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=100)
+    parser.add_argument("--size", type=int, default=32)
+    parser.add_argument("--steps", type=int, default=20)
+    args = parser.parse_args()
+
+    for atlas in (False, True):
+        run(args.images, args.size, args.steps, atlas)
+
+
+if __name__ == "__main__":
+    main()
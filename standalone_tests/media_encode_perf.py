@@ -0,0 +1,53 @@
+"""Measure how long creating a batch of wandb.Image blocks the caller.
+
+Creates N images from random arrays, as a training loop logging a batch would,
+then waits for their files. Encoding on the caller's thread is compared with the
+media pool (WANDB_MEDIA_ENCODE_THREADS).
+
+    python standalone_tests/media_encode_perf.py --images 64 --size 256 --threads 4
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+
+def run(images, size, threads):
+    import wandb
+    from wandb.sdk.lib import media_pool
+
+    os.environ["WANDB_MEDIA_ENCODE_THREADS"] = str(threads)
+    media_pool._media_pool = None
+    arrays = [
+        np.random.randint(0, 256, size=(size, size, 3), dtype=np.uint8)
+        for _ in range(images)
+    ]
+
+    start = time.time()
+    wb_images = [wandb.Image(array) for array in arrays]
+    blocked = time.time() - start
+    for wb_image in wb_images:
+        assert wb_image.file_is_set()
+    total = time.time() - start
+    print(
+        "{:>2} threads: caller blocked {:.3f}s, files ready after {:.3f}s".format(
+            threads, blocked, total
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=64)
+    parser.add_argument("--size", type=int, default=256)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    for threads in (0, args.threads):
+        run(args.images, args.size, threads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Measure capturing console output with the emulating and the raw redirect.
+
+Writes progress bar updates and log lines to stdout while it is redirected, as a
+training loop would, and reports the CPU time the process spent until all of the
+output reached the callbacks and how many bytes they got. Redirect runs the
+output through the terminal emulator, RawRedirect hands it over as it is.
+
+    python standalone_tests/raw_console_perf.py --steps 20000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+
+def write_output(steps):
+    for step in range(steps + 1):
+        sys.stdout.write(
+            "\r{:3d}%| {}/{} [00:01<00:01]".format(100 * step // steps, step, steps)
+        )
+        if step % 100 == 0:
+            sys.stdout.write(
+                "\n\x1b[32mINFO\x1b[0m step {} loss=0.{:04d}\n".format(step, step)
+            )
+            sys.stdout.flush()
+            time.sleep(0.01)
+    sys.stdout.write("\n")
+    sys.stdout.flush()
+
+
+def run(cls, steps):
+    received = []
+    # the pipe relay also writes to the real stdout, keep it quiet
+    stdout_fd = os.dup(1)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    redir = cls("stdout", cbs=[received.append])
+    start = time.process_time()
+    redir.install()
+    write_output(steps)
+    redir.uninstall()
+    elapsed = time.process_time() - start
+    os.dup2(stdout_fd, 1)
+    os.close(stdout_fd)
+    os.close(devnull)
+    return elapsed, sum(map(len, received))
+
+
+def main():
+    from wandb.sdk.lib import redirect
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=20000)
+    args = parser.parse_args()
+
+    for cls in (redirect.Redirect, redirect.RawRedirect):
+        elapsed, size = run(cls, args.steps)
+        print("{:>11}: {:.3f}s, {} bytes".format(cls.__name__, elapsed, size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Measure listing a project's runs with and without field projection and prefetch.
+
+Iterates over all runs of a project and reads one summary metric, once fetching
+every run attribute page by page, and once fetching only the run name and summary
+with the next page prefetched. Needs a project with many runs and an API key.
+
+    python standalone_tests/runs_projection_perf.py my_entity/my_project --key loss
+"""
+
+import argparse
+import time
+
+
+def main():
+    import wandb
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path")
+    parser.add_argument("--key", default="loss")
+    parser.add_argument("--per-page", type=int, default=50)
+    args = parser.parse_args()
+
+    api = wandb.Api(timeout=60)
+    for kwargs in (
+        {},
+        {"fields": ["name", "summary." + args.key], "prefetch": True},
+    ):
+        start = time.time()
+        runs = api.runs(args.path, per_page=args.per_page, **kwargs)
+        values = [run.summary_metrics.get(args.key) for run in runs]
+        print(
+            "{}: {} runs in {:.3f}s".format(
+                kwargs or "all fields", len(values), time.time() - start
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Measure the cost of keeping sampled history in the internal process.
+
+Times HandleManager._save_history for rows of N numeric metrics, and adding a
+long series to a single UniformSampleAccumulator one value at a time versus
+with add_many.
+
+    python standalone_tests/sampled_history_perf.py --steps 1000 --keys 2000
+"""
+
+import argparse
+import threading
+import time
+
+from six.moves import queue
+from wandb.sdk.internal import sample
+from wandb.sdk.internal.handler import HandleManager
+from wandb.sdk.internal.settings_static import SettingsStatic
+
+
+def run_handler(steps, nkeys):
+    hm = HandleManager(
+        settings=SettingsStatic(dict(_offline=False)),
+        record_q=queue.Queue(),
+        result_q=queue.Queue(),
+        stopped=threading.Event(),
+        sender_q=queue.Queue(),
+        writer_q=queue.Queue(),
+        interface=None,
+    )
+    keys = ["metric_{}".format(i) for i in range(nkeys)]
+    start = time.time()
+    for step in range(steps):
+        hm._save_history({k: step * 0.1 + i for i, k in enumerate(keys)})
+    return (time.time() - start) / steps
+
+
+def run_accumulator(num, batch):
+    values = [i * 0.1 for i in range(num)]
+    s = sample.UniformSampleAccumulator()
+    start = time.time()
+    if batch:
+        for i in range(0, num, batch):
+            s.add_many(values[i : i + batch])
+    else:
+        for v in values:
+            s.add(v)
+    return time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--keys", type=int, default=2000)
+    parser.add_argument("--values", type=int, default=1000000)
+    args = parser.parse_args()
+
+    per_step = run_handler(args.steps, args.keys)
+    print(
+        "_save_history: {} keys, {:.1f} us per step".format(args.keys, per_step * 1e6)
+    )
+    for batch in (0, 100, 10000):
+        elapsed = run_accumulator(args.values, batch)
+        print(
+            "{:>12}: {} values, {:.3f} s".format(
+                "add_many({})".format(batch) if batch else "add", args.values, elapsed
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Measure per-step summary cost in the internal process.
+
+Drives HandleManager.handle_history and SendManager.send_summary directly with a
+consolidated summary that already holds N keys, logging the same 10 metrics each
+step. With summary deltas the time per step should stay flat as N grows.
+
+    python standalone_tests/summary_delta_perf.py --steps 1000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+from six.moves import queue
+from wandb.proto import wandb_internal_pb2 as pb
+from wandb.sdk.internal.handler import HandleManager
+from wandb.sdk.internal.sender import SendManager
+from wandb.sdk.internal.settings_static import SettingsStatic
+
+
+def make_history(step, nkeys=10):
+    history = pb.HistoryRecord()
+    for i in range(nkeys):
+        item = history.item.add()
+        item.key = "metric_{}".format(i)
+        item.value_json = json.dumps(step * 0.1 + i)
+    return pb.Record(history=history)
+
+
+def run(summary_size, steps, root_dir):
+    sender_q = queue.Queue()
+    hm = HandleManager(
+        settings=SettingsStatic(dict(_offline=False)),
+        record_q=queue.Queue(),
+        result_q=queue.Queue(),
+        stopped=threading.Event(),
+        sender_q=sender_q,
+        writer_q=None,
+        interface=None,
+    )
+    sm = SendManager.setup(root_dir)
+
+    for i in range(summary_size):
+        hm._consolidated_summary["existing_{}".format(i)] = i
+    hm._save_summary(hm._consolidated_summary)
+
+    start = time.time()
+    for step in range(steps):
+        hm.handle_history(make_history(step))
+        while not sender_q.empty():
+            record = sender_q.get()
+            if record.HasField("summary"):
+                sm.send_summary(record)
+    return (time.time() - start) / steps
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=1000)
+    args = parser.parse_args()
+
+    root_dir = tempfile.mkdtemp()
+    os.mkdir(os.path.join(root_dir, "files"))
+    for summary_size in (10, 1000, 10000, 100000):
+        per_step = run(summary_size, args.steps, root_dir)
+        print(
+            "summary keys: {:>7}  per step: {:.1f} us".format(
+                summary_size, per_step * 1e6
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Measure building and serializing a large wandb.Table row by row and by column.
+
+Builds a table of an id, a score and a small embedding per row, as an evaluation
+loop would, first with add_data and then from numpy arrays with
+Table.from_numpy, and serializes both to an artifact.
+
+    python standalone_tests/table_columnar_perf.py --rows 100000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+
+def main():
+    import wandb
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=8)
+    args = parser.parse_args()
+
+    ids = np.arange(args.rows)
+    scores = np.random.rand(args.rows)
+    embeddings = np.random.rand(args.rows, args.dim)
+    artifact = wandb.Artifact("table-perf", "dataset")
+
+    start = time.time()
+    by_row = wandb.Table(columns=["id", "score", "embedding"])
+    for row in zip(ids, scores, embeddings):
+        by_row.add_data(*row)
+    built = time.time() - start
+    by_row.to_json(artifact)
+    print(
+        "   by row: built in {:.3f}s, serialized in {:.3f}s".format(
+            built, time.time() - start - built
+        )
+    )
+
+    start = time.time()
+    by_column = wandb.Table.from_numpy(
+        {"id": ids, "score": scores, "embedding": embeddings}
+    )
+    built = time.time() - start
+    by_column.to_json(artifact)
+    print(
+        "by column: built in {:.3f}s, serialized in {:.3f}s".format(
+            built, time.time() - start - built
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Measure the console capture terminal emulators on progress bar and log streams.
+
+Feeds TerminalEmulator and CompactTerminalEmulator the same streams, a chunk at a
+time with a read() every few chunks as the console redirect does, checks that they
+produce the same output and reports how long each took. The streams are what
+several tqdm bars at different positions write, and colored log lines.
+
+    python standalone_tests/terminal_emulator_perf.py --bars 8 --steps 2000
+"""
+
+import argparse
+import time
+
+
+def tqdm_stream(bars, steps):
+    """What tqdm writes for `bars` bars at positions 0..bars-1 stepping together."""
+    chunks = []
+    for step in range(steps + 1):
+        for position in range(bars):
+            filled = 10 * step // steps
+            bar = "█" * filled + " " * (10 - filled)
+            line = "\r{:3d}%|{}| {}/{} [00:01<00:01, 40.00it/s]".format(
+                100 * step // steps, bar, step, steps
+            )
+            if position:
+                line = "\n" * position + line + "\x1b[A" * position
+            chunks.append(line)
+    return chunks
+
+
+def log_stream(lines):
+    """Log lines with a colored level name, as colorlog and rich write them."""
+    colors = ["\x1b[32m", "\x1b[33m", "\x1b[31m\x1b[1m"]
+    levels = ["INFO", "WARNING", "ERROR"]
+    return [
+        "{}{}\x1b[0m step {} loss=0.{:04d} lr=3e-4\n".format(
+            colors[i % 3], levels[i % 3], i, i
+        )
+        for i in range(lines)
+    ]
+
+
+def run(emulator, chunks, read_every):
+    out = []
+    start = time.time()
+    for i, chunk in enumerate(chunks):
+        emulator.write(chunk)
+        if i % read_every == 0:
+            out.append(emulator.read())
+    out.append(emulator.read())
+    return time.time() - start, "".join(out)
+
+
+def main():
+    from wandb.sdk.lib import redirect
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bars", type=int, default=8)
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--log-lines", type=int, default=20000)
+    parser.add_argument("--read-every", type=int, default=100)
+    args = parser.parse_args()
+
+    streams = {
+        "tqdm": tqdm_stream(args.bars, args.steps),
+        "logs": log_stream(args.log_lines),
+    }
+    for name, chunks in streams.items():
+        elapsed, out = run(redirect.TerminalEmulator(), chunks, args.read_every)
+        compact_elapsed, compact_out = run(
+            redirect.CompactTerminalEmulator(), chunks, args.read_every
+        )
+        assert out == compact_out
+        print(
+            "{}: {} chars, TerminalEmulator {:.3f}s, "
+            "CompactTerminalEmulator {:.3f}s".format(
+                name, sum(map(len, chunks)), elapsed, compact_elapsed
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
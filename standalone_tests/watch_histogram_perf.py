@@ -0,0 +1,58 @@
+"""Measure computing wandb.watch parameter histograms one tensor at a time and batched.
+
+Builds a stack of linear layers, as a watched model would have, and computes the
+histograms of all of its parameters with log_tensor_stats per tensor, copying each
+to host memory first as the parameter hook used to, and with log_tensors_stats.
+Runs on CPU-only torch, pass --device cuda to measure on a GPU.
+
+    python standalone_tests/watch_histogram_perf.py --layers 50 --width 512
+"""
+
+import argparse
+import time
+
+
+def main():
+    import torch
+    from wandb.sdk.wandb_history import History
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--layers", type=int, default=50)
+    parser.add_argument("--width", type=int, default=512)
+    parser.add_argument("--steps", type=int, default=10)
+    parser.add_argument("--device", default="cpu")
+    args = parser.parse_args()
+
+    model = torch.nn.Sequential(
+        *[torch.nn.Linear(args.width, args.width) for _ in range(args.layers)]
+    ).to(args.device)
+    history = History(run=None)
+    torch_history = history.torch
+    tensors = {
+        "parameters/" + name: parameter.data
+        for name, parameter in model.named_parameters()
+    }
+
+    start = time.time()
+    for _ in range(args.steps):
+        for name, tensor in tensors.items():
+            torch_history.log_tensor_stats(tensor.cpu(), name)
+    per_tensor = time.time() - start
+
+    start = time.time()
+    for _ in range(args.steps):
+        torch_history.log_tensors_stats(tensors)
+    batched = time.time() - start
+
+    print(
+        "{} tensors, {} elements: per tensor {:.3f}s/step, batched {:.3f}s/step".format(
+            len(tensors),
+            sum(t.numel() for t in tensors.values()),
+            per_tensor / args.steps,
+            batched / args.steps,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -172,6 +172,64 @@ def test_all_logging(wandb_init_run):
     assert len(wandb.run._backend.history) == 3
 
 
+def test_log_tensors_stats(wandb_init_run):
+    torch_history = wandb.run.history.torch
+    tensors = {
+        "randn": torch.randn(1000),
+        "rand": torch.rand(10, 10) * 5,
+        "constant": torch.full((3,), 2.0),
+        "half": torch.randn(100).half(),
+        "nonfinite": torch.tensor([float("nan"), 1.0, float("inf"), -1.0]),
+        "nan": torch.tensor([float("nan")]),
+        "sparse": torch.eye(10).to_sparse(),
+    }
+    for name, tensor in tensors.items():
+        torch_history.log_tensor_stats(tensor, "single/" + name)
+    torch_history.log_tensors_stats(
+        {"batched/" + name: tensor for name, tensor in tensors.items()}
+    )
+    row = wandb.run.history._data
+    assert "single/nan" not in row and "batched/nan" not in row
+    for name in ["randn", "rand", "constant", "half", "nonfinite", "sparse"]:
+        single, batched = row["single/" + name], row["batched/" + name]
+        assert batched.bins == pytest.approx(single.bins)
+        assert sum(batched.histogram) == sum(single.histogram)
+        # values on a bin edge can land on either side of it
+        diff = [abs(a - b) for a, b in zip(batched.histogram, single.histogram)]
+        assert sum(diff) <= 2
+
+
+def test_segment_min_max_without_scatter_reduce(wandb_init_run, monkeypatch):
+    torch_history = wandb.run.history.torch
+    data = torch.tensor([3.0, -1.0, 2.0, 7.0, 5.0, 0.5])
+    segment = torch.tensor([0, 0, 1, 1, 1, 2])
+    lengths = [2, 3, 1]
+    mins, maxs = torch_history._segment_min_max(data, data, segment, lengths)
+
+    def no_scatter_reduce(*args, **kwargs):
+        raise AttributeError("scatter_reduce")
+
+    monkeypatch.setattr(torch.Tensor, "scatter_reduce", no_scatter_reduce)
+    padded_mins, padded_maxs = torch_history._segment_min_max(
+        data, data, segment, lengths
+    )
+    assert mins.tolist() == padded_mins.tolist() == [-1.0, 2.0, 0.5]
+    assert maxs.tolist() == padded_maxs.tolist() == [3.0, 7.0, 0.5]
+
+
+def test_unwatch_clears_gradient_batches(wandb_init_run):
+    wandb.watch(ConvNet(), log="gradients", log_freq=1)
+    assert wandb.run.history.torch._gradient_batches
+    wandb.unwatch()
+    assert wandb.run.history.torch._gradient_batches == []
+
+    net = ConvNet()
+    wandb.watch(net, log="gradients", log_freq=1)
+    assert len(wandb.run.history.torch._gradient_batches) == 1
+    wandb.unwatch(net)
+    assert wandb.run.history.torch._gradient_batches == []
+
+
 def test_double_log(wandb_init_run):
     net = ConvNet()
     wandb.watch(net, log_graph=True)
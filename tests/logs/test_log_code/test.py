@@ -0,0 +1 @@
+print("test")
\ No newline at end of file
@@ -38,3 +38,47 @@ def test_all():
         for n in range(1000):
             l = doit(n, samples=s)
             check(n, l, samples=s)
+
+
+@pytest.fixture(params=["numpy", "list"])
+def accumulator(request, monkeypatch):
+    if request.param == "list":
+        monkeypatch.setattr(sample.util, "get_module", lambda name: None)
+    return sample.UniformSampleAccumulator
+
+
+@pytest.mark.parametrize("chunk", [1, 3, 64, 1000])
+def test_add_many_matches_add(accumulator, chunk):
+    for n in (0, 1, 127, 128, 129, 1000, 5000):
+        s1 = accumulator(min_samples=64)
+        s2 = accumulator(min_samples=64)
+        values = list(range(n))
+        for v in values:
+            s1.add(v)
+        for i in range(0, n, chunk):
+            s2.add_many(values[i : i + chunk])
+        assert s1.get() == s2.get()
+        check(n, s2.get(), samples=64)
+
+
+def test_types(accumulator):
+    s = accumulator(min_samples=4)
+    s.add_many([1, 2, 3])
+    assert s.get() == (1, 2, 3)
+    assert all(isinstance(v, int) for v in s.get())
+    s.add(4.5)
+    assert s.get() == (1, 2, 3, 4.5)
+    assert not all(isinstance(v, int) for v in s.get())
+
+
+def test_big_int(accumulator):
+    s = accumulator()
+    s.add(1)
+    s.add(2 ** 64)
+    assert s.get() == (1, float(2 ** 64))
+
+
+def test_add_many_uint64(accumulator):
+    s = accumulator()
+    s.add_many([1, 2 ** 63])
+    assert s.get() == (1, float(2 ** 63))
@@ -222,6 +222,61 @@ def test_max_images(caplog, mocked_run):
     assert os.path.exists(os.path.join(mocked_run.dir, "media/images/test2_0_0.png"))
 
 
+def test_image_seq_to_atlas(monkeypatch, mocked_run):
+    monkeypatch.setenv("WANDB_MEDIA_IMAGE_ATLAS", "true")
+    pixels = np.random.randint(255, size=(5, 10, 20, 3), dtype=np.uint8)
+    images = [wandb.Image(p, caption=str(i)) for i, p in enumerate(pixels)]
+    meta = data_types.val_to_json(mocked_run, "atlas", images, namespace=0)
+    assert meta["_type"] == "images/atlas"
+    assert meta["path"] == "media/images/atlas_0_atlas.png"
+    assert meta["count"] == 5 and meta["width"] == 20 and meta["height"] == 10
+    assert meta["captions"] == ["0", "1", "2", "3", "4"]
+    assert os.listdir(os.path.join(mocked_run.dir, "media", "images")) == [
+        "atlas_0_atlas.png"
+    ]
+    atlas = np.array(PIL.Image.open(os.path.join(mocked_run.dir, meta["path"])))
+    for i, (x, y) in enumerate(meta["offsets"]):
+        assert np.array_equal(atlas[y : y + 10, x : x + 20], pixels[i])
+
+
+def test_image_seq_to_atlas_falls_back(monkeypatch, mocked_run):
+    monkeypatch.setenv("WANDB_MEDIA_IMAGE_ATLAS", "true")
+    images = [wandb.Image(np.zeros((10, 10))), wandb.Image(np.zeros((10, 20)))]
+    meta = data_types.val_to_json(mocked_run, "mixed", images, namespace=0)
+    assert meta["_type"] == "images/separated"
+
+
+@pytest.fixture
+def media_pool(monkeypatch):
+    monkeypatch.setenv("WANDB_MEDIA_ENCODE_THREADS", "2")
+    monkeypatch.setattr(wandb.sdk.lib.media_pool, "_media_pool", None)
+    yield wandb.sdk.lib.media_pool.get_media_pool()
+
+
+def test_image_encoded_in_background(media_pool, mocked_run):
+    pixels = np.random.randint(255, size=(28, 28, 3), dtype=np.uint8)
+    pil_image = PIL.Image.fromarray(pixels)
+    wb_image = wandb.Image(pil_image)
+    pil_image.paste((0, 0, 0), (0, 0, 28, 28))
+    assert wb_image.format == "png"
+    wb_image.bind_to_run(mocked_run, "images", 0)
+    img_json = wb_image.to_json(mocked_run)
+    assert os.path.exists(os.path.join(mocked_run.dir, img_json["path"]))
+    assert img_json["width"] == 28 and img_json["height"] == 28
+    assert np.array_equal(np.array(wb_image.image), pixels)
+
+
+def test_audio_encoded_in_background(media_pool, mocked_run):
+    audio = np.zeros(44100)
+    wb_audio = wandb.Audio(audio, sample_rate=44100)
+    audio[:] = 1
+    wb_audio.bind_to_run(mocked_run, "test", 0)
+    meta = wandb.Audio.seq_to_json([wb_audio], mocked_run, "test", 0)
+    silence = wandb.Audio(np.zeros(44100), sample_rate=44100)
+    silence.bind_to_run(mocked_run, "silence", 0)
+    assert meta["audio"][0]["sha256"] == silence.to_json(mocked_run)["sha256"]
+
+
 def test_audio_sample_rates():
     audio1 = np.random.uniform(-1, 1, 44100)
     audio2 = np.random.uniform(-1, 1, 88200)
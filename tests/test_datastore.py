@@ -143,3 +143,128 @@ def test_data_write_fill(with_datastore):
         expected_records=records,
         expected_record_sizes=lengths,
     )
+
+
+def _history_record(step, size=1):
+    rec = wandb_internal_pb2.Record()
+    rec.history.step.num = step
+    item = rec.history.item.add()
+    item.key = "data"
+    item.value_json = json.dumps("x" * size)
+    return rec
+
+
+def _write_records(ds):
+    records = []
+    for step in range(20):
+        # every 5th record spans multiple blocks
+        records.append(_history_record(step, size=40000 if step % 5 == 0 else 10))
+        summary = wandb_internal_pb2.Record()
+        summary.summary.update.add(key="step", value_json=json.dumps(step))
+        records.append(summary)
+    for rec in records:
+        ds.write(rec)
+    return records
+
+
+def test_reader_scan(with_datastore):
+    """Scan records with the mmap reader."""
+    records = _write_records(with_datastore)
+    with_datastore.close()
+
+    reader = datastore.DataStoreReader()
+    reader.open_for_scan(FNAME)
+    scanned = []
+    for _, data in reader.scan_records():
+        assert isinstance(data, memoryview)
+        rec = wandb_internal_pb2.Record()
+        rec.ParseFromString(data)
+        scanned.append(rec)
+    del data
+    reader.close()
+    assert scanned == records
+
+
+def test_reader_matches_datastore(with_datastore):
+    """Reader returns the same payloads as the buffered scanner."""
+    _write_records(with_datastore)
+    with_datastore.close()
+
+    ds = datastore.DataStore()
+    ds.open_for_scan(FNAME)
+    reader = datastore.DataStoreReader()
+    reader.open_for_scan(FNAME)
+    while True:
+        expected = ds.scan_data()
+        data = reader.scan_data()
+        if expected is None:
+            assert data is None
+            break
+        assert bytes(data) == expected
+    reader.close()
+
+
+def test_index_find(with_datastore):
+    """Lookup records by type and step range through the sidecar index."""
+    records = _write_records(with_datastore)
+    with_datastore.close()
+
+    index = datastore.DataStoreIndex.for_file(FNAME)
+    assert len(index) == len(records)
+    assert len(index.find(record_type="summary")) == 20
+    offsets = index.find(record_type="history", min_step=5, max_step=7)
+    assert len(offsets) == 3
+
+    reader = datastore.DataStoreReader()
+    reader.open_for_scan(FNAME)
+    steps = []
+    for offset in offsets:
+        rec = wandb_internal_pb2.Record()
+        rec.ParseFromString(reader.read_at(offset))
+        steps.append(rec.history.step.num)
+    reader.close()
+    assert steps == [5, 6, 7]
+
+    loaded = datastore.DataStoreIndex.load(datastore.DataStoreIndex.index_fname(FNAME))
+    assert list(loaded.offsets) == list(index.offsets)
+    os.unlink(datastore.DataStoreIndex.index_fname(FNAME))
+
+
+def test_index_extend(with_datastore):
+    """Index covering a prefix of the log is extended after more writes."""
+    ds = with_datastore
+    for step in range(3):
+        ds.write(_history_record(step))
+    ds._fp.flush()
+    index = datastore.DataStoreIndex.for_file(FNAME)
+    assert len(index) == 3
+
+    for step in range(3, 5):
+        ds.write(_history_record(step))
+    ds.close()
+    index = datastore.DataStoreIndex.for_file(FNAME)
+    assert list(index.steps) == [0, 1, 2, 3, 4]
+    os.unlink(datastore.DataStoreIndex.index_fname(FNAME))
+
+
+def test_group_commit_same_bytes(with_datastore, mocker):
+    """Group commit writes the same bytes with fewer writes and fsyncs."""
+    records = _write_records(with_datastore)
+    with_datastore.close()
+    with open(FNAME, "rb") as f:
+        expected = f.read()
+    os.unlink(FNAME)
+
+    fsync = mocker.patch("os.fsync")
+    ds = datastore.DataStore()
+    ds.open_for_write(FNAME)
+    ds.set_group_commit(fsync_bytes=100000)
+    for i, rec in enumerate(records):
+        ds.write(rec)
+        if i % 10 == 9:
+            ds.commit()
+    ds.close()
+    with open(FNAME, "rb") as f:
+        assert f.read() == expected
+    # one fsync per 100k bytes instead of one per record spanning blocks
+    assert fsync.call_count == 1
@@ -230,6 +230,21 @@ def test_nested_dict():
     assert notation_type.assign(example) == real_type
 
 
+def test_types_of():
+    def classes_of(py_objs):
+        return [t.__class__ for t in TypeRegistry.types_of(py_objs)]
+
+    assert classes_of(np.arange(3)) == [NumberType]
+    assert classes_of(np.array([True])) == [BooleanType]
+    assert TypeRegistry.types_of(np.zeros((2, 3)))[0].params["shape"] == [3]
+    assert classes_of([1, "a", None, 2.0, float("nan")]) == [
+        NumberType,
+        StringType,
+        NoneType,
+    ]
+    assert classes_of([]) == []
+
+
 def test_image_type():
     wb_type = data_types._ImageFileType()
     image_simple = data_types.Image(np.random.rand(10, 10))
@@ -7,9 +7,13 @@ from dataclasses import dataclass
 
 import json
 import pytest
+import requests
 import os
+import time
 
-from wandb.sdk.internal.file_stream import CRDedupeFilePolicy
+from wandb.apis import internal
+from wandb.sdk.internal import file_stream
+from wandb.sdk.internal.file_stream import CRDedupeFilePolicy, RawCRDedupeFilePolicy
 from wandb.sdk.lib import file_stream_utils
 from wandb import util
 
@@ -252,3 +256,112 @@ def test_crdedupe_process_chunks():
         file_stream_utils.split_files(files, max_bytes=util.MAX_LINE_BYTES)
     )
     assert 2 == len(file_requests)
+
+
+def test_raw_crdedupe_process_chunks():
+    fp = RawCRDedupeFilePolicy()
+
+    # Progress bar updates split across chunks overwrite the line the cursor is on.
+    chunks = [
+        Chunk(data="timestamp epoch 1\r\n\x1b[?25l  0%"),
+        Chunk(data="ERROR timestamp warning\n"),
+        Chunk(data="timestamp \r 10%\r 2"),
+        Chunk(data="timestamp 0%"),
+    ]
+    ret = fp.process_chunks(chunks)
+    assert ret == [
+        {
+            "offset": 0,
+            "content": [
+                "timestamp epoch 1\n",
+                "timestamp  20%\n",
+                "ERROR timestamp warning\n",
+            ],
+        }
+    ]
+
+    # The line is still open in the next batch, colors are kept.
+    chunks = [
+        Chunk(data="timestamp \r\x1b[32m100%\x1b[0m\n\x1b[Adone\n"),
+    ]
+    ret = fp.process_chunks(chunks)
+    assert ret == [
+        {"offset": 1, "content": ["timestamp \x1b[32m100%\x1b[0m\n"]},
+        {"offset": 3, "content": ["timestamp done\n"]},
+    ]
+
+    # A \r\n split across batches ends the line instead of erasing it.
+    fp = RawCRDedupeFilePolicy()
+    ret = fp.process_chunks([Chunk(data="timestamp line one\r\nline two\r")])
+    assert ret == [
+        {
+            "offset": 0,
+            "content": ["timestamp line one\n", "timestamp line two\n"],
+        }
+    ]
+    ret = fp.process_chunks([Chunk(data="timestamp \nline three\r\n")])
+    assert ret == [
+        {
+            "offset": 1,
+            "content": ["timestamp line two\n", "timestamp line three\n"],
+        }
+    ]
+
+
+def test_fstream_gzip(publish_util, mock_server, test_settings):
+    test_settings.update(_file_stream_compression="gzip")
+    assert_history(publish_util)
+    assert mock_server.ctx["file_stream_gzip"] > 0
+
+
+def test_fstream_post_size_adapts(mock_server):
+    api = internal.Api().api
+    fs = file_stream.FileStreamApi(api, "run", time.time())
+    assert fs._max_post_bytes == fs.INITIAL_POST_BYTES
+    # Slow link: 256KB/s, so posts shrink to what fits in POST_TARGET_SECONDS
+    fs._record_post(fs.INITIAL_POST_BYTES, fs.INITIAL_POST_BYTES / float(256 << 10))
+    assert fs._max_post_bytes == int((256 << 10) * fs.POST_TARGET_SECONDS)
+    # Small posts are latency bound and do not change the estimate
+    fs._record_post(1000, 10)
+    assert fs._max_post_bytes == int((256 << 10) * fs.POST_TARGET_SECONDS)
+    # Faster posts grow the budget back, bounded by the backend line limit
+    for _ in range(50):
+        fs._record_post(fs._max_post_bytes, 0.001)
+    assert fs._max_post_bytes == util.MAX_LINE_BYTES
+
+
+class _Response(object):
+    status_code = 200
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {}
+
+
+def test_fstream_post_timeout_shrinks_batches(mock_server, monkeypatch):
+    api = internal.Api().api
+    fs = file_stream.FileStreamApi(api, "run", time.time())
+    fs._max_post_bytes = 8 * (100 << 10)
+    posts = []
+
+    def post(url, json=None, **kwargs):
+        files = json["files"].values()
+        posts.append(sum(len(line) for f in files for line in f["content"]))
+        if len(posts) == 1:
+            raise requests.exceptions.Timeout()
+        return _Response()
+
+    monkeypatch.setattr(fs._client, "post", post)
+    line = "x" * ((100 << 10) - 1) + "\n"
+    fs._send([file_stream.Chunk("output.log", line) for _ in range(8)])
+    # The timed out post is split in half and resent without waiting out retries
+    assert posts == [8 * len(line), 4 * len(line), 4 * len(line)]
+
+
+def test_fstream_bad_compression(mock_server):
+    with pytest.raises(ValueError):
+        file_stream.FileStreamApi(
+            internal.Api().api, "run", time.time(), compression="lz"
+        )
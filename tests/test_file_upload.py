@@ -6,7 +6,15 @@ from __future__ import print_function
 
 import json
 import os
+import threading
+import time
+
 import pytest
+from six.moves import queue
+
+from wandb.filesync import step_upload
+from wandb.filesync import step_upload_urls
+from wandb.filesync.stats import Stats
 
 
 def test_file_upload_good(mocked_run, publish_util, mock_server):
@@ -31,3 +39,146 @@ def test_file_upload_inject(mocked_run, publish_util, mock_server, inject_reques
     files = [dict(files_dict=dict(files=[("test.txt", "now")]))]
     ctx_util = publish_util(files=files, begin_cb=begin_fn)
     assert "test.txt" in ctx_util.file_names
+
+
+class UploadUrlsApi(object):
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+
+    def get_project(self):
+        return "project"
+
+    def upload_urls(self, project, files):
+        self.calls.append(list(files))
+        if self.error:
+            raise self.error
+        return (
+            "bucket",
+            ["X-Test:1"],
+            {name: {"url": "https://storage/" + name} for name in files},
+        )
+
+
+def test_file_upload_urls_batched(mocked_run, publish_util, mock_server):
+    def begin_fn(interface):
+        for i in range(5):
+            with open(os.path.join(mocked_run.dir, "test%d.txt" % i), "w") as f:
+                f.write("TEST TEST")
+
+    files = [dict(files_dict=dict(files=[("test%d.txt" % i, "now") for i in range(5)]))]
+    ctx_util = publish_util(files=files, begin_cb=begin_fn)
+    for i in range(5):
+        assert "test%d.txt" % i in ctx_util.file_names
+    requests = mock_server.ctx["upload_urls_requests"]
+    requested = [name for names in requests for name in names]
+    assert sorted(n for n in requested if n.startswith("test")) == [
+        "test%d.txt" % i for i in range(5)
+    ]
+    assert len(requests) < len(requested)
+
+
+def test_step_upload_urls_batch():
+    api = UploadUrlsApi()
+    batcher = step_upload_urls.StepUploadUrls(api, 1, 1, 1000)
+    queues = [batcher.upload_url_async("file%d" % i) for i in range(10)]
+    batcher.start()
+    responses = [q.get() for q in queues]
+    batcher.shutdown()
+    assert api.calls == [["file%d" % i for i in range(10)]]
+    assert responses[3].upload_url == "https://storage/file3"
+    assert responses[3].upload_headers == ["X-Test:1"]
+
+
+def test_step_upload_urls_max_batch_size():
+    api = UploadUrlsApi()
+    batcher = step_upload_urls.StepUploadUrls(api, 1, 1, 4)
+    queues = [batcher.upload_url_async("file%d" % i) for i in range(10)]
+    batcher.start()
+    for q in queues:
+        q.get()
+    batcher.shutdown()
+    assert [len(names) for names in api.calls] == [4, 4, 2]
+
+
+def test_step_upload_urls_error():
+    api = UploadUrlsApi(error=ValueError("boom"))
+    batcher = step_upload_urls.StepUploadUrls(api, 0.1, 0.01, 1000)
+    batcher.start()
+    with pytest.raises(ValueError):
+        batcher.upload_url("file")
+    batcher.shutdown()
+
+
+class RecordingJob(object):
+    def __init__(self, name, order, gate=None):
+        self.name = name
+        self.order = order
+        self.gate = gate
+
+    def run(self):
+        if self.gate:
+            self.gate.wait()
+        self.order.append(self.name)
+
+
+def test_upload_pool_priority():
+    stats = Stats()
+    pool = step_upload.UploadPool(stats, 1)
+    order = []
+    gate = threading.Event()
+    # Occupy the only worker so everything else queues up behind it
+    pool.submit(RecordingJob("first", order, gate), "large", 10)
+    while stats.upload_class_summary()["large"]["running"] == 0:
+        time.sleep(0.01)
+    pool.submit(RecordingJob("checkpoint", order), "large", 100)
+    pool.submit(RecordingJob("image", order), "small", 1)
+    pool.submit(RecordingJob("summary", order), "wandb", 1)
+    pool.submit(RecordingJob("image2", order), "small", 1)
+    assert stats.summary()["queue_depth"] >= 4
+    gate.set()
+    pool.shutdown()
+    assert order == ["first", "summary", "image", "image2", "checkpoint"]
+    classes = stats.upload_class_summary()
+    assert classes["large"]["files"] == 2
+    assert classes["large"]["bytes"] == 110
+    assert classes["small"]["queued"] == 0
+    assert stats.summary()["queue_depth"] == 0
+
+
+def test_upload_pool_reuses_workers():
+    pool = step_upload.UploadPool(Stats(), 4)
+    order = []
+    for i in range(20):
+        pool.submit(RecordingJob(i, order), "small", 1)
+        time.sleep(0.01)
+    pool.shutdown()
+    assert sorted(order) == list(range(20))
+    assert len(pool._workers) <= 4
+
+
+def test_step_upload_survives_failing_jobs(tmp_path):
+    # upload_urls fails for every file, so push raises out of each job
+    api = UploadUrlsApi(error=ValueError("boom"))
+    event_queue = queue.Queue()
+    step = step_upload.StepUpload(api, Stats(), event_queue, 2, file_stream=None)
+    step.start()
+    for i in range(3):
+        path = str(tmp_path / "file{}.txt".format(i))
+        with open(path, "w") as f:
+            f.write("TEST")
+        event_queue.put(
+            step_upload.RequestUpload(
+                path, "file{}.txt".format(i), None, None, False, None, None
+            )
+        )
+    finished = threading.Event()
+    event_queue.put(step_upload.RequestFinish(finished.set))
+    assert finished.wait(10)
+    step._thread.join()
+
+
+def test_upload_class():
+    assert step_upload.upload_class("wandb-summary.json", 10**9) == "wandb"
+    assert step_upload.upload_class("media/images/a.png", 1000) == "small"
+    assert step_upload.upload_class("model.h5", 10**9) == "large"
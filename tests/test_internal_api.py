@@ -1,3 +1,6 @@
+import http.server
+import threading
+
 import pytest
 from wandb.apis import internal
 
@@ -6,3 +9,122 @@ def test_agent_heartbeat_with_no_agent_id_fails(test_settings):
     a = internal.Api()
     with pytest.raises(ValueError):
         a.agent_heartbeat(None, {}, {})
+
+
+class _PartServer(object):
+    """Local stand-in for a storage backend accepting signed-url PUTs"""
+
+    def __init__(self, fail_first=()):
+        self.parts = {}
+        self.attempts = {}
+        self.fail_first = set(fail_first)
+        stand_in = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_PUT(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                stand_in.attempts[self.path] = stand_in.attempts.get(self.path, 0) + 1
+                if (
+                    self.path in stand_in.fail_first
+                    and stand_in.attempts[self.path] == 1
+                ):
+                    self.send_response(503)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                stand_in.parts[self.path] = body
+                self.send_response(200)
+                self.send_header("ETag", '"{}"'.format(self.path.strip("/")))
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def url(self, path):
+        return "http://127.0.0.1:{}/{}".format(self.server.server_port, path)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _write_file(path, size):
+    with open(path, "wb") as f:
+        f.write(bytes(bytearray(i % 251 for i in range(size))))
+    return path
+
+
+def test_upload_multipart_file(test_settings, tmp_path):
+    path = _write_file(str(tmp_path / "big.bin"), 10 * 1000 + 7)
+    progress = []
+    with _PartServer() as server:
+        urls = [server.url("part{}".format(i)) for i in range(1, 12)]
+        a = internal.Api()
+        with open(path, "rb") as f:
+            parts = a.api.upload_multipart_file(
+                urls, f, 1000, callback=lambda n, t: progress.append(t)
+            )
+    assert [p["partNumber"] for p in parts] == list(range(1, 12))
+    assert parts[0]["etag"] == '"part1"'
+    with open(path, "rb") as f:
+        data = f.read()
+    assert b"".join(server.parts["/part{}".format(i)] for i in range(1, 12)) == data
+    assert max(progress) == len(data)
+
+
+def test_upload_multipart_file_retries_part(test_settings, tmp_path):
+    path = _write_file(str(tmp_path / "big.bin"), 3000)
+    with _PartServer(fail_first=["/part2"]) as server:
+        urls = [server.url("part{}".format(i)) for i in range(1, 4)]
+        a = internal.Api()
+        with open(path, "rb") as f:
+            a.api.upload_multipart_file(urls, f, 1000)
+    assert server.attempts == {"/part1": 1, "/part2": 2, "/part3": 1}
+
+
+def test_upload_multipart_file_retries_parts_independently(test_settings, tmp_path):
+    path = _write_file(str(tmp_path / "big.bin"), 4000)
+    paths = ["/part{}".format(i) for i in range(1, 5)]
+    with _PartServer(fail_first=paths) as server:
+        urls = [server.url(p.strip("/")) for p in paths]
+        a = internal.Api()
+        # one retry per part, which parts sharing a retry budget would exhaust
+        a.api.retry_uploads = 1
+        with open(path, "rb") as f:
+            a.api.upload_multipart_file(urls, f, 1000, max_workers=4)
+    assert server.attempts == {p: 2 for p in paths}
+
+
+def test_upload_multipart_file_resume(test_settings, tmp_path):
+    path = _write_file(str(tmp_path / "big.bin"), 3000)
+    with _PartServer() as server:
+        urls = [server.url("part{}".format(i)) for i in range(1, 4)]
+        a = internal.Api()
+        completed = {1: '"part1"', 3: '"part3"'}
+        with open(path, "rb") as f:
+            parts = a.api.upload_multipart_file(
+                urls, f, 1000, completed_parts=completed
+            )
+    assert list(server.attempts) == ["/part2"]
+    assert [p["partNumber"] for p in parts] == [1, 2, 3]
+
+
+def test_upload_multipart_file_wrong_part_count(test_settings, tmp_path):
+    path = _write_file(str(tmp_path / "big.bin"), 3000)
+    a = internal.Api()
+    with open(path, "rb") as f:
+        with pytest.raises(ValueError):
+            a.api.upload_multipart_file(["http://localhost/part1"], f, 1000)
+
+
+def test_upload_session_is_shared(test_settings):
+    a = internal.Api()
+    assert a.api.upload_session is a.api.upload_session
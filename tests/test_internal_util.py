@@ -0,0 +1,116 @@
+"""Tests for internal_util."""
+
+import os
+import threading
+
+import pytest
+from six.moves import queue
+
+from wandb.sdk.internal import internal_util
+
+
+def _queue(policy, max_bytes=10, **kwargs):
+    return internal_util.BudgetQueue(
+        "test", max_bytes=max_bytes, policy=policy, sizer=len, **kwargs
+    )
+
+
+def test_budget_queue_unbounded():
+    q = _queue(internal_util.QUEUE_POLICY_BLOCK, max_bytes=0)
+    for _ in range(100):
+        q.put("x" * 100, block=False)
+    assert q.qsize() == 100
+    assert q.status()["bytes"] == 10000
+
+
+def test_budget_queue_bad_policy():
+    with pytest.raises(ValueError):
+        _queue("nope")
+
+
+def test_budget_queue_drop():
+    q = _queue(internal_util.QUEUE_POLICY_DROP)
+    q.put("aaaaaa")
+    q.put("bbbbbb")
+    q.put("cccc")
+    assert [q.get(), q.get()] == ["aaaaaa", "cccc"]
+    status = q.status()
+    assert status["dropped_items"] == 1
+    assert status["dropped_bytes"] == 6
+    assert status["bytes"] == 0
+
+
+def test_budget_queue_oversized_item_accepted_when_empty():
+    q = _queue(internal_util.QUEUE_POLICY_DROP)
+    q.put("x" * 100)
+    assert q.get() == "x" * 100
+    assert q.dropped_items() == 0
+
+
+def test_budget_queue_exempt():
+    q = _queue(internal_util.QUEUE_POLICY_DROP, is_exempt=lambda item: item == "ctl")
+    q.put("aaaaaaaaaa")
+    q.put("ctl")
+    q.put("b")
+    assert [q.get(), q.get()] == ["aaaaaaaaaa", "ctl"]
+    assert q.dropped_items() == 1
+
+
+def test_budget_queue_block_timeout():
+    q = _queue(internal_util.QUEUE_POLICY_BLOCK)
+    q.put("aaaaaaaa")
+    with pytest.raises(queue.Full):
+        q.put("bbbb", timeout=0.1)
+    with pytest.raises(queue.Full):
+        q.put("bbbb", block=False)
+
+
+def test_budget_queue_block_waits_for_consumer():
+    q = _queue(internal_util.QUEUE_POLICY_BLOCK)
+    q.put("aaaaaaaa")
+    done = threading.Event()
+
+    def producer():
+        q.put("bbbb")
+        done.set()
+
+    t = threading.Thread(target=producer)
+    t.start()
+    assert not done.wait(0.1)
+    assert q.get() == "aaaaaaaa"
+    assert done.wait(5)
+    t.join()
+    assert q.get() == "bbbb"
+
+
+def test_budget_queue_spill(tmp_path):
+    spill_path = str(tmp_path / "test.spill")
+    q = _queue(
+        internal_util.QUEUE_POLICY_SPILL,
+        spill_path=spill_path,
+        serialize=lambda item: item.encode("utf-8"),
+        deserialize=lambda data: data.decode("utf-8"),
+    )
+    items = ["item{}".format(i) for i in range(20)]
+    for item in items:
+        q.put(item, block=False)
+    status = q.status()
+    assert status["items"] == 20
+    assert status["spilled_items"] == 18
+    assert os.path.exists(spill_path)
+
+    assert [q.get() for _ in items] == items
+    assert q.empty()
+    assert not os.path.exists(spill_path)
+
+    # Spilling starts over once drained
+    for item in items:
+        q.put(item)
+    assert [q.get() for _ in items] == items
+    q.close()
+    assert not os.path.exists(spill_path)
+
+
+def test_budget_queue_spill_without_path_blocks():
+    q = _queue(internal_util.QUEUE_POLICY_SPILL)
+    assert q.status()["policy"] == internal_util.QUEUE_POLICY_BLOCK
@@ -1,5 +1,7 @@
 from wandb import wandb_lib
+from wandb.sdk.lib import media_pool
 import os
+import threading
 
 
 def test_write_netrc():
@@ -16,3 +18,25 @@ def test_write_netrc_invalid_host():
     api_key = "X" * 40
     res = wandb_lib.apikey.write_netrc("http://foo", "vanpelt", api_key)
     assert res is None
+
+
+def test_media_pool_bounds_pending_bytes():
+    pool = media_pool.MediaPool(2, max_pending_bytes=10)
+    release = threading.Event()
+    first = pool.submit(release.wait, 8)
+    submitted = threading.Event()
+
+    def submit_second():
+        pool.submit(lambda: None, 8).result()
+        submitted.set()
+
+    thread = threading.Thread(target=submit_second)
+    thread.start()
+    assert not submitted.wait(0.2)
+    assert pool.pending_bytes == 8
+
+    release.set()
+    first.result()
+    thread.join()
+    assert submitted.is_set()
+    assert pool.pending_bytes == 0
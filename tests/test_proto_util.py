@@ -0,0 +1,67 @@
+"""Tests for proto_util."""
+
+import json
+import math
+
+import numpy as np
+import pytest
+
+from wandb.proto import wandb_internal_pb2 as pb
+from wandb.sdk.lib import proto_util
+
+
+@pytest.mark.parametrize(
+    "value,typed_value",
+    [
+        (1.5, "value_float"),
+        (0.0, "value_float"),
+        (-3, "value_int"),
+        (0, "value_int"),
+        (2**63 - 1, "value_int"),
+        ("", "value_string"),
+        ("dog", "value_string"),
+        (2**63, None),
+        (True, None),
+        (None, None),
+        ("x" * (proto_util.HISTORY_STRING_MAX_LEN + 1), None),
+        ([1, 2], None),
+        ({"a": {"b": 1}}, None),
+    ],
+)
+def test_history_item_roundtrip(value, typed_value):
+    item = pb.HistoryItem(key="k")
+    proto_util.history_item_set_value(item, value)
+    assert item.WhichOneof("typed_value") == typed_value
+    item = pb.HistoryItem.FromString(item.SerializeToString())
+    decoded = proto_util.history_item_value(item)
+    assert decoded == value
+    assert type(decoded) == type(value)
+
+
+def test_history_item_nan():
+    item = pb.HistoryItem(key="k")
+    proto_util.history_item_set_value(item, float("nan"))
+    assert math.isnan(proto_util.history_item_value(item))
+    assert json.dumps(proto_util.history_dict_from_proto_list([item])) == ('{"k": NaN}')
+
+
+def test_history_item_numpy_uses_json():
+    item = pb.HistoryItem(key="k")
+    proto_util.history_item_set_value(
+        item, np.float32(0.5), dumps=lambda v: json.dumps(v.item())
+    )
+    assert item.WhichOneof("typed_value") is None
+    assert proto_util.history_item_value(item) == 0.5
+
+
+def test_history_dict_from_proto_list_legacy():
+    items = [
+        pb.HistoryItem(key="a", value_json="1.5"),
+        pb.HistoryItem(key="b", value_json='{"c": 2}'),
+        pb.HistoryItem(key="d", value_int=7),
+    ]
+    assert proto_util.history_dict_from_proto_list(items) == {
+        "a": 1.5,
+        "b": {"c": 2},
+        "d": 7,
+    }
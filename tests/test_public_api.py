@@ -332,6 +332,82 @@ def test_runs_from_path_index(mock_server, api):
     assert len(runs.objects) == 4
 
 
+def test_runs_fields(mock_server, api):
+    runs = api.runs("test/test", fields=["name", "summary.loss"])
+    run = runs[0]
+    query = mock_server.ctx["graphql"][-1]["query"]
+    assert "summaryMetrics" in query
+    assert "systemMetrics" not in query and "historyKeys" not in query
+    assert run.name == "beast-bug-33"
+    assert run.summary_metrics == {"acc": 100, "loss": 0}
+    # probes for attributes runs never have don't load the run
+    queries = len(mock_server.ctx["graphql"])
+    assert not hasattr(run, "_ipython_canary_method_should_not_exist_")
+    assert not hasattr(run, "__deepcopy__")
+    assert len(mock_server.ctx["graphql"]) == queries
+    assert run.config == {"epochs": 10}
+    # attributes that were not fetched are loaded on first use
+    with pytest.raises(AttributeError):
+        run.heartbeat_at
+    assert "query Run(" in mock_server.ctx["graphql"][-1]["query"]
+    with pytest.raises(ValueError):
+        api.runs("test/test", fields=["bogus"])
+
+
+def test_runs_prefetch(mock_server, api):
+    mock_server.set_context("page_times", 3)
+    runs = api.runs("test/test", prefetch=True)
+    assert runs[0].id == "test"
+    # the second page is fetched while the first one is used
+    runs._prefetched.result()
+    assert len(runs.objects) == 1
+    assert len(list(runs)) == 3
+
+
+def test_export_history(mock_server, api, runner):
+    mock_server.set_context("history_last_step", 1)
+    mock_server.set_context("page_times", 3)
+    with runner.isolated_filesystem():
+        rows = api.export_history(
+            api.runs("test/test"), ["loss", "acc"], "history.csv", format="csv"
+        )
+        assert rows == 6
+        with open("history.csv") as f:
+            lines = f.read().splitlines()
+        assert lines == ["run_id,loss,acc"] + ["test,0,100", "test,1,0"] * 3
+        with pytest.raises(ValueError):
+            api.export_history([], ["loss"], "history.npz", format="npz")
+        with pytest.raises(ValueError):
+            api.export_history([], ("loss",), "history.csv", format="csv")
+
+
+def test_export_history_parquet(mock_server, api, runner):
+    pq = pytest.importorskip("pyarrow.parquet")
+    mock_server.set_context("history_last_step", 1)
+    with runner.isolated_filesystem():
+        rows = api.export_history(api.runs("test/test"), ["loss"], "history.parquet")
+        assert rows == 4
+        table = pq.read_table("history.parquet").to_pydict()
+        assert table == {"run_id": ["test"] * 4, "loss": [0.0, 1.0] * 2}
+
+
+def test_export_history_parquet_widens_types(runner):
+    pq = pytest.importorskip("pyarrow.parquet")
+    writer_cls = wandb.apis.public._ParquetHistoryWriter
+    with runner.isolated_filesystem():
+        with writer_cls("history.parquet", ["a", "b"], 1) as writer:
+            writer.add("r1", {"a": [None], "b": [1]})
+            writer.add("r2", {"a": [2], "b": ["x"]})
+            writer.add("r3", {"a": [{"c": 1}], "b": [None]})
+        table = pq.read_table("history.parquet").to_pydict()
+    assert table["run_id"] == ["r1", "r2", "r3"]
+    assert table["a"][0] is None
+    assert float(table["a"][1]) == 2
+    assert table["a"][2] == '{"c": 1}'
+    assert float(table["b"][0]) == 1
+    assert table["b"][1:] == ["x", None]
+
+
 def test_projects(mock_server, api):
     projects = api.projects("test")
     # projects doesn't provide a length for now, so we iterate
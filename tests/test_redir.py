@@ -10,6 +10,7 @@ import sys
 import os
 import wandb
 import numpy as np
+import random
 import re
 import time
 import tqdm
@@ -334,3 +335,70 @@ def test_memory_leak2(console_settings, capfd, runner):
         time.sleep(3)
         assert len(run._out_redir._emulator.buffer) < 1000
         run.finish()
+
+
+def test_compact_emulator():
+    tokens = ["a", "bc", "hello world", "  ", "\n", "\r", "\b", "\x01", "\x1b]0;x\a"]
+    tokens += ["\x1b[%s" % c for c in ["31m", "41m", "1m", "22m", "0m", "m", "7m"]]
+    tokens += ["\x1b[%s" % c for c in ["A", "2B", "C", "3D", "K", "1K", "2K", "J"]]
+    tokens += ["\x1b[%s" % c for c in ["1J", "2J", "L", "H", "3;4f"]]
+    rnd = random.Random(0)
+    for _ in range(200):
+        emulator = wandb.wandb_sdk.lib.redirect.TerminalEmulator()
+        compact = wandb.wandb_sdk.lib.redirect.CompactTerminalEmulator()
+        for _ in range(rnd.randint(1, 20)):
+            data = "".join(rnd.choice(tokens) for _ in range(rnd.randint(1, 30)))
+            if rnd.random() < 0.1:
+                data += "x\n" * 120
+            emulator.write(data)
+            compact.write(data)
+            if rnd.random() < 0.5:
+                assert compact.read() == emulator.read()
+        assert compact.display() == emulator.display()
+        assert compact.read() == emulator.read()
+
+
+@pytest.mark.skipif(os.name == "nt", reason="no fd redirection on windows")
+def test_raw_redirect(capfd):
+    with capfd.disabled():
+        out = []
+        redir = wandb.wandb_sdk.lib.redirect.RawRedirect("stdout", cbs=[out.append])
+        redir.install()
+        print("Test")
+        print("\x1b[32m 10%\r 20%\r100%\x1b[0m")
+        redir.uninstall()
+        # the pty turns line feeds into CRLF, as the terminal sees them
+        out = b"".join(out).replace(b"\r\n", b"\n")
+        assert out == b"Test\n\x1b[32m 10%\r 20%\r100%\x1b[0m\n"
+
+
+def test_raw_redirect_split_utf8():
+    out = []
+    redir = wandb.wandb_sdk.lib.redirect.RawRedirect("stdout", cbs=[out.append])
+    redir._installed = True
+    bar = u"\u2588".encode("utf-8")
+    redir._relay(b"10% " + bar[:2])
+    redir.flush()
+    redir._relay(bar[2:] + b"\xff\n")
+    redir.flush()
+    redir._relay(bar[:1])
+    redir._installed = False
+    redir.flush()
+    assert out == [
+        b"10% ",
+        (u"\u2588\ufffd\n").encode("utf-8"),
+        u"\ufffd".encode("utf-8"),
+    ]
+
+
+@pytest.mark.skipif(os.name == "nt", reason="no fd redirection on windows")
+def test_run_with_raw_console(test_settings, capfd):
+    with capfd.disabled():
+        test_settings._apply_settings(wandb.Settings(console="raw"))
+        run = wandb.init(settings=test_settings)
+        print("epoch 1")
+        print(" 10%\r 20%\r100%")
+        run.finish()
+        with open(os.path.join(run.dir, "output.log"), "rb") as f:
+            out = f.read().replace(b"\r\n", b"\n")
+        assert out == b"epoch 1\n 10%\r 20%\r100%\n"
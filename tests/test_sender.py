@@ -1,5 +1,7 @@
 from __future__ import print_function
 
+import json
+import numpy as np
 import os
 import pytest
 import six
@@ -10,6 +12,8 @@ import shutil
 import sys
 
 import wandb
+from wandb.proto import wandb_internal_pb2 as pb
+from wandb.sdk.internal import sample, sender
 from wandb.util import mkdir_exists_ok
 
 from .utils import first_filestream
@@ -63,6 +67,16 @@ def test_send_status_request_network(mock_server, backend_interface):
         assert status_resp.network_responses[0].http_status_code == 429
 
 
+def test_send_status_request_network_queues(mock_server, backend_interface):
+    with backend_interface(initial_start=True) as interface:
+        status_resp = interface.communicate_network_status()
+        assert status_resp is not None
+        queues = {status.name: status for status in status_resp.queue_status}
+        assert "file_stream" in queues
+        assert queues["file_stream"].policy == "block"
+        assert queues["file_stream"].max_bytes > 0
+
+
 def test_resume_success(mocked_run, test_settings, mock_server, backend_interface):
     test_settings.resume = "allow"
     mock_server.ctx["resume"] = True
@@ -329,6 +343,73 @@ def test_output(mocked_run, mock_server, backend_interface):
     assert "Final line baby" in stream["files"]["output.log"]["content"][0]
 
 
+def test_summary_delta(internal_hm, internal_sender_q, _internal_sender):
+    def history_record(**data):
+        history = pb.HistoryRecord()
+        for k, v in data.items():
+            item = history.item.add()
+            item.key = k
+            item.value_json = json.dumps(v)
+        return _internal_sender._make_record(history=history)
+
+    internal_hm.handle(history_record(a=1, b=2))
+    internal_hm.handle(history_record(b=3))
+    summaries = []
+    while not internal_sender_q.empty():
+        record = internal_sender_q.get()
+        if record.HasField("summary"):
+            summaries.append(record.summary)
+
+    assert len(summaries) == 2
+    assert {item.key for item in summaries[0].update} == {"a", "b", "_step"}
+    assert {item.key for item in summaries[1].update} == {"b", "_step"}
+
+
+def test_sampled_history_batched(
+    internal_hm, internal_result_q, internal_sender_q, _internal_sender
+):
+    for i in range(300):
+        history = pb.HistoryRecord()
+        history.item.add(key="loss", value_json=json.dumps(i * 0.5))
+        history.item.add(key="epoch", value_json=json.dumps(i))
+        internal_hm.handle(_internal_sender._make_record(history=history))
+    internal_hm.handle(
+        _internal_sender._make_request(sampled_history=pb.SampledHistoryRequest())
+    )
+    result = internal_result_q.get(timeout=5)
+    items = {item.key: item for item in result.response.sampled_history_response.item}
+
+    expected = sample.UniformSampleAccumulator()
+    for i in range(300):
+        expected.add(i)
+    assert list(items["epoch"].values_int) == list(expected.get())
+    assert list(items["loss"].values_float) == [v * 0.5 for v in expected.get()]
+
+
+def test_summary_update_remove(mocked_run, mock_server, backend_interface, parse_ctx):
+    with backend_interface() as interface:
+        interface.publish_history(dict(a=1, b=2, c=dict(d=3, e=4)), step=0)
+        summary = pb.SummaryRecord()
+        summary.remove.add(key="a")
+        summary.remove.add(nested_key=["c", "d"])
+        interface._publish_summary(summary)
+        interface.publish_history(dict(b=5), step=1)
+
+    summary = parse_ctx(mock_server.ctx).summary
+    assert summary == dict(b=5, c=dict(e=4), _step=1)
+
+
+def test_send_run_from_sync_setup(runner, mock_server):
+    with runner.isolated_filesystem():
+        sm = sender.SendManager.setup(os.getcwd())
+        run = pb.RunRecord(run_id="abc123", project="test")
+        sm.send(sm._interface._make_record(run=run))
+        assert sm._fs is not None
+        sm.finish()
+
+    assert mock_server.ctx["upsert_bucket_count"] == 1
+
+
 def test_sync_spell_run(mocked_run, mock_server, backend_interface, parse_ctx):
     try:
         os.environ["SPELL_RUN_URL"] = "https://spell.run/foo"
@@ -458,3 +539,54 @@ def test_exit_poll_local(
         assert not out_of_date
     else:
         assert out_of_date == outdated
+
+
+def test_history_with_media_encoded_in_background(
+    publish_util, mocked_run, monkeypatch
+):
+    monkeypatch.setenv("WANDB_MEDIA_ENCODE_THREADS", "2")
+    monkeypatch.setattr(wandb.sdk.lib.media_pool, "_media_pool", None)
+    history = [
+        dict(
+            run=mocked_run,
+            step=step,
+            data=dict(image=wandb.Image(np.full((8, 8), step, dtype=np.uint8))),
+        )
+        for step in range(5)
+    ]
+    ctx_util = publish_util(
+        history=history, end_cb=lambda interface: interface.flush_history()
+    )
+
+    assert [row["_step"] for row in ctx_util.history] == list(range(5))
+    for row in ctx_util.history:
+        assert row["image"]["_type"] == "image-file"
+        assert os.path.exists(os.path.join(mocked_run.dir, row["image"]["path"]))
+
+
+def test_history_serialized_before_media_is_encoded(
+    mocked_run, mock_server, backend_interface, parse_ctx, monkeypatch
+):
+    monkeypatch.setenv("WANDB_MEDIA_ENCODE_THREADS", "1")
+    monkeypatch.setattr(wandb.sdk.lib.media_pool, "_media_pool", None)
+    # hold the only media thread, so the image stays queued for encoding
+    unblock = threading.Event()
+    wandb.sdk.lib.media_pool.get_media_pool().submit(unblock.wait, 0)
+
+    with backend_interface() as interface:
+        values = np.zeros(3)
+        image = wandb.Image(np.zeros((8, 8), dtype=np.uint8))
+        interface.publish_history(
+            dict(image=image, values=values, _step=0), step=0, run=mocked_run
+        )
+        values[:] = 1
+        with pytest.raises(TypeError):
+            interface.publish_history(
+                dict(bad=object(), _step=1), step=1, run=mocked_run
+            )
+        unblock.set()
+        interface.flush_history()
+
+    history = parse_ctx(mock_server.ctx).history
+    assert history[0]["values"] == [0, 0, 0]
+    assert history[0]["image"]["_type"] == "image-file"
@@ -1,3 +1,4 @@
+import numpy as np
 import wandb
 import pytest
 
@@ -184,3 +185,65 @@ def test_fk_from_pk_local_draft():
             for row in table.data
         ]
     )
+
+
+def test_table_from_numpy():
+    ids = np.arange(4)
+    embeddings = np.random.rand(4, 3)
+    table = wandb.Table.from_numpy({"id": ids, "embedding": embeddings})
+    assert table.get_column("id", convert_to="numpy") is ids
+    assert table.get_column("embedding", convert_to="numpy") is embeddings
+
+    by_row = wandb.Table(columns=["id", "embedding"])
+    for row in zip(ids, embeddings):
+        by_row.add_data(*row)
+    assert table._column_types == by_row._column_types
+    assert table == by_row
+
+
+def test_table_add_rows():
+    table = wandb.Table(columns=["a", "b"], data=np.zeros((2, 2)))
+    table.add_rows(np.array([[1.0, np.nan]]))
+    assert table.get_column("a", convert_to="numpy").tolist() == [0, 0, 1]
+
+    artifact = wandb.Artifact("table", "dataset")
+    assert table.to_json(artifact)["data"] == [[0, 0], [0, 0], [1, None]]
+
+    table.add_rows([[2, None], [3, 4]])
+    assert table.data[-2:] == [[2, None], [3, 4]]
+    with pytest.raises(TypeError):
+        table.add_rows([["x", 1]])
+    with pytest.raises(ValueError):
+        table.add_rows(np.ones((1, 3)))
+    assert len(table.data) == 5
+
+
+def test_table_add_rows_nan_in_required_column():
+    table = wandb.Table(columns=["a", "b"], dtype=[float, float], optional=False)
+    table.add_rows(np.array([[1.0, 2.0]]))
+    with pytest.raises(TypeError):
+        table.add_data(1.0, np.nan)
+    with pytest.raises(TypeError):
+        table.add_rows(np.array([[1.0, np.nan]]))
+    with pytest.raises(TypeError):
+        wandb.Table.from_numpy({"a": np.array([1.0, np.nan])}, optional=False)
+    assert len(table.data) == 1
+
+
+def test_table_nan_in_required_column_from_rows():
+    import pandas as pd
+
+    # nan in numpy data has always been typed as a Number, row by row
+    df = pd.DataFrame({"a": [1, 2], "b": [1.0, np.nan]})
+    table = wandb.Table(dataframe=df, optional=False)
+    b_type = table._column_types.params["type_map"]["b"]
+    assert b_type == wandb.data_types._dtypes.NumberType()
+    ndarray = np.array([[1.0, np.nan]])
+    table = wandb.Table(columns=["a", "b"], data=ndarray, optional=False)
+    b_type = table._column_types.params["type_map"]["b"]
+    assert b_type == wandb.data_types._dtypes.NumberType()
+
+    b = np.array(["x", float("nan")], dtype=object)
+    df = pd.DataFrame({"a": [1, 2], "b": b})
+    with pytest.raises(TypeError, match="Data row contained incompatible types"):
+        wandb.Table(dataframe=df, optional=False)
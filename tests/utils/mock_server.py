@@ -5,6 +5,7 @@ import os
 import sys
 import re
 from datetime import datetime, timedelta
+import gzip
 import json
 import platform
 import yaml
@@ -54,6 +55,7 @@ def default_ctx():
         "resume": None,
         "file_bytes": {},
         "manifests_created": [],
+        "artifact_files_created": [],
         "artifacts": {},
         "artifacts_by_id": {},
         "artifacts_created": {},
@@ -83,6 +85,7 @@ def default_ctx():
         "used_artifact_info": None,
         "invalid_launch_spec_project": False,
         "n_sweep_runs": 0,
+        "history_last_step": None,
     }
 
 
@@ -167,6 +170,9 @@ def run(ctx):
             "edges": [{"node": fileNode,}]
         },
         "sampledHistory": [[{"loss": 0, "acc": 100}, {"loss": 1, "acc": 0}]],
+        "historyKeys": {"lastStep": ctx["history_last_step"]}
+        if ctx["history_last_step"] is not None
+        else None,
         "shouldStop": False,
         "failed": False,
         "stopped": stopped,
@@ -410,27 +416,29 @@ def create_app(user_ctx=None):
         if body["variables"].get("files"):
             requested_file = body["variables"]["files"][0]
             ctx["requested_file"] = requested_file
-            url = base_url + "/storage?file={}&run={}".format(
-                urllib.parse.quote(requested_file), ctx["current_run"]
-            )
+            ctx["upload_urls_requests"] = ctx.get("upload_urls_requests", [])
+            ctx["upload_urls_requests"].append(list(body["variables"]["files"]))
+            edges = []
+            for requested_file in body["variables"]["files"]:
+                url = base_url + "/storage?file={}&run={}".format(
+                    urllib.parse.quote(requested_file), ctx["current_run"]
+                )
+                edges.append(
+                    {
+                        "node": {
+                            "name": requested_file,
+                            "url": url,
+                            "directUrl": url + "&direct=true",
+                        }
+                    }
+                )
             return json.dumps(
                 {
                     "data": {
                         "model": {
                             "bucket": {
                                 "id": "storageid",
-                                "files": {
-                                    "uploadHeaders": [],
-                                    "edges": [
-                                        {
-                                            "node": {
-                                                "name": requested_file,
-                                                "url": url,
-                                                "directUrl": url + "&direct=true",
-                                            }
-                                        }
-                                    ],
-                                },
+                                "files": {"uploadHeaders": [], "edges": edges},
                             }
                         }
                     }
@@ -497,6 +505,8 @@ def create_app(user_ctx=None):
                     }
                 }
             )
+        if "query SampledHistoryPage(" in body["query"]:
+            return json.dumps({"data": {"project": {"run": run(ctx)}}})
         if "query Run(" in body["query"]:
             # if querying state of run, change context from running to finished
             if "RunFragment" not in body["query"] and "state" in body["query"]:
@@ -859,20 +869,15 @@ def create_app(user_ctx=None):
             _id = body.get("variables", {}).get("digest", "")
             if _id != "":
                 ctx.get("artifacts_by_id")[_id] = body["variables"]
-            return {
-                "data": {
-                    "createArtifact": {
-                        "artifact": artifact(
-                            ctx,
-                            collection_name,
-                            id_override=_id,
-                            state="COMMITTED"
-                            if "PENDING" not in collection_name
-                            else "PENDING",
-                        )
-                    }
-                }
-            }
+            art = artifact(
+                ctx,
+                collection_name,
+                id_override=_id,
+                state="COMMITTED" if "PENDING" not in collection_name else "PENDING",
+            )
+            if ctx.get("latest_artifact"):
+                art["artifactSequence"]["latestArtifact"] = ctx["latest_artifact"]
+            return {"data": {"createArtifact": {"artifact": art}}}
         if "mutation DeleteArtifact(" in body["query"]:
             id = body["variables"]["artifactID"]
             delete_aliases = body["variables"]["deleteAliases"]
@@ -921,22 +926,31 @@ def create_app(user_ctx=None):
         if "mutation CreateArtifactFiles" in body["query"]:
             if ART_EMU:
                 return ART_EMU.create_files(variables=body["variables"])
+            ctx["artifact_files_created"].extend(
+                file["name"] for file in body["variables"]["artifactFiles"]
+            )
             return {
                 "data": {
-                    "files": [
-                        {
-                            "node": {
-                                "id": idx,
-                                "name": file["name"],
-                                "uploadUrl": "",
-                                "uploadheaders": [],
-                                "artifact": {"id": file["artifactID"]},
-                            }
-                            for idx, file in enumerate(
-                                body["variables"]["artifactFiles"]
-                            )
+                    "createArtifactFiles": {
+                        "files": {
+                            "edges": [
+                                {
+                                    "node": {
+                                        "id": idx,
+                                        "name": file["name"],
+                                        "displayName": file["name"],
+                                        "uploadUrl": base_url
+                                        + "/storage?file={}".format(file["name"]),
+                                        "uploadHeaders": [],
+                                        "artifact": {"id": file["artifactID"]},
+                                    }
+                                }
+                                for idx, file in enumerate(
+                                    body["variables"]["artifactFiles"]
+                                )
+                            ]
                         }
-                    ],
+                    }
                 }
             }
         if "mutation CommitArtifact(" in body["query"]:
@@ -1071,6 +1085,16 @@ def create_app(user_ctx=None):
             if "wb_validation_data" in body["variables"]["name"]:
                 art["artifactType"] = {"id": 4, "name": "validation_dataset"}
             return {"data": {"project": {"artifact": art}}}
+        if "query ArtifactManifestURL(" in body["query"]:
+            return {
+                "data": {
+                    "artifact": artifact(
+                        ctx,
+                        request_url_root=base_url,
+                        id_override=body["variables"]["id"],
+                    )
+                }
+            }
         if "query ArtifactManifest(" in body["query"]:
             art = artifact(ctx)
             art["currentManifest"] = {
@@ -1703,9 +1727,14 @@ index 30d74d2..9a2c773 100644
     def file_stream(entity, project, run):
         ctx = get_ctx()
         run_ctx = get_run_ctx(run)
+        if request.headers.get("Content-Encoding") == "gzip":
+            body = json.loads(gzip.decompress(request.get_data()))
+            ctx["file_stream_gzip"] = ctx.get("file_stream_gzip", 0) + 1
+        else:
+            body = request.get_json()
         for c in ctx, run_ctx:
             c["file_stream"] = c.get("file_stream", [])
-            c["file_stream"].append(request.get_json())
+            c["file_stream"].append(body)
         response = json.dumps({"exitcode": None, "limits": {}})
 
         inject = InjectRequestsParse(ctx).find(request=request)
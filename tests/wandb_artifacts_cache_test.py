@@ -1,5 +1,6 @@
 import os
 import base64
+import pytest
 import time
 import random
 from multiprocessing import Pool
@@ -118,3 +119,288 @@ def test_artifacts_cache_cleanup_tmp_files(runner):
         reclaimed_bytes = cache.cleanup(10000)
 
         assert reclaimed_bytes == 1000
+
+
+def _write_old_file(path, contents):
+    with open(path, "w") as f:
+        f.write(contents)
+    # older than the racy window, like any file that was not just written
+    old = time.time() - 60
+    os.utime(path, (old, old))
+
+
+def _count_hashing(mocker):
+    hashed = []
+    md5_files_b64 = wandb_sdk.interface.artifacts.FileHasher.md5_files_b64
+
+    def counting_md5_files_b64(self, paths, sizes=None):
+        hashed.extend(paths)
+        return md5_files_b64(self, paths, sizes)
+
+    mocker.patch.object(
+        wandb_sdk.interface.artifacts.FileHasher,
+        "md5_files_b64",
+        counting_md5_files_b64,
+    )
+    return hashed
+
+
+def test_digest_index_skips_unchanged_files(runner, mocker):
+    with runner.isolated_filesystem():
+        cache = wandb_sdk.wandb_artifacts.ArtifactsCache("cache")
+        _write_old_file("a.txt", "hello")
+        _write_old_file("b.txt", "world")
+        hashed = _count_hashing(mocker)
+
+        first = cache.md5_files_b64(["a.txt", "b.txt"])
+        assert len(hashed) == 2
+        assert first[0] == "XUFAKrxLKna5cZ2REBfFkg=="
+
+        # a new cache object reads the index from disk
+        cache = wandb_sdk.wandb_artifacts.ArtifactsCache("cache")
+        assert cache.md5_files_b64(["a.txt", "b.txt"]) == first
+        assert cache.md5_file_b64(os.path.abspath("b.txt")) == first[1]
+        assert len(hashed) == 2
+
+
+def test_digest_index_invalidated_by_change(runner, mocker):
+    with runner.isolated_filesystem():
+        cache = wandb_sdk.wandb_artifacts.ArtifactsCache("cache")
+        _write_old_file("a.txt", "hello")
+        _write_old_file("b.txt", "hello")
+        cache.md5_files_b64(["a.txt", "b.txt"])
+        hashed = _count_hashing(mocker)
+
+        # same size, different mtime
+        _write_old_file("a.txt", "HELLO")
+        os.utime("a.txt", (time.time() - 30, time.time() - 30))
+        # same mtime, different size
+        stat = os.stat("b.txt")
+        with open("b.txt", "a") as f:
+            f.write("!")
+        os.utime("b.txt", ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        digests = cache.md5_files_b64(["a.txt", "b.txt"])
+        assert len(hashed) == 2
+        assert digests == [
+            wandb_sdk.interface.artifacts.md5_string("HELLO"),
+            wandb_sdk.interface.artifacts.md5_string("hello!"),
+        ]
+
+
+def test_digest_index_ignores_racy_files(runner, mocker):
+    with runner.isolated_filesystem():
+        cache = wandb_sdk.wandb_artifacts.ArtifactsCache("cache")
+        with open("a.txt", "w") as f:
+            f.write("hello")
+        hashed = _count_hashing(mocker)
+        cache.md5_file_b64("a.txt")
+        cache.md5_file_b64("a.txt")
+        assert len(hashed) == 2
+
+
+def test_digest_index_rebuilds_corrupt_index(runner, mocker):
+    with runner.isolated_filesystem():
+        os.makedirs(os.path.join("cache", "index"))
+        with open(os.path.join("cache", "index", "md5.db"), "w") as f:
+            f.write("this is not a database" * 100)
+        cache = wandb_sdk.wandb_artifacts.ArtifactsCache("cache")
+        _write_old_file("a.txt", "hello")
+        cache.md5_file_b64("a.txt")
+        hashed = _count_hashing(mocker)
+        assert cache.md5_file_b64("a.txt") == "XUFAKrxLKna5cZ2REBfFkg=="
+        assert len(hashed) == 0
+
+
+def test_artifacts_cache_cleanup_keeps_index(runner):
+    with runner.isolated_filesystem():
+        cache = wandb_sdk.wandb_artifacts.ArtifactsCache("cache")
+        _write_old_file("a.txt", "hello")
+        cache.md5_file_b64("a.txt")
+        cache.cleanup(0)
+        assert os.path.exists(os.path.join("cache", "index", "md5.db"))
+
+
+def _write_files(sizes):
+    paths = []
+    for i, size in enumerate(sizes):
+        path = "file%d.bin" % i
+        with open(path, "wb") as f:
+            f.write(os.urandom(size))
+        paths.append(path)
+    return paths
+
+
+def test_file_hasher(runner):
+    with runner.isolated_filesystem():
+        paths = _write_files([0, 10, 1000, 5000, 20000, 100, 70000, 3])
+        expected = [wandb_sdk.interface.artifacts.md5_file_b64(p) for p in paths]
+        for workers in (1, 4):
+            hasher = wandb_sdk.interface.artifacts.FileHasher(
+                max_workers=workers, large_file_bytes=4096
+            )
+            hasher.BATCH_FILES = 2
+            assert hasher.md5_files_b64(paths) == expected
+            stats = hasher.last_stats
+            assert stats.files == len(paths)
+            assert stats.bytes == sum(os.path.getsize(p) for p in paths)
+            assert "MB/s" in str(stats) and "files/s" in str(stats)
+
+
+def test_file_hasher_workers_from_env(runner, monkeypatch):
+    monkeypatch.setenv("WANDB_ARTIFACT_HASH_WORKERS", "3")
+    hasher = wandb_sdk.interface.artifacts.FileHasher()
+    assert hasher._max_workers == 3
+
+
+def test_file_hasher_missing_file(runner):
+    with runner.isolated_filesystem():
+        paths = _write_files([10, 10, 10])
+        os.remove(paths[1])
+        hasher = wandb_sdk.interface.artifacts.FileHasher(max_workers=2)
+        with pytest.raises(OSError):
+            hasher.md5_files_b64(paths, sizes=[10, 10, 10])
+
+
+@pytest.mark.parametrize("strategy", ["copy", "reflink", "hardlink", "symlink"])
+def test_materialize_file(runner, strategy):
+    with runner.isolated_filesystem():
+        _write_old_file("src.txt", "hello")
+        # an old hardlink at the target must be replaced, not written through
+        _write_old_file("old.txt", "old")
+        os.link("old.txt", "dst.txt")
+
+        used = wandb_sdk.interface.artifacts.materialize_file(
+            "src.txt", "dst.txt", strategy
+        )
+
+        assert used == strategy or used in ("copy", "reflink")
+        with open("dst.txt") as f:
+            assert f.read() == "hello"
+        with open("old.txt") as f:
+            assert f.read() == "old"
+        assert os.stat("dst.txt").st_mtime == os.stat("src.txt").st_mtime
+        assert os.path.islink("dst.txt") == (used == "symlink")
+        assert os.path.samefile("src.txt", "dst.txt") == (
+            used in ("hardlink", "symlink")
+        )
+        assert sorted(os.listdir(".")) == ["dst.txt", "old.txt", "src.txt"]
+
+
+def test_materialize_file_falls_back_to_copy(runner, mocker):
+    with runner.isolated_filesystem():
+        _write_old_file("src.txt", "hello")
+        mocker.patch("os.link", side_effect=OSError("cross-device link"))
+        used = wandb_sdk.interface.artifacts.materialize_file(
+            "src.txt", "dst.txt", "hardlink"
+        )
+        assert used in ("copy", "reflink")
+        with open("dst.txt") as f:
+            assert f.read() == "hello"
+        assert not os.path.samefile("src.txt", "dst.txt")
+
+
+def test_materialize_strategy_from_env(monkeypatch):
+    materialize_strategy = wandb_sdk.interface.artifacts.materialize_strategy
+    monkeypatch.delenv("WANDB_ARTIFACT_MATERIALIZE", raising=False)
+    assert materialize_strategy() == "reflink"
+    monkeypatch.setenv("WANDB_ARTIFACT_MATERIALIZE", "Hardlink")
+    assert materialize_strategy() == "hardlink"
+    assert materialize_strategy("symlink") == "symlink"
+    monkeypatch.setenv("WANDB_ARTIFACT_MATERIALIZE", "bogus")
+    assert materialize_strategy() == "copy"
+
+
+def test_artifacts_cache_cleanup_keeps_linked_files(runner):
+    with runner.isolated_filesystem():
+        cache = wandb_sdk.wandb_artifacts.ArtifactsCache("cache")
+        paths = []
+        for name in ("plain", "hard", "soft"):
+            md5 = base64.b64encode(name.encode("ascii"))
+            path, _, opener = cache.check_md5_obj_path(md5, 100)
+            with opener() as f:
+                f.write(name * 100)
+            paths.append(path)
+        os.mkdir("download")
+        assert cache.materialize(paths[1], "download/hard", "hardlink") == "hardlink"
+        assert cache.materialize(paths[2], "download/soft", "symlink") == "symlink"
+
+        assert cache.cleanup(0) == 500
+        assert not os.path.exists(paths[0])
+        with open("download/hard") as f:
+            assert f.read() == "hard" * 100
+        with open("download/soft") as f:
+            assert f.read() == "soft" * 100
+
+        # once the links are gone the cached files can be removed
+        os.remove("download/hard")
+        os.remove("download/soft")
+        assert cache.cleanup(0) == 800
+        assert not os.path.exists(paths[1]) and not os.path.exists(paths[2])
+
+
+def _write_cache_files(cache, sizes, start=0):
+    paths = []
+    for i, size in enumerate(sizes, start):
+        md5 = base64.b64encode(("file%d" % i).encode("ascii"))
+        path, _, opener = cache.check_md5_obj_path(md5, size)
+        with opener() as f:
+            f.write("x" * size)
+        paths.append(path)
+        time.sleep(0.01)
+    return paths
+
+
+def test_artifacts_cache_cleanup_evicts_least_recently_used(runner, mocker):
+    with runner.isolated_filesystem():
+        cache = wandb_sdk.wandb_artifacts.ArtifactsCache("cache")
+        paths = _write_cache_files(cache, [1000, 2000, 3000])
+        # the first cleanup lists the cache to build the index
+        assert cache.cleanup(10000) == 0
+
+        # a hit makes the oldest file the most recently used
+        md5 = base64.b64encode("file0".encode("ascii"))
+        assert cache.check_md5_obj_path(md5, 1000)[1]
+        walk = mocker.patch("os.walk")
+        assert cache.cleanup(4000) == 2000
+        assert not walk.called
+        assert [os.path.exists(p) for p in paths] == [True, False, True]
+
+
+def test_artifacts_cache_cleanup_rescan(runner):
+    with runner.isolated_filesystem():
+        cache = wandb_sdk.wandb_artifacts.ArtifactsCache("cache")
+        _write_cache_files(cache, [1000])
+        assert cache.cleanup(10000) == 0
+        # written behind the index's back
+        path = os.path.join("cache", "obj", "md5", "ab", "cdef")
+        os.makedirs(os.path.dirname(path))
+        with open(path, "w") as f:
+            f.truncate(3000)
+        assert cache.cleanup(3500) == 0
+        # the new file is more recent, so the other one goes first
+        assert cache.cleanup(3500, rescan=True) == 1000
+        assert cache._object_index.status() == (3000, True)
+
+
+def test_artifacts_cache_background_eviction(runner):
+    with runner.isolated_filesystem():
+        cache = wandb_sdk.wandb_artifacts.ArtifactsCache("cache", max_size=2500)
+        # the first write builds the index in the background
+        paths = _write_cache_files(cache, [1000])
+        cache._evict_thread.join()
+        paths += _write_cache_files(cache, [1000], start=1)
+        assert cache._object_index.status() == (2000, True)
+
+        paths += _write_cache_files(cache, [1000], start=2)
+        cache._evict_thread.join()
+        assert [os.path.exists(p) for p in paths] == [False, True, True]
+        assert cache._object_index.status() == (2000, True)
+
+
+def test_artifacts_cache_max_size_from_env(runner, monkeypatch):
+    with runner.isolated_filesystem():
+        monkeypatch.setenv("WANDB_ARTIFACT_CACHE_MAX_SIZE", "2KB")
+        assert wandb_sdk.wandb_artifacts.ArtifactsCache("cache")._max_size == 2000
+        monkeypatch.setenv("WANDB_ARTIFACT_CACHE_MAX_SIZE", "lots")
+        assert wandb_sdk.wandb_artifacts.ArtifactsCache("cache")._max_size is None
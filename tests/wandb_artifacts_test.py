@@ -1,5 +1,6 @@
 import base64
 import hashlib
+import json
 import os
 import sys
 import pytest
@@ -174,6 +175,29 @@ def test_add_dir(runner):
         }
 
 
+def test_add_dir_unchanged_files_not_rehashed(runner, mocker):
+    with runner.isolated_filesystem():
+        os.mkdir("data")
+        for i in range(3):
+            with open(os.path.join("data", "file%d.txt" % i), "w") as f:
+                f.write("hello %d" % i)
+            old = time.time() - 60
+            os.utime(os.path.join("data", "file%d.txt" % i), (old, old))
+        artifact = wandb.Artifact(type="dataset", name="my-arty")
+        artifact.add_dir("data")
+        digest = artifact.digest
+
+        md5 = mocker.patch.object(
+            wandb.wandb_sdk.interface.artifacts.FileHasher,
+            "md5_files_b64",
+            side_effect=AssertionError("unchanged file hashed"),
+        )
+        artifact = wandb.Artifact(type="dataset", name="my-arty")
+        artifact.add_dir("data")
+        assert artifact.digest == digest
+        assert md5.call_count == 0
+
+
 def test_add_named_dir(runner):
     with runner.isolated_filesystem():
         open("file1.txt", "w").write("hello")
@@ -990,6 +1014,42 @@ def test_artifact_incremental_internal(
     assert manifests_created[0]["type"] == "INCREMENTAL"
 
 
+def test_artifact_incremental_uploads_delta(
+    runner, publish_util, mocked_run, mock_server
+):
+    with runner.isolated_filesystem():
+        for name, contents in [("same.txt", "same"), ("changed.txt", "new")]:
+            with open(name, "w") as f:
+                f.write(contents)
+        artifact = wandb.Artifact(
+            "incremental_delta_PENDING", "dataset", incremental=True
+        )
+        artifact.add_file("same.txt")
+        artifact.add_file("changed.txt")
+        base_id = util.generate_id()
+        base_contents = {
+            "same.txt": {"digest": artifact.manifest.entries["same.txt"].digest},
+            "changed.txt": {"digest": "old"},
+            "removed.txt": {"digest": "gone"},
+        }
+        cache = wandb.sdk.interface.artifacts.get_artifacts_cache()
+        _, _, cache_open = cache.check_manifest_path(base_id)
+        with cache_open() as f:
+            json.dump({"version": 1, "contents": base_contents}, f)
+        mock_server.ctx["latest_artifact"] = {"id": base_id, "versionIndex": 0}
+
+        artifact_publish = dict(run=mocked_run, artifact=artifact, aliases=["latest"])
+        publish_util(artifacts=[artifact_publish])
+
+    assert mock_server.ctx["artifact_files_created"] == ["changed.txt"]
+    path, hit, _ = cache.check_manifest_path(artifact.digest)
+    assert hit
+    with open(path) as f:
+        contents = json.load(f)["contents"]
+    assert sorted(contents) == ["changed.txt", "removed.txt", "same.txt"]
+    assert contents["changed.txt"]["digest"] != "old"
+
+
 def test_local_references(runner, live_mock_server, test_settings):
     run = wandb.init(settings=test_settings)
 
@@ -1199,3 +1259,188 @@ def test_communicate_artifact(publish_util, mocked_run):
     artifact_publish = dict(run=mocked_run, artifact=artifact, aliases=["latest"])
     ctx_util = publish_util(artifacts=[artifact_publish])
     assert len(set(ctx_util.manifests_created_ids)) == 1
+
+
+def mock_range_session(data, ranges=True, fail_ranges=(), error_ranges=()):
+    import requests
+
+    class Response(object):
+        def __init__(self, status_code, body, fail=False, error=False):
+            self.status_code = status_code
+            self.body = body
+            self.fail = fail
+            self.error = error
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            pass
+
+        def raise_for_status(self):
+            if self.error:
+                raise requests.exceptions.HTTPError("403 Forbidden")
+
+        def iter_content(self, chunk_size):
+            yield self.body[: len(self.body) // 2]
+            if self.fail:
+                raise requests.exceptions.ChunkedEncodingError("connection dropped")
+            yield self.body[len(self.body) // 2 :]
+
+    class Session(object):
+        def __init__(self):
+            self.ranges = []
+
+        def get(self, url, auth=None, headers=None, stream=False):
+            if not ranges or not headers:
+                return Response(200, data)
+            start, end = headers["Range"][len("bytes=") :].split("-")
+            start, end = int(start), int(end) + 1
+            self.ranges.append(start)
+            return Response(
+                206,
+                data[start:end],
+                fail=start in fail_ranges,
+                error=start in error_ranges,
+            )
+
+    return Session()
+
+
+def _load_large_file(policy, data):
+    class Parent(object):
+        entity = "entity"
+
+    digest = base64.b64encode(hashlib.md5(data).digest()).decode("ascii")
+    entry = wandb.wandb_sdk.wandb_artifacts.ArtifactManifestEntry(
+        "model.bin", None, digest=digest, size=len(data)
+    )
+    path = policy.load_file(Parent(), "model.bin", entry)
+    with open(path, "rb") as f:
+        assert f.read() == data
+    return path
+
+
+def test_load_file_ranges_resume(runner, monkeypatch):
+    monkeypatch.setattr(wandb.wandb_sdk.wandb_artifacts, "_RANGE_DOWNLOAD_MIN_BYTES", 0)
+    monkeypatch.setattr(wandb.wandb_sdk.wandb_artifacts, "_RANGE_PART_BYTES", 100)
+    monkeypatch.setattr(wandb.wandb_sdk.wandb_artifacts, "_RANGE_RETRIES", 0)
+    with runner.isolated_filesystem():
+        data = os.urandom(950)
+        policy = wandb.wandb_sdk.wandb_artifacts.WandbStoragePolicy()
+        policy._session = mock_range_session(data, fail_ranges=(300, 700))
+        with pytest.raises(Exception):
+            _load_large_file(policy, data)
+
+        # only the ranges that failed are downloaded again
+        policy._session = mock_range_session(data)
+        path = _load_large_file(policy, data)
+        assert sorted(policy._session.ranges) == [300, 700]
+        assert not [
+            name for name in os.listdir(os.path.dirname(path)) if name.startswith("tmp")
+        ]
+
+
+def test_load_file_ranges_not_supported(runner, monkeypatch):
+    monkeypatch.setattr(wandb.wandb_sdk.wandb_artifacts, "_RANGE_DOWNLOAD_MIN_BYTES", 0)
+    monkeypatch.setattr(wandb.wandb_sdk.wandb_artifacts, "_RANGE_PART_BYTES", 100)
+    with runner.isolated_filesystem():
+        data = os.urandom(450)
+        policy = wandb.wandb_sdk.wandb_artifacts.WandbStoragePolicy()
+        policy._session = mock_range_session(data, ranges=False)
+        path = _load_large_file(policy, data)
+        assert not [
+            name for name in os.listdir(os.path.dirname(path)) if name.startswith("tmp")
+        ]
+
+
+def test_load_file_ranges_error_removes_partial(runner, monkeypatch):
+    import requests
+
+    monkeypatch.setattr(wandb.wandb_sdk.wandb_artifacts, "_RANGE_DOWNLOAD_MIN_BYTES", 0)
+    monkeypatch.setattr(wandb.wandb_sdk.wandb_artifacts, "_RANGE_PART_BYTES", 100)
+    with runner.isolated_filesystem():
+        data = os.urandom(450)
+        policy = wandb.wandb_sdk.wandb_artifacts.WandbStoragePolicy()
+        policy._session = mock_range_session(data, error_ranges=(200,))
+        with pytest.raises(requests.exceptions.HTTPError):
+            _load_large_file(policy, data)
+        digest = base64.b64encode(hashlib.md5(data).digest()).decode("ascii")
+        path, hit, _ = policy._cache.check_md5_obj_path(digest, len(data))
+        assert not hit
+        partial_path = policy._cache.partial_path(path)
+        assert not os.path.exists(partial_path)
+        assert not os.path.exists(partial_path + ".done")
+
+
+def test_load_file_ranges_in_use(runner, monkeypatch):
+    monkeypatch.setattr(wandb.wandb_sdk.wandb_artifacts, "_RANGE_DOWNLOAD_MIN_BYTES", 0)
+    monkeypatch.setattr(wandb.wandb_sdk.wandb_artifacts, "_RANGE_PART_BYTES", 100)
+    with runner.isolated_filesystem():
+        data = os.urandom(450)
+        policy = wandb.wandb_sdk.wandb_artifacts.WandbStoragePolicy()
+        policy._session = mock_range_session(data)
+        digest = base64.b64encode(hashlib.md5(data).digest()).decode("ascii")
+        path, _, _ = policy._cache.check_md5_obj_path(digest, len(data))
+        partial_path = policy._cache.partial_path(path)
+        # another download of the same object holds the partial file, so this
+        # one downloads the file on its own
+        with wandb.wandb_sdk.wandb_artifacts._lock_partial(partial_path):
+            _load_large_file(policy, data)
+            assert policy._session.ranges == []
+            assert not os.path.exists(partial_path)
+        assert not os.path.exists(partial_path + ".lock")
+
+
+def test_manifest_entries_are_loaded_lazily():
+    contents = {
+        "data/%03d.txt" % i: {"digest": "digest%d" % i, "size": i} for i in range(100)
+    }
+    contents["data/ref.txt"] = {"digest": "ref", "ref": "s3://bucket/ref.txt"}
+    contents["other.txt"] = {"digest": "other", "size": 5, "extra": {"a": 1}}
+    manifest_json = {
+        "version": 1,
+        "storagePolicy": "wandb-storage-policy-v1",
+        "storagePolicyConfig": {},
+        "contents": contents,
+    }
+    manifest = wandb.wandb_sdk.wandb_artifacts.ArtifactManifestV1.from_manifest_json(
+        None, manifest_json
+    )
+    eager = wandb.wandb_sdk.wandb_artifacts.ArtifactManifestV1(
+        None, manifest.storage_policy
+    )
+    for path, val in contents.items():
+        eager.add_entry(
+            wandb.wandb_sdk.wandb_artifacts.ArtifactManifestEntry(
+                path,
+                val.get("ref"),
+                digest=val["digest"],
+                size=val.get("size"),
+                extra=val.get("extra"),
+            )
+        )
+
+    assert manifest.to_manifest_json() == manifest_json
+    assert manifest.digest() == eager.digest()
+    assert manifest.entries.total_size() == sum(range(100)) + 5
+    assert len(manifest.entries) == 102 and "data/ref.txt" in manifest.entries
+    assert not manifest.entries._objects
+
+    entries = manifest.get_entries_in_directory("data")
+    assert len(entries) == 101
+    assert manifest.entries["data/ref.txt"].ref == "s3://bucket/ref.txt"
+    assert manifest.get_entries_in_directory("dat") == []
+
+    # looked up entries are kept, so changes to them are saved
+    manifest.entries["other.txt"].ref = "s3://bucket/other.txt"
+    del manifest.entries["data/000.txt"]
+    manifest.add_entry(
+        wandb.wandb_sdk.wandb_artifacts.ArtifactManifestEntry(
+            "data/new.txt", None, digest="new"
+        )
+    )
+    contents = manifest.to_manifest_json()["contents"]
+    assert contents["other.txt"]["ref"] == "s3://bucket/other.txt"
+    assert "data/000.txt" not in contents and "data/new.txt" in contents
+    assert len(manifest.get_entries_in_directory("data")) == 101
@@ -134,6 +134,9 @@ class Api(object):
     def upload_file_retry(self, *args, **kwargs):
         return self.api.upload_file_retry(*args, **kwargs)
 
+    def upload_multipart_file(self, *args, **kwargs):
+        return self.api.upload_multipart_file(*args, **kwargs)
+
     def get_run_info(self, *args, **kwargs):
         return self.api.get_run_info(*args, **kwargs)
 
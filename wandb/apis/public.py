@@ -10,14 +10,15 @@ You might use the Public API to
 
 For more on using the Public API, check out [our guide](https://docs.wandb.com/guides/track/public-api-guide).
 """
+import collections
+import concurrent.futures
+import csv
 import datetime
-from functools import partial
 import json
 import logging
 import os
 import platform
 import re
-import shutil
 import tempfile
 import time
 from typing import Optional
@@ -80,6 +81,61 @@ RUN_FRAGMENT = """fragment RunFragment on Run {
     historyKeys
 }"""
 
+# Run attributes named differently from the RUN_FRAGMENT field they come from
+_RUN_FIELD_ALIASES = {
+    "id": "name",
+    "storage_id": "id",
+    "name": "displayName",
+    "display_name": "displayName",
+    "summary": "summaryMetrics",
+    "rawconfig": "config",
+}
+# Fields every Run needs, whatever it was projected to
+_RUN_REQUIRED_FIELDS = {"id", "name", "state", "sweepName"}
+_RUN_FRAGMENT_FIELDS = frozenset(re.findall(r"^    (\w+)", RUN_FRAGMENT, re.M))
+
+
+def _run_fragment_field(attr):
+    """The RUN_FRAGMENT field a run attribute, in snake or camel case, comes from,
+    or None if it doesn't come from one.
+    """
+    parts = attr.split("_")
+    key = _RUN_FIELD_ALIASES.get(
+        attr, parts[0] + "".join(part.title() for part in parts[1:])
+    )
+    return key if key in _RUN_FRAGMENT_FIELDS else None
+
+
+def _run_fragment(fields):
+    """RUN_FRAGMENT with only the fields the given run attributes come from.
+
+    Attributes may be given in snake or camel case, or as "summary.loss" or
+    "config.lr", which select the summary or config field. Attributes that are
+    not fetched, like url or path, are accepted and select nothing.
+    """
+    selected = set(_RUN_REQUIRED_FIELDS)
+    for field in fields:
+        attr = field.split(".", 1)[0]
+        key = _run_fragment_field(attr)
+        if key is not None:
+            selected.add(key)
+        elif not hasattr(Run, attr):
+            raise ValueError("Unknown run field: {}".format(field))
+
+    lines = []
+    keep = True
+    for line in RUN_FRAGMENT.splitlines():
+        if line.startswith("    ") and not line.startswith("     "):
+            token = line.split()[0]
+            if token != "}":
+                keep = token in selected
+        elif not line.startswith("    "):
+            keep = True
+        if keep:
+            lines.append(line)
+    return "\n".join(lines)
+
+
 FILE_FRAGMENT = """fragment RunFilesFragment on Run {
     files(names: $fileNames, after: $fileCursor, first: $fileLimit) {
         edges {
@@ -610,7 +666,15 @@ class Api(object):
         res = self._client.execute(self.USERS_QUERY, {"query": username_or_email})
         return [User(self._client, edge["node"]) for edge in res["users"]["edges"]]
 
-    def runs(self, path=None, filters=None, order="-created_at", per_page=50):
+    def runs(
+        self,
+        path=None,
+        filters=None,
+        order="-created_at",
+        per_page=50,
+        fields=None,
+        prefetch=False,
+    ):
         """
         Return a set of runs from a project that match the filters provided.
 
@@ -639,6 +703,12 @@ class Api(object):
             api.runs(path="my_entity/my_project", order="+summary_metrics.loss")
             ```
 
+            List the names and losses of all runs in my_project, fetching only those
+            ```
+            for run in api.runs(path="my_entity/my_project", fields=["name", "summary.loss"], prefetch=True):
+                print(run.name, run.summary_metrics.get("loss"))
+            ```
+
         Arguments:
             path: (str) path to project, should be in the form: "entity/project"
             filters: (dict) queries for specific runs using the MongoDB query language.
@@ -651,13 +721,19 @@ class Api(object):
                 If you prepend order with a + order is ascending.
                 If you prepend order with a - order is descending (default).
                 The default order is run.created_at from newest to oldest.
+            fields: (list) run attributes to fetch, eg. ["name", "state", "summary.loss"].
+                "summary.*" and "config.*" fetch the whole summary or config. Other
+                attributes are fetched the first time they are used. All attributes
+                are fetched by default.
+            prefetch: (bool) fetch the next page of runs in the background while the
+                current one is iterated over.
 
         Returns:
             A `Runs` object, which is an iterable collection of `Run` objects.
         """
         entity, project = self._parse_project_path(path)
         filters = filters or {}
-        key = (path or "") + str(filters) + str(order)
+        key = (path or "") + str(filters) + str(order) + str(fields) + str(prefetch)
         if not self._runs.get(key):
             self._runs[key] = Runs(
                 self.client,
@@ -666,9 +742,80 @@ class Api(object):
                 filters=filters,
                 order=order,
                 per_page=per_page,
+                fields=fields,
+                prefetch=prefetch,
             )
         return self._runs[key]
 
+    def export_history(
+        self,
+        runs,
+        keys,
+        path,
+        format="parquet",
+        page_size=1000,
+        max_workers=8,
+        chunk_rows=100000,
+    ):
+        """
+        Export the sampled history of many runs to a single parquet or csv file.
+
+        The history of up to `max_workers` runs is fetched at a time, each run's pages
+        are decoded into a column per key, and the columns are written to `path` every
+        `chunk_rows` rows, so memory use does not grow with the number of runs.
+
+        Example:
+            Export the loss of all runs of a sweep
+            ```python
+            api = wandb.Api()
+            sweep = api.sweep("my_entity/my_project/sweep_id")
+            api.export_history(sweep.runs, ["_step", "loss"], "loss.parquet")
+            ```
+
+        Arguments:
+            runs: (iterable) the `Run` objects to export, eg. the result of `api.runs`.
+            keys: ([str]) the history keys to export, only rows that have all of them
+                defined are exported.
+            path: (str) the file to write.
+            format: (str) "parquet", which requires pyarrow, or "csv".
+            page_size: (int) size of the pages of history to fetch.
+            max_workers: (int) number of runs to fetch history for concurrently.
+            chunk_rows: (int) number of rows to buffer before writing them.
+
+        Returns:
+            The number of rows written. Besides the keys, each row has a `run_id`
+            column. In parquet, a key whose values are all numbers or missing is
+            written as a float column. Any other key is written as strings, with
+            non string values as JSON.
+        """
+        if (
+            not isinstance(keys, list)
+            or not keys
+            or not all(isinstance(key, str) for key in keys)
+        ):
+            raise ValueError("keys must be a non empty list of strings")
+        if format == "parquet":
+            writer = _ParquetHistoryWriter(path, keys, chunk_rows)
+        elif format == "csv":
+            writer = _CsvHistoryWriter(path, keys, chunk_rows)
+        else:
+            raise ValueError("format must be one of parquet, csv")
+
+        with writer, concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+            # runs are written in order, at most 2 * max_workers are held at once
+            pending = collections.deque()
+            for run in runs:
+                pending.append(
+                    (run.id, executor.submit(_history_columns, run, keys, page_size))
+                )
+                if len(pending) >= 2 * max_workers:
+                    run_id, columns = pending.popleft()
+                    writer.add(run_id, columns.result())
+            while pending:
+                run_id, columns = pending.popleft()
+                writer.add(run_id, columns.result())
+        return writer.rows
+
     @normalize_exceptions
     def run(self, path=""):
         """
@@ -1282,8 +1429,7 @@ class Runs(Paginator):
     This is generally used indirectly via the `Api`.runs method
     """
 
-    QUERY = gql(
-        """
+    QUERY_TEMPLATE = """
         query Runs($project: String!, $entity: String!, $cursor: String, $perPage: Int = 50, $order: String, $filters: JSONString) {
             project(name: $project, entityName: $entity) {
                 runCount(filters: $filters)
@@ -1304,15 +1450,30 @@ class Runs(Paginator):
         }
         %s
         """
-        % RUN_FRAGMENT
-    )
+    QUERY = gql(QUERY_TEMPLATE % RUN_FRAGMENT)
 
-    def __init__(self, client, entity, project, filters={}, order=None, per_page=50):
+    def __init__(
+        self,
+        client,
+        entity,
+        project,
+        filters={},
+        order=None,
+        per_page=50,
+        fields=None,
+        prefetch=False,
+    ):
         self.entity = entity
         self.project = project
         self.filters = filters
         self.order = order
+        self.fields = fields
+        self.prefetch = prefetch
         self._sweeps = {}
+        self._prefetched = None
+        self._executor = None
+        if fields is not None:
+            self.QUERY = gql(self.QUERY_TEMPLATE % _run_fragment(fields))
         variables = {
             "project": self.project,
             "entity": self.entity,
@@ -1342,6 +1503,28 @@ class Runs(Paginator):
         else:
             return None
 
+    def _load_page(self):
+        if not self.more:
+            return False
+        if self._prefetched is None:
+            self.update_variables()
+            self.last_response = self.client.execute(
+                self.QUERY, variable_values=self.variables
+            )
+        else:
+            self.last_response = self._prefetched.result()
+            self._prefetched = None
+        if self.prefetch and self.more:
+            # fetch the next page while this one is converted and consumed
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+            self.update_variables()
+            self._prefetched = self._executor.submit(
+                self.client.execute, self.QUERY, variable_values=dict(self.variables)
+            )
+        self.objects.extend(self.convert_objects())
+        return True
+
     def convert_objects(self):
         objs = []
         if self.last_response is None or self.last_response.get("project") is None:
@@ -1353,6 +1536,7 @@ class Runs(Paginator):
                 self.project,
                 run_response["node"]["name"],
                 run_response["node"],
+                fields=self.fields,
             )
             objs.append(run)
 
@@ -1467,13 +1651,19 @@ class Run(Attrs):
         read_only (boolean): Whether the run is editable
         history_keys (str): Keys of the history metrics that have been logged
             with `wandb.log({key: value})`
+
+    config, summary and system metrics are decoded from JSON on first use. A run
+    listed with `api.runs(path, fields=[...])` only has the attributes it was
+    projected to, the rest are fetched the first time one of them is used.
     """
 
-    def __init__(self, client, entity, project, run_id, attrs={}):
+    def __init__(self, client, entity, project, run_id, attrs={}, fields=None):
         """
         Run is always initialized by calling api.runs() where api is an instance of wandb.Api
         """
         super(Run, self).__init__(dict(attrs))
+        self._fields = fields
+        self._raw_attrs = {}
         self.client = client
         self._entity = entity
         self.project = project
@@ -1596,6 +1786,7 @@ class Run(Attrs):
                 raise ValueError("Could not find run %s" % self)
             self._attrs = response["project"]["run"]
             self._state = self._attrs["state"]
+            self._fields = None
 
             if self.sweep_name and not self.sweep:
                 # There may be a lot of runs. Don't bother pulling them all
@@ -1608,29 +1799,46 @@ class Run(Attrs):
                     withRuns=False,
                 )
 
-        self._attrs["summaryMetrics"] = (
-            json.loads(self._attrs["summaryMetrics"])
-            if self._attrs.get("summaryMetrics")
-            else {}
-        )
-        self._attrs["systemMetrics"] = (
-            json.loads(self._attrs["systemMetrics"])
-            if self._attrs.get("systemMetrics")
-            else {}
-        )
+        # config, summary and system metrics are decoded in __getattr__
+        self._raw_attrs = {}
+        for key in ("summaryMetrics", "systemMetrics", "config"):
+            if key in self._attrs or not self._fields:
+                self._raw_attrs[key] = self._attrs.pop(key, None)
+        self._attrs.pop("rawconfig", None)
         if self._attrs.get("user"):
             self.user = User(self.client, self._attrs["user"])
+        return self._attrs
+
+    def _decode_attr(self, key):
+        value = self._raw_attrs.pop(key)
+        if key != "config":
+            self._attrs[key] = json.loads(value) if value else {}
+            return
         config_user, config_raw = {}, {}
-        for key, value in six.iteritems(json.loads(self._attrs.get("config") or "{}")):
-            config = config_raw if key in WANDB_INTERNAL_KEYS else config_user
-            if isinstance(value, dict) and "value" in value:
-                config[key] = value["value"]
+        for k, v in six.iteritems(json.loads(value or "{}")):
+            config = config_raw if k in WANDB_INTERNAL_KEYS else config_user
+            if isinstance(v, dict) and "value" in v:
+                config[k] = v["value"]
             else:
-                config[key] = value
+                config[k] = v
         config_raw.update(config_user)
         self._attrs["config"] = config_user
         self._attrs["rawconfig"] = config_raw
-        return self._attrs
+
+    def __getattr__(self, name):
+        raw_attrs = self.__dict__.get("_raw_attrs")
+        key = _RUN_FIELD_ALIASES.get(name, self.snake_to_camel(name))
+        if raw_attrs and key in raw_attrs:
+            self._decode_attr(key)
+        try:
+            return super(Run, self).__getattr__(name)
+        except AttributeError:
+            # only load what a projected run didn't fetch, not probes like
+            # _ipython_display_ or __deepcopy__
+            if not self.__dict__.get("_fields") or _run_fragment_field(name) is None:
+                raise
+        self.load(force=True)
+        return getattr(self, name)
 
     @normalize_exceptions
     def wait_until_finished(self):
@@ -2804,6 +3012,150 @@ class SampledHistoryScan(object):
         self.scan_offset = 0
 
 
+def _history_columns(run, keys, page_size):
+    """The sampled history of a run as a list of values per key."""
+    columns = {key: [] for key in keys}
+    scan = run.scan_history(keys=keys, page_size=page_size)
+    while scan.page_offset < scan.max_step:
+        scan._load_next()
+        for key, column in columns.items():
+            column.extend([row.get(key) for row in scan.rows])
+    return columns
+
+
+def _is_number(value):
+    return value is None or isinstance(value, (int, float))
+
+
+class _HistoryWriter(object):
+    """Buffers columns of history rows and writes them out every `chunk_rows` rows."""
+
+    def __init__(self, path, keys, chunk_rows):
+        self.path = path
+        self.keys = keys
+        self.chunk_rows = chunk_rows
+        self.rows = 0
+        self._columns = {key: [] for key in ["run_id"] + keys}
+        self._buffered = 0
+
+    def add(self, run_id, columns):
+        num_rows = len(columns[self.keys[0]])
+        self._columns["run_id"].extend([run_id] * num_rows)
+        for key in self.keys:
+            self._columns[key].extend(columns[key])
+        self._buffered += num_rows
+        if self._buffered >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        if self._buffered:
+            self._write(self._columns)
+            self.rows += self._buffered
+        self._columns = {key: [] for key in self._columns}
+        self._buffered = 0
+
+    def _write(self, columns):
+        raise NotImplementedError
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class _ParquetHistoryWriter(_HistoryWriter):
+    """Writes history columns to parquet, typing each key by its non null values.
+
+    A key is a null column until a value is seen, a float column while all values
+    are numbers and a string column otherwise. When a later chunk widens the type
+    of a key, the file written so far is rewritten a row group at a time with the
+    wider schema, so a key can be widened at most twice.
+    """
+
+    def __init__(self, path, keys, chunk_rows):
+        super(_ParquetHistoryWriter, self).__init__(path, keys, chunk_rows)
+        required = "Exporting history to parquet requires pyarrow, pip install pyarrow"
+        self._pa = util.get_module("pyarrow", required=required)
+        self._pq = util.get_module("pyarrow.parquet", required=required)
+        self._writer = None
+
+    def _schema(self, columns):
+        pa = self._pa
+        old_types = {}
+        if self._writer is not None:
+            old_types = {field.name: field.type for field in self._writer.schema}
+        fields = [pa.field("run_id", pa.string())]
+        for key in self.keys:
+            col_type = old_types.get(key, pa.null())
+            if col_type != pa.string():
+                values = [v for v in columns[key] if v is not None]
+                if not all(_is_number(v) for v in values):
+                    col_type = pa.string()
+                elif values:
+                    col_type = pa.float64()
+            fields.append(pa.field(key, col_type))
+        return pa.schema(fields)
+
+    def _rewrite(self, schema):
+        self._writer.close()
+        written_path = self.path + ".tmp"
+        os.replace(self.path, written_path)
+        self._writer = self._pq.ParquetWriter(self.path, schema)
+        for batch in self._pq.ParquetFile(written_path).iter_batches():
+            table = self._pa.Table.from_batches([batch]).cast(schema)
+            self._writer.write_table(table)
+        os.remove(written_path)
+
+    def _write(self, columns):
+        pa = self._pa
+        schema = self._schema(columns)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.path, schema)
+        elif not schema.equals(self._writer.schema):
+            self._rewrite(schema)
+        arrays = []
+        for field in schema:
+            values = columns[field.name]
+            if field.type == pa.float64():
+                values = [None if v is None else float(v) for v in values]
+            elif field.type == pa.string():
+                values = [
+                    v if v is None or isinstance(v, str) else json.dumps(v)
+                    for v in values
+                ]
+            arrays.append(pa.array(values, type=field.type))
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+    def close(self):
+        super(_ParquetHistoryWriter, self).close()
+        if self._writer is not None:
+            self._writer.close()
+
+
+class _CsvHistoryWriter(_HistoryWriter):
+    def __init__(self, path, keys, chunk_rows):
+        super(_CsvHistoryWriter, self).__init__(path, keys, chunk_rows)
+        self._file = open(path, "w", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(["run_id"] + keys)
+
+    def _write(self, columns):
+        for key in self.keys:
+            columns[key] = [
+                v if v is None or _is_number(v) or isinstance(v, str) else json.dumps(v)
+                for v in columns[key]
+            ]
+        self._writer.writerows(zip(*columns.values()))
+
+    def close(self):
+        super(_CsvHistoryWriter, self).close()
+        self._file.close()
+
+
 class ProjectArtifactTypes(Paginator):
     QUERY = gql(
         """
@@ -3251,9 +3603,9 @@ class _DownloadedArtifactEntry(artifacts.ArtifactEntry):
         )
         if need_copy:
             util.mkdir_exists_ok(os.path.dirname(target_path))
-            # We use copy2, which preserves file metadata including modified
-            # time (which we use above to check whether we should do the copy).
-            shutil.copy2(cache_path, target_path)
+            # Links or copies the file depending on WANDB_ARTIFACT_MATERIALIZE,
+            # preserving the modified time we check above.
+            artifacts.get_artifacts_cache().materialize(cache_path, target_path)
         return target_path
 
     def download(self, root=None):
@@ -3732,8 +4084,18 @@ class Artifact(artifacts.Artifact):
         dirpath = root or self._default_root()
         self._add_download_root(dirpath)
         manifest = self._load_manifest()
+        # one pool for the files of this artifact and its dependencies
+        downloads = [(self, name, dirpath) for name in manifest.entries]
+        if recursive:
+            for artifact in self._dependent_artifacts:
+                artifact_root = artifact._default_root()
+                artifact._add_download_root(artifact_root)
+                downloads.extend(
+                    (artifact, name, artifact_root)
+                    for name in artifact._load_manifest().entries
+                )
         nfiles = len(manifest.entries)
-        size = sum(e.size for e in manifest.entries.values())
+        size = manifest.entries.total_size()
         log = False
         if nfiles > 5000 or size > 50 * 1024 * 1024:
             log = True
@@ -3749,13 +4111,17 @@ class Artifact(artifacts.Artifact):
         import multiprocessing.dummy  # this uses threads
 
         pool = multiprocessing.dummy.Pool(32)
-        pool.map(partial(self._download_file, root=dirpath), manifest.entries)
-        if recursive:
-            pool.map(lambda artifact: artifact.download(), self._dependent_artifacts)
+        pool.map(
+            lambda download: download[0]._download_file(download[1], download[2]),
+            downloads,
+        )
         pool.close()
         pool.join()
 
         self._is_downloaded = True
+        if recursive:
+            for artifact in self._dependent_artifacts:
+                artifact._is_downloaded = True
 
         if log:
             delta = relativedelta(datetime.datetime.now() - start_time)
@@ -3802,15 +4168,18 @@ class Artifact(artifacts.Artifact):
                         )
                     )
 
+        entries = []
         for entry in manifest.entries.values():
             if entry.ref is None:
-                if (
-                    artifacts.md5_file_b64(os.path.join(dirpath, entry.path))
-                    != entry.digest
-                ):
-                    raise ValueError("Digest mismatch for file: %s" % entry.path)
+                entries.append(entry)
             else:
                 ref_count += 1
+        digests = artifacts.FileHasher().md5_files_b64(
+            [os.path.join(dirpath, entry.path) for entry in entries]
+        )
+        for entry, digest in zip(entries, digests):
+            if digest != entry.digest:
+                raise ValueError("Digest mismatch for file: %s" % entry.path)
         if ref_count > 0:
             print("Warning: skipped verification of %s refs" % ref_count)
 
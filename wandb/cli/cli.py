@@ -1582,11 +1582,17 @@ def cache():
     help="Clean up less frequently used files from the artifacts cache",
 )
 @click.argument("target_size")
+@click.option(
+    "--rescan",
+    is_flag=True,
+    default=False,
+    help="Rebuild the cache index by listing every file in the cache first",
+)
 @display_error
-def cleanup(target_size):
+def cleanup(target_size, rescan):
     target_size = util.from_human_size(target_size)
     cache = wandb_sdk.wandb_artifacts.get_artifacts_cache()
-    reclaimed_bytes = cache.cleanup(target_size)
+    reclaimed_bytes = cache.cleanup(target_size, rescan=rescan)
     print("Reclaimed {} of space".format(util.to_human_size(reclaimed_bytes)))
 
 
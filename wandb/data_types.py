@@ -49,6 +49,7 @@ from wandb.sdk.data_types import (
     WBValue,
 )
 from wandb.sdk.interface import _dtypes
+from wandb.sdk.lib import media_pool
 
 __all__ = [
     "Audio",
@@ -100,6 +101,14 @@ class _TableIndex(int, _TableLinkMixin):
         return row
 
 
+def _assigns_by_type(wb_type):
+    """Whether assigning a value to wb_type depends only on the type of the value,
+    so that a column of values can be assigned by their distinct types."""
+    if isinstance(wb_type, _dtypes.UnionType):
+        return all(_assigns_by_type(t) for t in wb_type.params["allowed_types"])
+    return type(wb_type).assign in (_dtypes.Type.assign, _dtypes.NDArrayType.assign)
+
+
 def _json_helper(val, artifact):
     if isinstance(val, WBValue):
         return val.to_json(artifact)
@@ -160,6 +169,9 @@ class Table(Media):
     assert tbl.get_column("feature_01") == [5, 7, 3]
     ```
 
+    Large tables of numpy data are best built with `Table.from_numpy` or `add_rows`,
+    which keep each column as an array and infer its type once rather than row by row.
+
     Tables can be logged directly to runs using `run.log({"my_table": table})`
     or added to artifacts using `artifact.add(table, "my_table")`:
     <!--yeadoc-test:table-logging-direct-->
@@ -222,6 +234,9 @@ class Table(Media):
     ):
         """rows is kept for legacy reasons, we use data to mimic the Pandas api"""
         super(Table, self).__init__()
+        self._data = []
+        # per column lists of numpy arrays, set while the table is stored by column
+        self._column_chunks = None
         self._pk_col = None
         self._fk_cols = set()
         if allow_mixed_types:
@@ -279,8 +294,13 @@ class Table(Media):
         self._assert_valid_columns(columns)
         self.columns = columns
         self._make_column_types(dtype, optional)
-        for row in ndarray:
-            self.add_data(*row)
+        if ndarray.ndim > 1 and ndarray.shape[1] == len(self.columns):
+            self._add_column_chunks(
+                [ndarray[:, ndx] for ndx in range(ndarray.shape[1])], like_rows=True
+            )
+        else:
+            for row in ndarray:
+                self.add_data(*row)
 
     def _init_from_dataframe(self, dataframe, columns, optional=True, dtype=None):
         assert util.is_pandas_data_frame(
@@ -289,8 +309,59 @@ class Table(Media):
         self.data = []
         self.columns = list(dataframe.columns)
         self._make_column_types(dtype, optional)
-        for row in range(len(dataframe)):
-            self.add_data(*tuple(dataframe[col].values[row] for col in self.columns))
+        self._add_column_chunks(
+            [dataframe[col].values for col in self.columns], like_rows=True
+        )
+
+    @classmethod
+    def from_numpy(cls, arrays, optional=True, dtype=None):
+        """Create a table stored by column from a dict of numpy arrays
+
+        The arrays are kept as they are, without copying, and their types are
+        inferred once per array. An array with more than one dimension is a column
+        of arrays, one per row.
+
+        Arguments:
+            arrays: (Dict[str, np.ndarray]) - columns of the table, keyed by name.
+                All arrays must have the same length.
+            optional: (Union[bool,List[bool]]) - if `None` values are allowed
+            dtype: the type of all columns or a list of types, one per column
+        """
+        table = cls(columns=list(arrays), optional=optional, dtype=dtype)
+        table._add_column_chunks(list(arrays.values()))
+        return table
+
+    @property
+    def data(self):
+        """The rows of the table. A table stored by column is converted to rows the
+        first time they are accessed."""
+        if self._column_chunks is not None:
+            column_arrays = [
+                self._column_array(ndx) for ndx in range(len(self.columns))
+            ]
+            self._data = [list(row) for row in zip(*column_arrays)]
+            self._column_chunks = None
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self._data = data
+        self._column_chunks = None
+
+    def _num_rows(self):
+        if self._column_chunks is not None:
+            return sum(len(chunk) for chunk in self._column_chunks[0])
+        return len(self._data)
+
+    def _column_array(self, col_ndx):
+        """Returns a column of a table stored by column as a single array"""
+        chunks = self._column_chunks[col_ndx]
+        if len(chunks) > 1:
+            np = util.get_module(
+                "numpy", required="Tables stored by column require numpy"
+            )
+            chunks[:] = [np.concatenate(chunks)]
+        return chunks[0]
 
     def _make_column_types(self, dtype=None, optional=True):
         if dtype is None:
@@ -324,17 +395,29 @@ class Table(Media):
 
         # Cast each value in the row, raising an error if there are invalid entries.
         col_ndx = self.columns.index(col_name)
-        for row in self.data:
-            result_type = wbtype.assign(row[col_ndx])
-            if isinstance(result_type, _dtypes.InvalidType):
-                raise TypeError(
-                    "Existing data {}, of type {} cannot be cast to {}".format(
-                        row[col_ndx],
-                        _dtypes.TypeRegistry.type_of(row[col_ndx]),
-                        wbtype,
+        if self._column_chunks is not None and _assigns_by_type(wbtype):
+            column = self._column_array(col_ndx)
+            for col_type in _dtypes.TypeRegistry.types_of(column):
+                result_type = wbtype.assign_type(col_type)
+                if isinstance(result_type, _dtypes.InvalidType):
+                    raise TypeError(
+                        "Existing data of type {} cannot be cast to {}".format(
+                            col_type, wbtype
+                        )
                     )
-                )
-            wbtype = result_type
+                wbtype = result_type
+        else:
+            for row in self.data:
+                result_type = wbtype.assign(row[col_ndx])
+                if isinstance(result_type, _dtypes.InvalidType):
+                    raise TypeError(
+                        "Existing data {}, of type {} cannot be cast to {}".format(
+                            row[col_ndx],
+                            _dtypes.TypeRegistry.type_of(row[col_ndx]),
+                            wbtype,
+                        )
+                    )
+                wbtype = result_type
 
         # Assert valid options
         is_pk = isinstance(wbtype, _PrimaryKeyType)
@@ -443,6 +526,120 @@ class Table(Media):
         # Update the wrapper values if needed
         self._update_keys(force_last=True)
 
+    def add_rows(self, rows):
+        """Add several rows of data to the table at once
+
+        The types of the new data are inferred once per column rather than once
+        per row. The columns of a numpy array are kept as they are, without copying,
+        while the table holds no other rows or only rows added this way.
+
+        Arguments:
+            rows: (List[List[any]] | np.ndarray) - rows of data, each with a value
+                for every column. An array with more than two dimensions holds
+                an array per cell.
+        """
+        if util.is_numpy_array(rows) and rows.ndim > 1:
+            if rows.shape[1] != len(self.columns):
+                raise ValueError(
+                    "This table expects {} columns: {}, found {}".format(
+                        len(self.columns), self.columns, rows.shape[1]
+                    )
+                )
+            self._add_column_chunks([rows[:, ndx] for ndx in range(rows.shape[1])])
+            return
+
+        rows = [list(row) for row in rows]
+        for row in rows:
+            if len(row) != len(self.columns):
+                raise ValueError(
+                    "This table expects {} columns: {}, found {}".format(
+                        len(self.columns), self.columns, len(row)
+                    )
+                )
+        chunks = [[row[ndx] for row in rows] for ndx in range(len(self.columns))]
+        self._add_column_chunks(chunks, rows)
+
+    def _add_column_chunks(self, chunks, rows=None, like_rows=False):
+        """Adds rows given as a chunk of values per column. Numpy chunks are stored
+        by column when rows is None, otherwise rows holds the same data by row.
+
+        With like_rows, the chunks are typed the way add_data types each of their
+        rows: nan in a float array is a Number, and data that doesn't fit raises
+        add_data's error."""
+        np = util.get_module("numpy")
+        if any(len(chunk) != len(chunks[0]) for chunk in chunks):
+            raise ValueError("All columns must have the same length")
+
+        # Keys need the row by row checks and wrapping of add_data
+        c_types = self._column_types.params["type_map"]
+        if (
+            not chunks
+            or self._pk_col is not None
+            or self._fk_cols
+            or not all(_assigns_by_type(c_types[col]) for col in self.columns)
+            or any(
+                isinstance(item, _TableLinkMixin)
+                for chunk in chunks
+                if not util.is_numpy_array(chunk) or chunk.dtype == object
+                for item in chunk
+            )
+        ):
+            for row in rows if rows is not None else zip(*chunks):
+                self.add_data(*row)
+            return
+
+        type_map = dict(c_types)
+        for col_name, chunk in zip(self.columns, chunks):
+            chunk_types = _dtypes.TypeRegistry.types_of(chunk)
+            # nan is typed as None, look for it only when the column can't hold None
+            if (
+                not like_rows
+                and util.is_numpy_array(chunk)
+                and chunk.ndim == 1
+                and chunk.dtype.kind in "fc"
+                and not self._column_accepts_none(type_map[col_name], chunk_types)
+                and np.isnan(chunk).any()
+            ):
+                chunk_types.append(_dtypes.NoneType())
+            for chunk_type in chunk_types:
+                result_type = type_map[col_name].assign_type(chunk_type)
+                if isinstance(result_type, _dtypes.InvalidType):
+                    if like_rows:
+                        # raises for the first row that doesn't fit
+                        for row in zip(*chunks):
+                            self.add_data(*row)
+                        return
+                    raise TypeError(
+                        "Data of type {} in column {} is incompatible with {}".format(
+                            chunk_type, col_name, type_map[col_name]
+                        )
+                    )
+                type_map[col_name] = result_type
+        self._column_types = _dtypes.TypedDictType(type_map)
+
+        by_column = (
+            np is not None
+            and all(isinstance(chunk, np.ndarray) for chunk in chunks)
+            and (self._column_chunks is not None or len(self._data) == 0)
+        )
+        if by_column:
+            if self._column_chunks is None:
+                self._column_chunks = [[] for _ in self.columns]
+            for col_chunks, chunk in zip(self._column_chunks, chunks):
+                col_chunks.append(chunk)
+        elif rows is not None:
+            self.data.extend(rows)
+        else:
+            self.data.extend(list(row) for row in zip(*chunks))
+
+    @staticmethod
+    def _column_accepts_none(col_type, chunk_types):
+        for chunk_type in chunk_types:
+            col_type = col_type.assign_type(chunk_type)
+        return not isinstance(
+            col_type.assign_type(_dtypes.NoneType()), _dtypes.InvalidType
+        )
+
     def _get_updated_result_type(self, row):
         """Returns an updated result type based on incoming row. Raises error if
         the assignment is invalid"""
@@ -463,8 +660,17 @@ class Table(Media):
         # separate this method for easier testing
         if max_rows is None:
             max_rows = Table.MAX_ROWS
-        if len(self.data) > max_rows and warn:
+        if self._num_rows() > max_rows and warn:
             logging.warning("Truncating wandb.Table object to %i rows." % max_rows)
+        if self._column_chunks is not None:
+            column_lists = [
+                self._column_array(ndx)[:max_rows].tolist()
+                for ndx in range(len(self.columns))
+            ]
+            return {
+                "columns": self.columns,
+                "data": [list(row) for row in zip(*column_lists)],
+            }
         return {"columns": self.columns, "data": self.data[:max_rows]}
 
     def bind_to_run(self, *args, **kwargs):
@@ -547,14 +753,15 @@ class Table(Media):
                 {
                     "_type": "table-file",
                     "ncols": len(self.columns),
-                    "nrows": len(self.data),
+                    "nrows": self._num_rows(),
                 }
             )
 
         elif isinstance(run_or_artifact, wandb.wandb_sdk.wandb_artifacts.Artifact):
             artifact = run_or_artifact
             mapped_data = []
-            data = self._to_table_json(Table.MAX_ARTIFACT_ROWS)["data"]
+            if self._column_chunks is None:
+                data = self._to_table_json(Table.MAX_ARTIFACT_ROWS)["data"]
 
             ndarray_col_ndxs = set()
             for col_ndx, col_name in enumerate(self.columns):
@@ -585,14 +792,19 @@ class Table(Media):
                     ndarray_type._set_serialization_path(entry.path, str(col_name))
                     ndarray_col_ndxs.add(col_ndx)
 
-            for row in data:
-                mapped_row = []
-                for ndx, v in enumerate(row):
-                    if ndx in ndarray_col_ndxs:
-                        mapped_row.append(None)
-                    else:
-                        mapped_row.append(_json_helper(v, artifact))
-                mapped_data.append(mapped_row)
+            if self._column_chunks is None:
+                for row in data:
+                    mapped_row = []
+                    for ndx, v in enumerate(row):
+                        if ndx in ndarray_col_ndxs:
+                            mapped_row.append(None)
+                        else:
+                            mapped_row.append(_json_helper(v, artifact))
+                    mapped_data.append(mapped_row)
+            else:
+                mapped_data = self._to_mapped_columns_json(
+                    Table.MAX_ARTIFACT_ROWS, ndarray_col_ndxs, artifact
+                )
 
             json_dict.update(
                 {
@@ -609,6 +821,27 @@ class Table(Media):
 
         return json_dict
 
+    def _to_mapped_columns_json(self, max_rows, skip_col_ndxs, artifact):
+        """Maps the rows of a table stored by column to JSON a column at a time,
+        with None in the columns at skip_col_ndxs"""
+        nrows = self._num_rows()
+        if nrows > max_rows:
+            logging.warning("Truncating wandb.Table object to %i rows." % max_rows)
+            nrows = max_rows
+        mapped_columns = []
+        for col_ndx in range(len(self.columns)):
+            column = self._column_array(col_ndx)[:max_rows]
+            if col_ndx in skip_col_ndxs:
+                mapped_columns.append([None] * nrows)
+            elif column.dtype.kind in "biu":
+                mapped_columns.append(column.tolist())
+            elif column.dtype.kind == "f":
+                # nan isn't valid JSON
+                mapped_columns.append([None if v != v else v for v in column.tolist()])
+            else:
+                mapped_columns.append([_json_helper(v, artifact) for v in column])
+        return [list(row) for row in zip(*mapped_columns)]
+
     def iterrows(self):
         """Iterate over rows as (ndx, row)
         Yields
@@ -743,9 +976,27 @@ class Table(Media):
         assert isinstance(data, list) or is_np
         assert isinstance(optional, bool)
         is_first_col = len(self.columns) == 0
-        assert is_first_col or len(data) == len(
-            self.data
-        ), "Expected length {}, found {}".format(len(self.data), len(data))
+        assert (
+            is_first_col or len(data) == self._num_rows()
+        ), "Expected length {}, found {}".format(self._num_rows(), len(data))
+
+        # A table stored by column keeps an array as a column as it is
+        if is_np and (
+            self._column_chunks is not None or (is_first_col and not self._data)
+        ):
+            if is_first_col:
+                self._column_chunks = []
+            self._column_chunks.append([data])
+            self.columns.append(name)
+            try:
+                self.cast(name, _dtypes.UnknownType(), optional=optional)
+            except TypeError as err:
+                self._column_chunks.pop()
+                self.columns.pop()
+                if is_first_col:
+                    self.data = []
+                raise err
+            return
 
         # Add the new data
         for ndx in range(max(len(data), len(self.data))):
@@ -787,6 +1038,13 @@ class Table(Media):
             )
         col = []
         col_ndx = self.columns.index(name)
+        if self._column_chunks is not None:
+            column = self._column_array(col_ndx)
+            if convert_to is None:
+                return list(column)
+            # arrays of numbers are returned as they are stored, without copying
+            elif column.dtype != object:
+                return column
         for row in self.data:
             item = row[col_ndx]
             if convert_to is not None and isinstance(item, WBValue):
@@ -799,7 +1057,7 @@ class Table(Media):
     def get_index(self):
         """Returns an array of row indexes which can be used in other tables to create links"""
         ndxs = []
-        for ndx in range(len(self.data)):
+        for ndx in range(self._num_rows()):
             index = _TableIndex(ndx)
             index.set_table(self)
             ndxs.append(index)
@@ -807,7 +1065,7 @@ class Table(Media):
 
     def index_ref(self, index):
         """Get a reference to a particular row index in the table"""
-        assert index < len(self.data)
+        assert index < self._num_rows()
         _index = _TableIndex(index)
         _index.set_table(self)
         return _index
@@ -978,11 +1236,19 @@ class Audio(BatchableMedia):
                 required='Raw audio requires the soundfile package. To get it, run "pip install soundfile"',
             )
 
-            tmp_path = os.path.join(MEDIA_TMP.name, util.generate_id() + ".wav")
-            soundfile.write(tmp_path, data_or_path, sample_rate)
             self._duration = len(data_or_path) / float(sample_rate)
+            data = data_or_path
+            if media_pool.get_media_pool() is not None:
+                # it's encoded later, after the caller may have changed it
+                data = util.get_module("numpy").array(data_or_path)
+
+            def encode():
+                tmp_path = os.path.join(MEDIA_TMP.name, util.generate_id() + ".wav")
+                soundfile.write(tmp_path, data, sample_rate)
+                self._set_file(tmp_path, is_tmp=True)
 
-            self._set_file(tmp_path, is_tmp=True)
+            if not self._set_file_in_background(encode, getattr(data, "nbytes", 0)):
+                encode()
 
     @classmethod
     def path_is_reference(cls, path):
@@ -1000,6 +1266,7 @@ class Audio(BatchableMedia):
         )
 
     def bind_to_run(self, run, key, step, id_=None):
+        self._wait_for_file()
         if Audio.path_is_reference(self._path):
             raise ValueError(
                 "Audio media created by a reference to external storage cannot currently be added to a run"
@@ -1058,6 +1325,7 @@ class Audio(BatchableMedia):
             return ["" if c is None else c for c in captions]
 
     def resolve_ref(self):
+        self._wait_for_file()
         if Audio.path_is_reference(self._path):
             # this object was already created using a ref:
             return self._path
@@ -1072,6 +1340,8 @@ class Audio(BatchableMedia):
         return None
 
     def __eq__(self, other):
+        self._wait_for_file()
+        other._wait_for_file()
         if Audio.path_is_reference(self._path) or Audio.path_is_reference(other._path):
             # one or more of these objects is an unresolved reference -- we'll compare
             # their reference paths instead of their SHAs:
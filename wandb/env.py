@@ -66,6 +66,11 @@ ANONYMOUS = "WANDB_ANONYMOUS"
 JUPYTER = "WANDB_JUPYTER"
 CONFIG_DIR = "WANDB_CONFIG_DIR"
 CACHE_DIR = "WANDB_CACHE_DIR"
+ARTIFACT_HASH_WORKERS = "WANDB_ARTIFACT_HASH_WORKERS"
+ARTIFACT_MATERIALIZE = "WANDB_ARTIFACT_MATERIALIZE"
+ARTIFACT_CACHE_MAX_SIZE = "WANDB_ARTIFACT_CACHE_MAX_SIZE"
+MEDIA_ENCODE_THREADS = "WANDB_MEDIA_ENCODE_THREADS"
+MEDIA_IMAGE_ATLAS = "WANDB_MEDIA_IMAGE_ATLAS"
 DISABLE_SSL = "WANDB_INSECURE_DISABLE_SSL"
 SERVICE = "WANDB_SERVICE"
 
@@ -312,6 +317,44 @@ def get_use_v1_artifacts(env=None):
     return val
 
 
+def get_artifact_hash_workers(default=None, env=None):
+    if env is None:
+        env = os.environ
+    val = env.get(ARTIFACT_HASH_WORKERS, default)
+    try:
+        val = int(val)
+    except (TypeError, ValueError):
+        val = default
+    return val
+
+
+def get_artifact_materialize(default=None, env=None):
+    if env is None:
+        env = os.environ
+    return env.get(ARTIFACT_MATERIALIZE, default)
+
+
+def get_artifact_cache_max_size(default=None, env=None):
+    if env is None:
+        env = os.environ
+    return env.get(ARTIFACT_CACHE_MAX_SIZE, default)
+
+
+def get_media_encode_threads(default=None, env=None):
+    if env is None:
+        env = os.environ
+    val = env.get(MEDIA_ENCODE_THREADS, default)
+    try:
+        val = int(val)
+    except (TypeError, ValueError):
+        val = default
+    return val
+
+
+def get_media_image_atlas(default=None, env=None):
+    return _env_as_bool(MEDIA_IMAGE_ATLAS, default=default, env=env)
+
+
 def get_agent_max_initial_failures(default=None, env=None):
     if env is None:
         env = os.environ
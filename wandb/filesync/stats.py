@@ -6,6 +6,7 @@ import wandb
 class Stats(object):
     def __init__(self):
         self._stats = {}
+        self._upload_classes = {}
         self._lock = threading.Lock()
 
     def init_file(self, save_name, size, is_artifact_file=False):
@@ -30,15 +31,61 @@ class Stats(object):
         self._stats[save_name]["uploaded"] = 0
         self._stats[save_name]["failed"] = True
 
+    def _upload_class(self, upload_class):
+        if upload_class not in self._upload_classes:
+            self._upload_classes[upload_class] = {
+                "queued": 0,
+                "running": 0,
+                "files": 0,
+                "bytes": 0,
+                "seconds": 0.0,
+            }
+        return self._upload_classes[upload_class]
+
+    def upload_queued(self, upload_class):
+        with self._lock:
+            self._upload_class(upload_class)["queued"] += 1
+
+    def upload_started(self, upload_class):
+        with self._lock:
+            class_stats = self._upload_class(upload_class)
+            class_stats["queued"] -= 1
+            class_stats["running"] += 1
+
+    def upload_finished(self, upload_class, size, seconds):
+        with self._lock:
+            class_stats = self._upload_class(upload_class)
+            class_stats["running"] -= 1
+            class_stats["files"] += 1
+            class_stats["bytes"] += size
+            class_stats["seconds"] += seconds
+
+    def upload_class_summary(self):
+        """Queue depth and throughput of the upload worker pool, by upload class.
+
+        bytes_per_second is the average rate of a single upload of that class,
+        concurrent uploads add up on top of it.
+        """
+        with self._lock:
+            classes = {k: dict(v) for k, v in self._upload_classes.items()}
+        for class_stats in classes.values():
+            seconds = class_stats["seconds"]
+            class_stats["bytes_per_second"] = (
+                class_stats["bytes"] / seconds if seconds > 0 else 0
+            )
+        return classes
+
     def summary(self):
         # Need to use list to ensure we get a copy, since other threads may
         # modify this while we iterate
         with self._lock:
             stats = list(self._stats.values())
+            queue_depth = sum(c["queued"] for c in self._upload_classes.values())
         return {
             "uploaded_bytes": sum(f["uploaded"] for f in stats),
             "total_bytes": sum(f["total"] for f in stats),
             "deduped_bytes": sum(f["total"] for f in stats if f["deduped"]),
+            "queue_depth": queue_depth,
         }
 
     def file_counts_by_category(self):
@@ -1,12 +1,20 @@
 """Batching file prepare requests to our API."""
 
 import collections
+import itertools
+import logging
+import os
 import threading
+import time
 from six.moves import queue
 
+import wandb
+from wandb.filesync import step_upload_urls
 from wandb.filesync import upload_job
 from wandb.errors.term import termerror
 
+logger = logging.getLogger(__name__)
+
 
 RequestUpload = collections.namedtuple(
     "EventStartUploadJob",
@@ -17,6 +25,87 @@ RequestCommitArtifact = collections.namedtuple(
 )
 RequestFinish = collections.namedtuple("RequestFinish", ("callback"))
 
+# Upload classes in the order workers pick them up. Run metadata files such as
+# wandb-summary.json go first, then small files (media, logs), then everything
+# else, so a large checkpoint never holds up the files the UI is waiting on.
+UPLOAD_CLASS_WANDB = "wandb"
+UPLOAD_CLASS_SMALL = "small"
+UPLOAD_CLASS_LARGE = "large"
+UPLOAD_CLASSES = (UPLOAD_CLASS_WANDB, UPLOAD_CLASS_SMALL, UPLOAD_CLASS_LARGE)
+SMALL_FILE_BYTES = 8 * 1024 * 1024
+
+
+def upload_class(save_name, size):
+    if wandb.wandb_lib.filenames.is_wandb_file(save_name):
+        return UPLOAD_CLASS_WANDB
+    if size < SMALL_FILE_BYTES:
+        return UPLOAD_CLASS_SMALL
+    return UPLOAD_CLASS_LARGE
+
+
+class UploadPool(object):
+    """A persistent set of worker threads running UploadJobs by priority.
+
+    Jobs are ordered by upload class and then by submission order. Workers are
+    started on demand, up to max_workers, and live until shutdown().
+    """
+
+    def __init__(self, stats, max_workers):
+        self._stats = stats
+        self._max_workers = max_workers
+        self._queue = queue.PriorityQueue()
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._workers = []
+        self._idle = 0
+        self._queued = 0
+
+    def submit(self, job, upload_class, size):
+        self._stats.upload_queued(upload_class)
+        with self._lock:
+            self._queued += 1
+            if self._queued > self._idle and len(self._workers) < self._max_workers:
+                worker = threading.Thread(target=self._worker_body)
+                worker.daemon = True
+                worker.start()
+                self._workers.append(worker)
+        priority = UPLOAD_CLASSES.index(upload_class)
+        self._queue.put((priority, next(self._counter), (job, upload_class, size)))
+
+    def _worker_body(self):
+        while True:
+            with self._lock:
+                self._idle += 1
+            _, _, item = self._queue.get()
+            with self._lock:
+                self._idle -= 1
+                self._queued -= 1
+            if item is None:
+                break
+            job, upload_class, size = item
+            self._stats.upload_started(upload_class)
+            start_time = time.time()
+            try:
+                job.run()
+            except Exception:
+                # The job has already reported itself done, keep the worker
+                # alive for the jobs queued behind it
+                logger.exception("Upload job failed: %s", job.save_name)
+            finally:
+                self._stats.upload_finished(
+                    upload_class, size, time.time() - start_time
+                )
+
+    def shutdown(self):
+        with self._lock:
+            workers = list(self._workers)
+            self._queued += len(workers)
+        # Sort after every real job so queued uploads still drain
+        for _ in workers:
+            self._queue.put((len(UPLOAD_CLASSES), next(self._counter), None))
+        for worker in workers:
+            worker.join()
+
 
 class StepUpload(object):
     def __init__(self, api, stats, event_queue, max_jobs, file_stream, silent=False):
@@ -35,6 +124,11 @@ class StepUpload(object):
 
         self._artifacts = {}
 
+        self._pool = UploadPool(stats, max_jobs)
+
+        # Upload jobs that start close together share one upload_urls request
+        self._url_batcher = step_upload_urls.StepUploadUrls(api, 0.1, 0.01, 1000)
+
         self._finished = False
         self.silent = silent
 
@@ -65,6 +159,8 @@ class StepUpload(object):
                 self._handle_event(event)
             elif not self._running_jobs:
                 # Queue was empty and no jobs left.
+                self._pool.shutdown()
+                self._url_batcher.shutdown()
                 if finish_callback:
                     finish_callback()
                 break
@@ -72,7 +168,6 @@ class StepUpload(object):
     def _handle_event(self, event):
         if isinstance(event, upload_job.EventJobDone):
             job = event.job
-            job.join()
             if job.artifact_id:
                 if event.success:
                     self._artifacts[job.artifact_id]["pending_count"] -= 1
@@ -82,10 +177,11 @@ class StepUpload(object):
                         "Uploading artifact file failed. Artifact won't be committed."
                     )
             self._running_jobs.pop(job.save_name)
-            # If we have any pending jobs, start one now
-            if self._pending_jobs:
-                event = self._pending_jobs.pop(0)
-                self._start_upload_job(event)
+            # Start the next upload of this file, if one was waiting on it
+            for i, pending in enumerate(self._pending_jobs):
+                if pending.save_name == job.save_name:
+                    self._start_upload_job(self._pending_jobs.pop(i))
+                    break
         elif isinstance(event, RequestCommitArtifact):
             if event.artifact_id not in self._artifacts:
                 self._init_artifact(event.artifact_id)
@@ -105,10 +201,7 @@ class StepUpload(object):
                 if event.artifact_id not in self._artifacts:
                     self._init_artifact(event.artifact_id)
                 self._artifacts[event.artifact_id]["pending_count"] += 1
-            if len(self._running_jobs) == self._max_jobs:
-                self._pending_jobs.append(event)
-            else:
-                self._start_upload_job(event)
+            self._start_upload_job(event)
         else:
             raise Exception("Programming error: unhandled event: %s" % str(event))
 
@@ -123,7 +216,12 @@ class StepUpload(object):
             self._pending_jobs.append(event)
             return
 
-        # Start it.
+        try:
+            size = os.path.getsize(event.path)
+        except OSError:
+            size = 0
+
+        # Queue it, the pool runs it once a worker is free.
         job = upload_job.UploadJob(
             self._event_queue,
             self._stats,
@@ -137,9 +235,10 @@ class StepUpload(object):
             event.copied,
             event.save_fn,
             event.digest,
+            url_batcher=self._url_batcher,
         )
         self._running_jobs[event.save_name] = job
-        job.start()
+        self._pool.submit(job, upload_class(event.save_name, size), size)
 
     def _init_artifact(self, artifact_id):
         self._artifacts[artifact_id] = {
@@ -163,6 +262,7 @@ class StepUpload(object):
                 callback()
 
     def start(self):
+        self._url_batcher.start()
         self._thread.start()
 
     def is_alive(self):
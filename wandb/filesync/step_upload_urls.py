@@ -0,0 +1,127 @@
+"""Batching run file upload url requests to our API."""
+
+import collections
+import threading
+import time
+from six.moves import queue
+
+# Request for a signed upload url for a run file.
+RequestUploadUrl = collections.namedtuple(
+    "RequestUploadUrl", ("save_name", "response_queue")
+)
+
+RequestFinish = collections.namedtuple("RequestFinish", ())
+
+ResponseUploadUrl = collections.namedtuple(
+    "ResponseUploadUrl", ("upload_url", "upload_headers", "error")
+)
+
+
+class StepUploadUrls(object):
+    """A thread that batches requests to the upload_urls API.
+
+    Any number of UploadJob threads may call upload_url() in parallel. Requests that
+    arrive within the same batch window are sent to the backend as a single
+    upload_urls call, rather than one GraphQL round trip per file.
+    """
+
+    def __init__(self, api, batch_time, inter_event_time, max_batch_size):
+        self._api = api
+        self._inter_event_time = inter_event_time
+        self._batch_time = batch_time
+        self._max_batch_size = max_batch_size
+        self._request_queue = queue.Queue()
+        self._thread = threading.Thread(target=self._thread_body)
+        self._thread.daemon = True
+
+    def _thread_body(self):
+        while True:
+            request = self._request_queue.get()
+            if isinstance(request, RequestFinish):
+                break
+            finish, batch = self._gather_batch(request)
+            try:
+                upload_headers, result = self._upload_urls_batch(batch)
+            except Exception as e:
+                # Every job in the batch fails the same way it would have if it
+                # had made the call itself.
+                for upload_request in batch:
+                    upload_request.response_queue.put(ResponseUploadUrl(None, None, e))
+            else:
+                for upload_request in batch:
+                    file_info = result.get(upload_request.save_name)
+                    if file_info is None:
+                        error = KeyError(upload_request.save_name)
+                        response = ResponseUploadUrl(None, None, error)
+                    else:
+                        response = ResponseUploadUrl(
+                            file_info["url"], upload_headers, None
+                        )
+                    upload_request.response_queue.put(response)
+            if finish:
+                break
+
+    def _gather_batch(self, first_request):
+        batch_start_time = time.time()
+        batch = [first_request]
+        while True:
+            try:
+                request = self._request_queue.get(
+                    block=True, timeout=self._inter_event_time
+                )
+                if isinstance(request, RequestFinish):
+                    return True, batch
+                batch.append(request)
+                remaining_time = self._batch_time - (time.time() - batch_start_time)
+                if remaining_time < 0 or len(batch) >= self._max_batch_size:
+                    break
+            except queue.Empty:
+                break
+        return False, batch
+
+    def _upload_urls_batch(self, batch):
+        """Execute the upload_urls API call.
+
+        Arguments:
+            batch: List of RequestUploadUrl objects
+        Returns:
+            (upload_headers, result) where result is a dict of (save_name: file_info)
+                pairs and file_info is a dict with a url key.
+        """
+        save_names = []
+        for upload_request in batch:
+            if upload_request.save_name not in save_names:
+                save_names.append(upload_request.save_name)
+        project = self._api.get_project()
+        _, upload_headers, result = self._api.upload_urls(project, save_names)
+        return upload_headers, result
+
+    def upload_url_async(self, save_name):
+        """Request a signed upload url for a run file.
+
+        Returns:
+            response_queue: a queue containing a ResponseUploadUrl once the batch
+                including this request has been sent.
+        """
+        response_queue = queue.Queue()
+        self._request_queue.put(RequestUploadUrl(save_name, response_queue))
+        return response_queue
+
+    def upload_url(self, save_name):
+        response = self.upload_url_async(save_name).get()
+        if response.error is not None:
+            raise response.error
+        return response.upload_url, response.upload_headers
+
+    def start(self):
+        self._thread.start()
+
+    def finish(self):
+        self._request_queue.put(RequestFinish())
+
+    def is_alive(self):
+        return self._thread.is_alive()
+
+    def shutdown(self):
+        self.finish()
+        self._thread.join()
@@ -1,7 +1,6 @@
 import collections
 import os
 import logging
-import threading
 
 import wandb
 
@@ -9,7 +8,7 @@ EventJobDone = collections.namedtuple("EventJobDone", ("job", "success"))
 logger = logging.getLogger(__name__)
 
 
-class UploadJob(threading.Thread):
+class UploadJob(object):
     def __init__(
         self,
         done_queue,
@@ -24,8 +23,9 @@ class UploadJob(threading.Thread):
         copied,
         save_fn,
         digest,
+        url_batcher=None,
     ):
-        """A file upload thread.
+        """A file upload, run on one of the StepUpload worker threads.
 
         Arguments:
             done_queue: queue.Queue in which to put an EventJobDone event when
@@ -35,6 +35,8 @@ class UploadJob(threading.Thread):
             save_name: string logical location of the file relative to the run
                 directory.
             path: actual string path of the file to upload on the filesystem.
+            url_batcher: optional StepUploadUrls used to fetch the signed upload
+                url together with other concurrent jobs.
         """
         self._done_queue = done_queue
         self._stats = stats
@@ -48,7 +50,7 @@ class UploadJob(threading.Thread):
         self.copied = copied
         self.save_fn = save_fn
         self.digest = digest
-        super(UploadJob, self).__init__()
+        self._url_batcher = url_batcher
 
     def run(self):
         success = False
@@ -108,10 +110,17 @@ class UploadJob(threading.Thread):
             # The classic file upload flow. We get a signed url and upload the file
             # then the backend handles the cloud storage metadata callback to create the
             # file entry. This flow has aged like a fine wine.
-            project = self._api.get_project()
-            _, upload_headers, result = self._api.upload_urls(project, [self.save_name])
-            file_info = result[self.save_name]
-            upload_url = file_info["url"]
+            if self._url_batcher:
+                upload_url, upload_headers = self._url_batcher.upload_url(
+                    self.save_name
+                )
+            else:
+                project = self._api.get_project()
+                _, upload_headers, result = self._api.upload_urls(
+                    project, [self.save_name]
+                )
+                file_info = result[self.save_name]
+                upload_url = file_info["url"]
 
         if upload_url is None:
             logger.info("Skipped uploading %s", self.save_path)
@@ -515,17 +515,28 @@ class HistoryItem(google.protobuf.message.Message):
     KEY_FIELD_NUMBER: builtins.int
     NESTED_KEY_FIELD_NUMBER: builtins.int
     VALUE_JSON_FIELD_NUMBER: builtins.int
+    VALUE_FLOAT_FIELD_NUMBER: builtins.int
+    VALUE_INT_FIELD_NUMBER: builtins.int
+    VALUE_STRING_FIELD_NUMBER: builtins.int
     key: typing.Text = ...
     nested_key: google.protobuf.internal.containers.RepeatedScalarFieldContainer[typing.Text] = ...
     value_json: typing.Text = ...
+    value_float: builtins.float = ...
+    value_int: builtins.int = ...
+    value_string: typing.Text = ...
 
     def __init__(self,
         *,
         key : typing.Text = ...,
         nested_key : typing.Optional[typing.Iterable[typing.Text]] = ...,
         value_json : typing.Text = ...,
+        value_float : builtins.float = ...,
+        value_int : builtins.int = ...,
+        value_string : typing.Text = ...,
         ) -> None: ...
-    def ClearField(self, field_name: typing_extensions.Literal[u"key",b"key",u"nested_key",b"nested_key",u"value_json",b"value_json"]) -> None: ...
+    def HasField(self, field_name: typing_extensions.Literal[u"typed_value",b"typed_value",u"value_float",b"value_float",u"value_int",b"value_int",u"value_string",b"value_string"]) -> builtins.bool: ...
+    def ClearField(self, field_name: typing_extensions.Literal[u"key",b"key",u"nested_key",b"nested_key",u"typed_value",b"typed_value",u"value_float",b"value_float",u"value_int",b"value_int",u"value_json",b"value_json",u"value_string",b"value_string"]) -> None: ...
+    def WhichOneof(self, oneof_group: typing_extensions.Literal[u"typed_value",b"typed_value"]) -> typing_extensions.Literal["value_float","value_int","value_string"]: ...
 global___HistoryItem = HistoryItem
 
 class HistoryResult(google.protobuf.message.Message):
@@ -1540,17 +1551,55 @@ global___NetworkStatusRequest = NetworkStatusRequest
 class NetworkStatusResponse(google.protobuf.message.Message):
     DESCRIPTOR: google.protobuf.descriptor.Descriptor = ...
     NETWORK_RESPONSES_FIELD_NUMBER: builtins.int
+    QUEUE_STATUS_FIELD_NUMBER: builtins.int
 
     @property
     def network_responses(self) -> google.protobuf.internal.containers.RepeatedCompositeFieldContainer[global___HttpResponse]: ...
 
+    @property
+    def queue_status(self) -> google.protobuf.internal.containers.RepeatedCompositeFieldContainer[global___QueueStatus]: ...
+
     def __init__(self,
         *,
         network_responses : typing.Optional[typing.Iterable[global___HttpResponse]] = ...,
+        queue_status : typing.Optional[typing.Iterable[global___QueueStatus]] = ...,
         ) -> None: ...
-    def ClearField(self, field_name: typing_extensions.Literal[u"network_responses",b"network_responses"]) -> None: ...
+    def ClearField(self, field_name: typing_extensions.Literal[u"network_responses",b"network_responses",u"queue_status",b"queue_status"]) -> None: ...
 global___NetworkStatusResponse = NetworkStatusResponse
 
+class QueueStatus(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor = ...
+    NAME_FIELD_NUMBER: builtins.int
+    POLICY_FIELD_NUMBER: builtins.int
+    ITEMS_FIELD_NUMBER: builtins.int
+    BYTES_FIELD_NUMBER: builtins.int
+    MAX_BYTES_FIELD_NUMBER: builtins.int
+    SPILLED_ITEMS_FIELD_NUMBER: builtins.int
+    DROPPED_ITEMS_FIELD_NUMBER: builtins.int
+    DROPPED_BYTES_FIELD_NUMBER: builtins.int
+    name: typing.Text = ...
+    policy: typing.Text = ...
+    items: builtins.int = ...
+    bytes: builtins.int = ...
+    max_bytes: builtins.int = ...
+    spilled_items: builtins.int = ...
+    dropped_items: builtins.int = ...
+    dropped_bytes: builtins.int = ...
+
+    def __init__(self,
+        *,
+        name : typing.Text = ...,
+        policy : typing.Text = ...,
+        items : builtins.int = ...,
+        bytes : builtins.int = ...,
+        max_bytes : builtins.int = ...,
+        spilled_items : builtins.int = ...,
+        dropped_items : builtins.int = ...,
+        dropped_bytes : builtins.int = ...,
+        ) -> None: ...
+    def ClearField(self, field_name: typing_extensions.Literal[u"bytes",b"bytes",u"dropped_bytes",b"dropped_bytes",u"dropped_items",b"dropped_items",u"items",b"items",u"max_bytes",b"max_bytes",u"name",b"name",u"policy",b"policy",u"spilled_items",b"spilled_items"]) -> None: ...
+global___QueueStatus = QueueStatus
+
 class HttpResponse(google.protobuf.message.Message):
     DESCRIPTOR: google.protobuf.descriptor.Descriptor = ...
     HTTP_STATUS_CODE_FIELD_NUMBER: builtins.int
@@ -1,4 +1,5 @@
 import codecs
+import concurrent.futures
 import hashlib
 import io
 import json
@@ -12,6 +13,7 @@ import shutil
 import sys
 from typing import (
     Any,
+    Callable,
     cast,
     ClassVar,
     Dict,
@@ -29,12 +31,13 @@ from pkg_resources import parse_version
 import six
 from six.moves.collections_abc import Sequence as SixSequence
 import wandb
-from wandb import util
+from wandb import env, util
 from wandb._globals import _datatypes_callback
 from wandb.compat import tempfile
 from wandb.util import has_num
 
 from .interface import _dtypes
+from .lib import media_pool
 
 
 if TYPE_CHECKING:  # pragma: no cover
@@ -434,6 +437,8 @@ class Media(WBValue):
     _extension: Optional[str]
     _sha256: Optional[str]
     _size: Optional[int]
+    # set while the file is being encoded on the media pool
+    _encoding: Optional[concurrent.futures.Future] = None
 
     def __init__(self, caption: Optional[str] = None) -> None:
         super(Media, self).__init__()
@@ -459,6 +464,24 @@ class Media(WBValue):
             self._sha256 = hashlib.sha256(f.read()).hexdigest()
         self._size = os.path.getsize(self._path)
 
+    def _set_file_in_background(self, encode: Callable[[], None], nbytes: int) -> bool:
+        """Run encode, which calls _set_file(), on the media pool if it's enabled.
+
+        nbytes is about how much memory encode holds on to. Returns False
+        without running encode when media is encoded on the caller's thread.
+        """
+        pool = media_pool.get_media_pool()
+        if pool is None:
+            return False
+        self._encoding = pool.submit(encode, nbytes)
+        return True
+
+    def _wait_for_file(self) -> None:
+        encoding = self._encoding
+        if encoding is not None:
+            encoding.result()
+            self._encoding = None
+
     @classmethod
     def get_media_subdir(cls: Type["Media"]) -> str:
         raise NotImplementedError
@@ -476,6 +499,7 @@ class Media(WBValue):
         return self._run is not None
 
     def file_is_set(self) -> bool:
+        self._wait_for_file()
         return self._path is not None and self._sha256 is not None
 
     def bind_to_run(
@@ -647,6 +671,9 @@ class Media(WBValue):
 
     def __eq__(self, other: object) -> bool:
         """Likely will need to override for any more complicated media objects"""
+        if isinstance(other, Media):
+            self._wait_for_file()
+            other._wait_for_file()
         return (
             isinstance(other, self.__class__)
             and hasattr(self, "_sha256")
@@ -1235,7 +1262,11 @@ class Video(BatchableMedia):
                 raise ValueError(
                     "wandb.Video accepts a file path or numpy like data as input"
                 )
-            self.encode()
+            if media_pool.get_media_pool() is not None:
+                # it's encoded later, after the caller may have changed it
+                self.data = self.data.copy()
+            if not self._set_file_in_background(self.encode, self.data.nbytes):
+                self.encode()
 
     def encode(self) -> None:
         mpy = util.get_module(
@@ -2135,6 +2166,7 @@ class Image(BatchableMedia):
         self._free_ram()
 
     def _initialize_from_wbimage(self, wbimage: "Image") -> None:
+        wbimage._wait_for_file()
         self._grouping = wbimage._grouping
         self._caption = wbimage._caption
         self._width = wbimage._width
@@ -2176,6 +2208,9 @@ class Image(BatchableMedia):
             self._image = pil_image.open(buf)
         elif isinstance(data, pil_image.Image):
             self._image = data
+            if media_pool.get_media_pool() is not None:
+                # it's encoded later, after the caller may have changed it
+                self._image = data.copy()
         elif util.is_pytorch_tensor_typename(util.get_full_typename(data)):
             vis_util = util.get_module(
                 "torchvision.utils", "torchvision is required to render images"
@@ -2195,9 +2230,22 @@ class Image(BatchableMedia):
                 self.to_uint8(data), mode=mode or self.guess_mode(data)
             )
 
-        tmp_path = os.path.join(_MEDIA_TMP.name, util.generate_id() + ".png")
         self.format = "png"
-        self._image.save(tmp_path, transparency=None)
+        width, height = self._image.size
+        nbytes = width * height * len(self._image.getbands())
+
+        def encode_in_background() -> None:
+            self._encode()
+            self._free_ram()
+
+        if not self._set_file_in_background(encode_in_background, nbytes):
+            self._encode()
+
+    def _encode(self) -> None:
+        image = self._image
+        assert image is not None
+        tmp_path = os.path.join(_MEDIA_TMP.name, util.generate_id() + ".png")
+        image.save(tmp_path, transparency=None)
         self._set_file(tmp_path, is_tmp=True)
 
     @classmethod
@@ -2418,6 +2466,91 @@ class Image(BatchableMedia):
 
         return meta
 
+    @classmethod
+    def seq_to_atlas_json(
+        cls: Type["Image"],
+        seq: Sequence["BatchableMedia"],
+        run: "LocalRun",
+        key: str,
+        step: Union[int, str],
+    ) -> Optional[dict]:
+        """
+        Packs a list of images into a single atlas file and returns a meta dictionary
+        with the offset of each image in it, or None if the images can't be packed
+        because they differ in size or mode, or carry masks or boxes.
+        """
+        if TYPE_CHECKING:
+            seq = cast(Sequence["Image"], seq)
+
+        np = util.get_module(
+            "numpy", required="Packing images into an atlas requires numpy"
+        )
+        pil_image = util.get_module(
+            "PIL.Image",
+            required='wandb.Image needs the PIL package. To get it, run "pip install pillow".',
+        )
+
+        images = [obj.image for obj in seq]
+        first = images[0]
+        if first is None or first.mode not in ("L", "RGB", "RGBA"):
+            return None
+        for obj, image in zip(seq, images):
+            if (
+                image is None
+                or image.size != first.size
+                or image.mode != first.mode
+                or obj._masks
+                or obj._boxes
+                or obj._classes is not None
+            ):
+                return None
+
+        width, height = first.size
+        count = len(images)
+        columns = min(count, cls.MAX_DIMENSION // width)
+        if columns < 1 or -(-count // columns) * height > cls.MAX_DIMENSION:
+            return None
+        rows = -(-count // columns)
+
+        # lay the images out on a grid of rows x columns with a single reshape
+        pixels = np.stack([np.asarray(image) for image in images])
+        channels = pixels.shape[3:]
+        grid = np.zeros((rows * columns,) + pixels.shape[1:], dtype=pixels.dtype)
+        grid[:count] = pixels
+        grid = grid.reshape((rows, columns, height, width) + channels)
+        grid = grid.swapaxes(1, 2).reshape((rows * height, columns * width) + channels)
+
+        media_path = os.path.join(
+            cls.get_media_subdir(), _wb_filename(key, step, "atlas", ".png")
+        )
+        path = os.path.join(run.dir, media_path)
+        util.mkdir_exists_ok(os.path.dirname(path))
+        pil_image.fromarray(grid, mode=first.mode).save(path)
+        with open(path, "rb") as f:
+            sha256 = hashlib.sha256(f.read()).hexdigest()
+        _datatypes_callback(media_path)
+
+        meta = {
+            "_type": "images/atlas",
+            "path": util.to_forward_slash_path(media_path),
+            "sha256": sha256,
+            "size": os.path.getsize(path),
+            "width": width,
+            "height": height,
+            "format": "png",
+            "count": count,
+            "offsets": [
+                [(i % columns) * width, (i // columns) * height] for i in range(count)
+            ],
+        }
+
+        captions = Image.all_captions(seq)
+
+        if captions:
+            meta["captions"] = captions
+
+        return meta
+
     @classmethod
     def all_masks(
         cls: Type["Image"],
@@ -2508,15 +2641,19 @@ class Image(BatchableMedia):
 
     @property
     def image(self) -> Optional["PIL.Image"]:
-        if self._image is None:
+        # read once, the media pool can free it once it's encoded
+        image = self._image
+        if image is None:
+            self._wait_for_file()
             if self._path is not None:
                 pil_image = util.get_module(
                     "PIL.Image",
                     required='wandb.Image needs the PIL package. To get it, run "pip install pillow".',
                 )
-                self._image = pil_image.open(self._path)
-                self._image.load()
-        return self._image
+                image = pil_image.open(self._path)
+                image.load()
+                self._image = image
+        return image
 
 
 class Plotly(Media):
@@ -2572,9 +2709,14 @@ class Plotly(Media):
 
 
 def history_dict_to_json(
-    run: "Optional[LocalRun]", payload: dict, step: Optional[int] = None
+    run: "Optional[LocalRun]",
+    payload: dict,
+    step: Optional[int] = None,
+    encoding: Optional[List[str]] = None,
 ) -> dict:
     # Converts a History row dict's elements so they're friendly for JSON serialization.
+    # If encoding is a list, top level values holding media that is still being
+    # encoded in the background are left as they are, and their keys appended to it.
 
     if step is None:
         # We should be at the top level of the History row; assume this key is set.
@@ -2583,7 +2725,9 @@ def history_dict_to_json(
     # We use list here because we were still seeing cases of RuntimeError dict changed size
     for key in list(payload):
         val = payload[key]
-        if isinstance(val, dict):
+        if encoding is not None and _is_encoding(val):
+            encoding.append(key)
+        elif isinstance(val, dict):
             payload[key] = history_dict_to_json(run, val, step=step)
         else:
             payload[key] = val_to_json(run, key, val, namespace=step)
@@ -2591,6 +2735,20 @@ def history_dict_to_json(
     return payload
 
 
+def _is_encoding(val: Any) -> bool:
+    """Returns whether val is, or holds, media still being encoded in the background."""
+    if isinstance(val, Media):
+        return val._encoding is not None and not val._encoding.done()
+    if isinstance(val, dict):
+        return any(_is_encoding(v) for v in six.itervalues(val))
+    if isinstance(val, (list, tuple)):
+        return any(
+            isinstance(v, Media) and v._encoding is not None and not v._encoding.done()
+            for v in val
+        )
+    return False
+
+
 # TODO: refine this
 def val_to_json(
     run: "Optional[LocalRun]",
@@ -2626,6 +2784,11 @@ def val_to_json(
 
             items = _prune_max_seq(val)
 
+            if isinstance(items[0], Image) and env.get_media_image_atlas():
+                atlas = Image.seq_to_atlas_json(items, run, key, namespace)
+                if atlas is not None:
+                    return atlas
+
             for i, item in enumerate(items):
                 item.bind_to_run(run, key, namespace, id_=i)
 
@@ -65,6 +65,39 @@ class TypeRegistry:
             _type = PythonObjectType.from_obj(py_obj)
         return _type
 
+    @staticmethod
+    def types_of(py_objs: t.Sequence[t.Any]) -> t.List["Type"]:
+        """Returns the distinct types of a column of python objects, in the order
+        they first occur. A numpy array of numbers or booleans resolves to a single
+        type without visiting its items, and other objects are resolved once per class
+        when their class alone determines their type.
+        """
+        if is_numpy_array(py_objs) and len(py_objs) > 0:
+            if py_objs.ndim > 1:  # type: ignore
+                return [NDArrayType(py_objs.shape[1:])]  # type: ignore
+            kind = py_objs.dtype.kind  # type: ignore
+            if kind == "b":
+                return [BooleanType()]
+            elif kind in "iufc":
+                return [NumberType()]
+
+        types: t.List[Type] = []
+        types_by_class: t.Dict[type, Type] = {}
+        for py_obj in py_objs:
+            _type = types_by_class.get(py_obj.__class__)
+            if _type is not None:
+                continue
+            _type = TypeRegistry.type_of(py_obj)
+            # floats can be nan, which is typed as None
+            if py_obj.__class__ != float and isinstance(
+                _type, (NoneType, StringType, NumberType, BooleanType, PythonObjectType)
+            ):
+                types_by_class[py_obj.__class__] = _type
+            # Type equality doesn't compare classes
+            if not any(_type.__class__ == t.__class__ and _type == t for t in types):
+                types.append(_type)
+        return types
+
     @staticmethod
     def type_from_dict(
         json_dict: t.Dict[str, t.Any], artifact: t.Optional["DownloadedArtifact"] = None
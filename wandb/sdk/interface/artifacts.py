@@ -1,16 +1,29 @@
 import base64
 import binascii
 import codecs
+import collections
 import contextlib
+import errno
 import hashlib
+import logging
+import multiprocessing
+import multiprocessing.dummy
 import os
 import random
+import shutil
+import sys
+import threading
+import time
 from typing import (
+    Any,
     Callable,
     Dict,
+    IO,
+    Iterable,
     List,
     Optional,
     Sequence,
+    Set,
     Tuple,
     TYPE_CHECKING,
     Union,
@@ -21,10 +34,17 @@ from wandb import env
 from wandb import util
 from wandb.data_types import WBValue
 
+try:
+    import sqlite3
+except ImportError:  # some python builds ship without sqlite
+    sqlite3 = None  # type: ignore
+
 
 if TYPE_CHECKING:
     import wandb.filesync.step_prepare.StepPrepare as StepPrepare  # type: ignore
 
+logger = logging.getLogger(__name__)
+
 
 def md5_string(string: str) -> str:
     hash_md5 = hashlib.md5()
@@ -52,6 +72,131 @@ def md5_file_hex(path: str) -> str:
     return md5_hash_file(path).hexdigest()
 
 
+def _md5_small_files_b64(paths: List[str]) -> List[str]:
+    digests = []
+    for path in paths:
+        with open(path, "rb") as f:
+            digest = hashlib.md5(f.read()).digest()
+        digests.append(base64.b64encode(digest).decode("ascii"))
+    return digests
+
+
+class HashStats(collections.namedtuple("HashStats", ("files", "bytes", "seconds"))):
+    def mb_per_second(self) -> float:
+        return self.bytes / 1024.0 / 1024.0 / max(self.seconds, 1e-6)
+
+    def files_per_second(self) -> float:
+        return self.files / max(self.seconds, 1e-6)
+
+    def __str__(self) -> str:
+        return "%d files, %.1f MB in %.1fs (%.1f MB/s, %.1f files/s)" % (
+            self.files,
+            self.bytes / 1024.0 / 1024.0,
+            self.seconds,
+            self.mb_per_second(),
+            self.files_per_second(),
+        )
+
+
+class FileHasher(object):
+    """Computes the md5s of many files in parallel.
+
+    Files of at least large_file_bytes are hashed one per task, in chunks.
+    Smaller files are read whole and hashed in batches, so per file overhead is
+    a single read. Both run on a thread pool: hashlib releases the GIL while
+    hashing, and this runs inside the user's process, which we must not fork.
+
+    The number of workers defaults to WANDB_ARTIFACT_HASH_WORKERS, or a few more
+    than the number of cpus so reads overlap.
+    """
+
+    LARGE_FILE_BYTES = 16 * 1024 * 1024
+    BATCH_FILES = 128
+    BATCH_BYTES = 16 * 1024 * 1024
+
+    def __init__(
+        self, max_workers: Optional[int] = None, large_file_bytes: Optional[int] = None
+    ) -> None:
+        self._max_workers = max(
+            1,
+            max_workers
+            or env.get_artifact_hash_workers()
+            or min(32, multiprocessing.cpu_count() + 4),
+        )
+        self._large_file_bytes = large_file_bytes or self.LARGE_FILE_BYTES
+        self.last_stats = HashStats(0, 0, 0.0)
+
+    def _small_batches(
+        self, paths: Sequence[str], sizes: Sequence[int], indexes: List[int]
+    ) -> List[List[int]]:
+        batches: List[List[int]] = []
+        batch: List[int] = []
+        batch_bytes = 0
+        for i in indexes:
+            if batch and (
+                len(batch) >= self.BATCH_FILES
+                or batch_bytes + sizes[i] > self.BATCH_BYTES
+            ):
+                batches.append(batch)
+                batch, batch_bytes = [], 0
+            batch.append(i)
+            batch_bytes += sizes[i]
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def md5_files_b64(
+        self, paths: Sequence[str], sizes: Optional[Sequence[int]] = None
+    ) -> List[str]:
+        start_time = time.time()
+        if sizes is None:
+            sizes = [os.path.getsize(path) for path in paths]
+        digests: List[str] = [""] * len(paths)
+        large = [i for i, size in enumerate(sizes) if size >= self._large_file_bytes]
+        small = [i for i, size in enumerate(sizes) if size < self._large_file_bytes]
+        batches = self._small_batches(paths, sizes, small)
+
+        if self._max_workers == 1 or len(large) + len(batches) <= 1:
+            for i in large:
+                digests[i] = md5_file_b64(paths[i])
+            for batch in batches:
+                batch_digests = _md5_small_files_b64([paths[i] for i in batch])
+                for i, digest in zip(batch, batch_digests):
+                    digests[i] = digest
+        else:
+            self._md5_parallel(paths, large, batches, digests)
+
+        self.last_stats = HashStats(len(paths), sum(sizes), time.time() - start_time)
+        if len(paths) > 1:
+            logger.info("Hashed %s", self.last_stats)
+        return digests
+
+    def _md5_parallel(
+        self,
+        paths: Sequence[str],
+        large: List[int],
+        batches: List[List[int]],
+        digests: List[str],
+    ) -> None:
+        threads = multiprocessing.dummy.Pool(self._max_workers)
+        try:
+            large_result = threads.map_async(
+                md5_file_b64, [paths[i] for i in large], chunksize=1
+            )
+            batch_digests = threads.map(
+                _md5_small_files_b64,
+                [[paths[i] for i in batch] for batch in batches],
+                chunksize=1,
+            )
+            for i, digest in zip(large, large_result.get()):
+                digests[i] = digest
+            for batch, batch_digest in zip(batches, batch_digests):
+                for i, digest in zip(batch, batch_digest):
+                    digests[i] = digest
+        finally:
+            threads.terminate()
+
+
 def bytes_to_hex(bytestr):
     # Works in python2 / python3
     return codecs.getencoder("hex")(bytestr)[0]
@@ -78,7 +223,7 @@ class ArtifactManifest(object):
     def __init__(self, artifact, storage_policy, entries=None):
         self.artifact = artifact
         self.storage_policy = storage_policy
-        self.entries = entries or {}
+        self.entries = entries if entries is not None else {}
 
     def to_manifest_json(self):
         raise NotImplementedError()
@@ -820,15 +965,419 @@ class StorageHandler(object):
         pass
 
 
+MATERIALIZE_COPY = "copy"
+MATERIALIZE_REFLINK = "reflink"
+MATERIALIZE_HARDLINK = "hardlink"
+MATERIALIZE_SYMLINK = "symlink"
+MATERIALIZE_STRATEGIES = (
+    MATERIALIZE_COPY,
+    MATERIALIZE_REFLINK,
+    MATERIALIZE_HARDLINK,
+    MATERIALIZE_SYMLINK,
+)
+
+# _IOW(0x94, 9, int) from linux/fs.h
+_FICLONE = 0x40049409
+
+
+def materialize_strategy(strategy: Optional[str] = None) -> str:
+    """Return strategy, or the one set by WANDB_ARTIFACT_MATERIALIZE if None.
+
+    Defaults to reflink, which falls back to a copy wherever it isn't supported.
+    """
+    if strategy is None:
+        strategy = env.get_artifact_materialize(default=MATERIALIZE_REFLINK)
+    strategy = strategy.lower()
+    if strategy not in MATERIALIZE_STRATEGIES:
+        logger.warning(
+            "Unknown artifact materialize strategy %s, copying files", strategy
+        )
+        strategy = MATERIALIZE_COPY
+    return strategy
+
+
+def _reflink(fsrc: IO, fdst: IO) -> None:
+    if not sys.platform.startswith("linux"):
+        raise OSError(errno.EOPNOTSUPP, "reflinks are only supported on linux")
+    import fcntl
+
+    fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+
+
+def copy_file_data(src: str, fdst: IO, reflink: bool = True) -> bool:
+    """Write the contents of the file src to the empty binary file fdst.
+
+    If reflink is True the data is first cloned, so both files share storage until
+    either is written to. Returns True if that worked, False if it was copied.
+    """
+    with open(src, "rb") as fsrc:
+        if reflink:
+            try:
+                _reflink(fsrc, fdst)
+                return True
+            except OSError as e:
+                logger.debug("Copying %s, reflink failed: %s", src, e)
+        shutil.copyfileobj(fsrc, fdst, 1024 * 1024)
+    return False
+
+
+def materialize_file(src: str, dst: str, strategy: Optional[str] = None) -> str:
+    """Place the contents of the file src at dst, sharing storage where possible.
+
+    strategy is one of MATERIALIZE_STRATEGIES, see materialize_strategy(). A link
+    that can't be made for this file (different filesystem, no permission, no
+    reflink support, ...) falls back to a copy. dst is atomically replaced and
+    never written through, so an existing hardlink at dst is left untouched.
+    Returns the strategy that was used.
+    """
+    strategy = materialize_strategy(strategy)
+    tmp_path = os.path.join(
+        os.path.dirname(dst),
+        "%s_%s" % (ArtifactsCache._TMP_PREFIX, util.rand_alphanumeric(length=8)),
+    )
+    used = MATERIALIZE_COPY
+    try:
+        try:
+            if strategy == MATERIALIZE_HARDLINK:
+                os.link(src, tmp_path)
+                used = strategy
+            elif strategy == MATERIALIZE_SYMLINK:
+                os.symlink(os.path.abspath(src), tmp_path)
+                used = strategy
+        except OSError as e:
+            logger.debug("Copying %s, %s failed: %s", src, strategy, e)
+        if used == MATERIALIZE_COPY:
+            with open(tmp_path, "wb") as f:
+                if copy_file_data(src, f, reflink=strategy != MATERIALIZE_COPY):
+                    used = MATERIALIZE_REFLINK
+            # keep the mtime, download() compares it to decide whether to copy
+            shutil.copystat(src, tmp_path)
+        os.replace(tmp_path, dst)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return used
+
+
+class _SqliteIndex(object):
+    """Base for the sqlite backed indexes kept in the artifacts cache.
+
+    Each thread gets its own connection. A corrupt database is deleted and
+    rebuilt once, any other error disables the index for this process, so
+    callers must treat it as best effort.
+    """
+
+    _SCHEMA: Tuple[str, ...] = ()
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._local = threading.local()
+        self._disabled = sqlite3 is None
+
+    def _connect(self) -> "sqlite3.Connection":
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            util.mkdir_exists_ok(os.path.dirname(self._path))
+            conn = sqlite3.connect(self._path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                for statement in self._SCHEMA:
+                    conn.execute(statement)
+            self._local.conn = conn
+        return conn
+
+    def _close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            conn.close()
+
+    def _run(self, fn: Callable[["sqlite3.Connection"], Any]) -> Any:
+        if self._disabled:
+            return None
+        name = type(self).__name__
+        for attempt in range(2):
+            try:
+                return fn(self._connect())
+            except sqlite3.OperationalError as e:
+                # locked for too long, read only filesystem, ...
+                logger.warning("Not using %s: %s", name, e)
+                self._disabled = True
+            except sqlite3.DatabaseError as e:
+                self._close()
+                if attempt:
+                    logger.warning("Not using %s: %s", name, e)
+                    self._disabled = True
+                    break
+                logger.warning("Rebuilding corrupt %s: %s", name, e)
+                for suffix in ("", "-wal", "-shm"):
+                    try:
+                        os.remove(self._path + suffix)
+                    except OSError:
+                        pass
+                continue
+            break
+        return None
+
+
+class FileDigestIndex(_SqliteIndex):
+    """Persistent record of file md5s so unchanged files are not hashed again.
+
+    Entries are keyed by absolute path and only used while the inode, size and
+    mtime of the file all still match. Files modified less than RACY_SECONDS
+    before they were hashed are not recorded, since a second write within the
+    same mtime tick would go unnoticed. If the index can not be used, files are
+    simply hashed.
+    """
+
+    RACY_SECONDS = 2
+    # stay below the default SQLITE_MAX_VARIABLE_NUMBER
+    _QUERY_BATCH = 500
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS md5 (path TEXT PRIMARY KEY, "
+        "inode INTEGER, size INTEGER, mtime_ns INTEGER, digest TEXT)",
+    )
+
+    @staticmethod
+    def _key(stat: os.stat_result) -> Tuple[int, int, int]:
+        inode = stat.st_ino
+        # sqlite integers are signed 64 bit
+        if inode >= 2 ** 63:
+            inode -= 2 ** 64
+        return inode, stat.st_size, stat.st_mtime_ns
+
+    def lookup(self, stats: Dict[str, os.stat_result]) -> Dict[str, str]:
+        """Return the recorded digest of each path whose stat still matches."""
+
+        def select(conn: "sqlite3.Connection") -> Dict[str, str]:
+            found = {}
+            paths = list(stats)
+            for i in range(0, len(paths), self._QUERY_BATCH):
+                batch = paths[i : i + self._QUERY_BATCH]
+                rows = conn.execute(
+                    "SELECT path, inode, size, mtime_ns, digest FROM md5 "
+                    "WHERE path IN (%s)" % ",".join("?" * len(batch)),
+                    batch,
+                )
+                for path, inode, size, mtime_ns, digest in rows:
+                    if self._key(stats[path]) == (inode, size, mtime_ns):
+                        found[path] = digest
+            return found
+
+        return self._run(select) or {}
+
+    def record(
+        self, entries: Iterable[Tuple[str, os.stat_result, str]], stat_time: float
+    ) -> None:
+        """Record (path, stat, digest) entries for files stat'ed at stat_time."""
+        racy_mtime_ns = int((stat_time - self.RACY_SECONDS) * 1e9)
+        rows = [
+            (path,) + self._key(stat) + (digest,)
+            for path, stat, digest in entries
+            if stat.st_mtime_ns < racy_mtime_ns
+        ]
+        if not rows:
+            return
+
+        def insert(conn: "sqlite3.Connection") -> None:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO md5 VALUES (?, ?, ?, ?, ?)", rows
+                )
+
+        self._run(insert)
+
+
+class LinkIndex(_SqliteIndex):
+    """Links to files in the cache, so cleanup() leaves those files alone.
+
+    A recorded link only protects its cache file while it is still a symlink to it
+    or a hardlink of it, stale records are dropped when the live ones are listed.
+    """
+
+    _SCHEMA = ("CREATE TABLE IF NOT EXISTS links (link TEXT PRIMARY KEY, target TEXT)",)
+
+    def add(self, link: str, target: str) -> bool:
+        """Record that link will be a link to target, False if it couldn't be."""
+
+        def insert(conn: "sqlite3.Connection") -> bool:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO links VALUES (?, ?)", (link, target)
+                )
+            return True
+
+        return bool(self._run(insert))
+
+    def live_targets(self) -> Set[str]:
+        """Return the targets of recorded links that still exist."""
+
+        def select(conn: "sqlite3.Connection") -> Set[str]:
+            targets = set()
+            stale = []
+            for link, target in conn.execute("SELECT link, target FROM links"):
+                try:
+                    if os.path.islink(link):
+                        live = os.readlink(link) == target
+                    else:
+                        live = os.path.samefile(link, target)
+                except OSError:
+                    live = False
+                if live:
+                    targets.add(target)
+                else:
+                    stale.append((link,))
+            if stale:
+                with conn:
+                    conn.executemany("DELETE FROM links WHERE link = ?", stale)
+            return targets
+
+        return self._run(select) or set()
+
+
+class CacheObjectIndex(_SqliteIndex):
+    """Size and last use of every file in the cache, for LRU eviction.
+
+    The total size is kept up to date by triggers, so checking it and finding
+    the least recently used files doesn't depend on the number of files cached.
+    The index starts out empty and is only complete once reset() has been called
+    with a listing of the cache.
+    """
+
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS objects (path TEXT PRIMARY KEY, "
+        "size INTEGER NOT NULL, last_used REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS objects_last_used ON objects (last_used)",
+        "CREATE TABLE IF NOT EXISTS totals (id INTEGER PRIMARY KEY CHECK (id = 0), "
+        "size INTEGER NOT NULL, scanned INTEGER NOT NULL)",
+        "INSERT OR IGNORE INTO totals VALUES (0, 0, 0)",
+        "CREATE TRIGGER IF NOT EXISTS objects_insert AFTER INSERT ON objects "
+        "BEGIN UPDATE totals SET size = size + NEW.size; END",
+        "CREATE TRIGGER IF NOT EXISTS objects_delete AFTER DELETE ON objects "
+        "BEGIN UPDATE totals SET size = size - OLD.size; END",
+        "CREATE TRIGGER IF NOT EXISTS objects_update AFTER UPDATE OF size ON objects "
+        "BEGIN UPDATE totals SET size = size - OLD.size + NEW.size; END",
+    )
+
+    def touch(self, entries: Iterable[Tuple[str, int]]) -> None:
+        """Record (path, size) entries as used now."""
+        now = time.time()
+        rows = [(path, size, now) for path, size in entries]
+        if not rows:
+            return
+
+        def upsert(conn: "sqlite3.Connection") -> None:
+            # INSERT OR REPLACE would skip the delete trigger
+            with conn:
+                conn.executemany(
+                    "UPDATE objects SET size = ?, last_used = ? WHERE path = ?",
+                    [(size, used, path) for path, size, used in rows],
+                )
+                conn.executemany("INSERT OR IGNORE INTO objects VALUES (?, ?, ?)", rows)
+
+        self._run(upsert)
+
+    def remove(self, paths: Iterable[str]) -> None:
+        rows = [(path,) for path in paths]
+
+        def delete(conn: "sqlite3.Connection") -> None:
+            with conn:
+                conn.executemany("DELETE FROM objects WHERE path = ?", rows)
+
+        if rows:
+            self._run(delete)
+
+    def reset(self, entries: Iterable[Tuple[str, int, float]]) -> bool:
+        """Replace the index with (path, size, last_used) entries for every file.
+
+        Returns False if the index can't be used.
+        """
+
+        rows = list(entries)
+
+        def replace(conn: "sqlite3.Connection") -> bool:
+            with conn:
+                conn.execute("DELETE FROM objects")
+                conn.executemany("INSERT INTO objects VALUES (?, ?, ?)", rows)
+                conn.execute(
+                    "UPDATE totals SET scanned = 1, "
+                    "size = (SELECT COALESCE(SUM(size), 0) FROM objects)"
+                )
+            return True
+
+        return bool(self._run(replace))
+
+    def status(self) -> Tuple[Optional[int], bool]:
+        """Return the total size of the files and whether reset() was called.
+
+        The size is None if the index can't be used.
+        """
+
+        def select(conn: "sqlite3.Connection") -> Tuple[int, bool]:
+            size, scanned = conn.execute("SELECT size, scanned FROM totals").fetchone()
+            return size, bool(scanned)
+
+        return self._run(select) or (None, False)
+
+    def sizes(self, paths: Iterable[str]) -> Dict[str, int]:
+        paths = list(paths)
+
+        def select(conn: "sqlite3.Connection") -> Dict[str, int]:
+            found = {}
+            for i in range(0, len(paths), FileDigestIndex._QUERY_BATCH):
+                batch = paths[i : i + FileDigestIndex._QUERY_BATCH]
+                found.update(
+                    conn.execute(
+                        "SELECT path, size FROM objects WHERE path IN (%s)"
+                        % ",".join("?" * len(batch)),
+                        batch,
+                    )
+                )
+            return found
+
+        return self._run(select) or {}
+
+    def least_recently_used(self, limit: int) -> List[Tuple[str, int]]:
+        def select(conn: "sqlite3.Connection") -> List[Tuple[str, int]]:
+            return conn.execute(
+                "SELECT path, size FROM objects ORDER BY last_used LIMIT ?", (limit,)
+            ).fetchall()
+
+        return self._run(select) or []
+
+
 class ArtifactsCache(object):
 
     _TMP_PREFIX = "tmp"
+    _INDEX_DIR = "index"
+    # background eviction goes this far below max_size, so it doesn't run on
+    # every write once the cache is full
+    _EVICT_LOW_WATER = 0.9
+    _EVICT_BATCH = 100
 
-    def __init__(self, cache_dir):
+    def __init__(self, cache_dir, max_size=None):
         self._cache_dir = cache_dir
+        self._max_size = max_size if max_size is not None else _env_cache_max_size()
         util.mkdir_exists_ok(self._cache_dir)
         self._md5_obj_dir = os.path.join(self._cache_dir, "obj", "md5")
         self._etag_obj_dir = os.path.join(self._cache_dir, "obj", "etag")
+        self._digest_index = FileDigestIndex(
+            os.path.join(self._cache_dir, self._INDEX_DIR, "md5.db")
+        )
+        self._link_index = LinkIndex(
+            os.path.join(self._cache_dir, self._INDEX_DIR, "links.db")
+        )
+        self._object_index = CacheObjectIndex(
+            os.path.join(self._cache_dir, self._INDEX_DIR, "objects.db")
+        )
+        self._evict_lock = threading.Lock()
+        self._evict_thread = None
+        self._linked_bytes = 0
+        self._scan_started = False
         self._artifacts_by_id = {}
         self._random = random.Random()
         self._random.seed()
@@ -839,6 +1388,7 @@ class ArtifactsCache(object):
         path = os.path.join(self._cache_dir, "obj", "md5", hex_md5[:2], hex_md5[2:])
         opener = self._cache_opener(path)
         if os.path.isfile(path) and os.path.getsize(path) == size:
+            self._object_index.touch([(os.path.abspath(path), size)])
             return path, True, opener
         util.mkdir_exists_ok(os.path.dirname(path))
         return path, False, opener
@@ -847,10 +1397,79 @@ class ArtifactsCache(object):
         path = os.path.join(self._cache_dir, "obj", "etag", etag[:2], etag[2:])
         opener = self._cache_opener(path)
         if os.path.isfile(path) and os.path.getsize(path) == size:
+            self._object_index.touch([(os.path.abspath(path), size)])
             return path, True, opener
         util.mkdir_exists_ok(os.path.dirname(path))
         return path, False, opener
 
+    def check_manifest_path(self, artifact_id: str) -> Tuple[str, bool, Callable]:
+        """Where the manifest json of the committed artifact_id is cached.
+
+        Manifests are cached like objects, so cleanup() can evict them.
+        """
+        hex_id = hashlib.md5(artifact_id.encode("utf-8")).hexdigest()
+        path = os.path.join(self._cache_dir, "manifests", hex_id[:2], hex_id[2:])
+        opener = self._cache_opener(path)
+        if os.path.isfile(path):
+            self._object_index.touch([(os.path.abspath(path), os.path.getsize(path))])
+            return path, True, opener
+        util.mkdir_exists_ok(os.path.dirname(path))
+        return path, False, opener
+
+    def md5_file_b64(self, path: str) -> str:
+        return self.md5_files_b64([path])[0]
+
+    def md5_files_b64(
+        self,
+        paths: Sequence[str],
+        stats: Optional[Sequence[os.stat_result]] = None,
+        hasher: Optional[FileHasher] = None,
+    ) -> List[str]:
+        """Return the md5 of each file, hashing only files changed since last time.
+
+        stats, if given, are fresh os.stat() results for paths. Files that are not
+        in the digest index are hashed with hasher, a default FileHasher if None.
+        """
+        stat_time = time.time()
+        if stats is None:
+            stats = [os.stat(path) for path in paths]
+        abs_stats = {os.path.abspath(path): stat for path, stat in zip(paths, stats)}
+        digests = self._digest_index.lookup(abs_stats)
+        missing = [path for path in abs_stats if path not in digests]
+        if missing:
+            hasher = hasher or FileHasher()
+            hashed = hasher.md5_files_b64(
+                missing, [abs_stats[path].st_size for path in missing]
+            )
+            digests.update(zip(missing, hashed))
+            self._digest_index.record(
+                [
+                    (path, abs_stats[path], digest)
+                    for path, digest in zip(missing, hashed)
+                ],
+                stat_time,
+            )
+        return [digests[os.path.abspath(path)] for path in paths]
+
+    def materialize(
+        self, cache_path: str, target_path: str, strategy: Optional[str] = None
+    ) -> str:
+        """Place the cached file cache_path at target_path, outside of the cache.
+
+        Links are recorded so that cleanup() keeps the files they point to. With
+        hardlinks and symlinks, writing to target_path in place changes the cached
+        file too. Returns the strategy that was used, see materialize_file().
+        """
+        strategy = materialize_strategy(strategy)
+        if strategy in (
+            MATERIALIZE_HARDLINK,
+            MATERIALIZE_SYMLINK,
+        ) and not self._link_index.add(
+            os.path.abspath(target_path), os.path.abspath(cache_path)
+        ):
+            strategy = MATERIALIZE_REFLINK
+        return materialize_file(cache_path, target_path, strategy)
+
     def get_artifact(self, artifact_id):
         return self._artifacts_by_id.get(artifact_id)
 
@@ -863,14 +1482,36 @@ class ArtifactsCache(object):
     def store_client_artifact(self, artifact):
         self._artifacts_by_client_id[artifact._client_id] = artifact
 
-    def cleanup(self, target_size: int) -> int:
-        bytes_reclaimed: int = 0
-        paths: Dict[os.PathLike, os.stat_result] = {}
-        total_size: int = 0
-        for root, _, files in os.walk(self._cache_dir):
+    def cleanup(self, target_size: int, rescan: bool = False) -> int:
+        """Remove least recently used files until the cache is below target_size.
+
+        Only the removed files are looked at, except the first time (or with
+        rescan) when the whole cache is listed to build the index. Leftover
+        temporary files are removed by that listing. Returns the bytes reclaimed.
+        """
+        bytes_reclaimed = 0
+        _, scanned = self._object_index.status()
+        if rescan or not scanned:
+            bytes_reclaimed, stats = self._scan()
+            if not self._object_index.reset(
+                (path, stat.st_size, stat.st_atime) for path, stat in stats.items()
+            ):
+                return bytes_reclaimed + self._cleanup_stats(stats, target_size)
+        return bytes_reclaimed + self._evict(target_size)
+
+    def _scan(self) -> Tuple[int, Dict[str, os.stat_result]]:
+        """List the files in the cache, removing temporary ones."""
+        bytes_reclaimed = 0
+        stats = {}
+        for root, dirs, files in os.walk(self._cache_dir):
+            if root == self._cache_dir and self._INDEX_DIR in dirs:
+                dirs.remove(self._INDEX_DIR)
             for file in files:
-                path = os.path.join(root, file)
-                stat = os.stat(path)
+                path = os.path.abspath(os.path.join(root, file))
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
 
                 if file.startswith(ArtifactsCache._TMP_PREFIX):
                     try:
@@ -880,13 +1521,25 @@ class ArtifactsCache(object):
                         pass
                     continue
 
-                paths[path] = stat
-                total_size += stat.st_size
-
+                stats[path] = stat
+        return bytes_reclaimed, stats
+
+    def _cleanup_stats(self, stats: Dict[str, os.stat_result], target_size: int) -> int:
+        """Remove files by atime, for when the object index can't be used."""
+        bytes_reclaimed = 0
+        linked = self._link_index.live_targets()
+        # removing a file that is hardlinked elsewhere frees nothing, and
+        # removing the target of a symlink would break it
+        paths = {
+            path: stat
+            for path, stat in stats.items()
+            if stat.st_nlink == 1 and path not in linked
+        }
+        total_size = sum(stat.st_size for stat in paths.values())
         sorted_paths = sorted(paths.items(), key=lambda x: x[1].st_atime)
         for path, stat in sorted_paths:
-            if total_size < target_size:
-                return bytes_reclaimed
+            if total_size <= target_size:
+                break
 
             try:
                 os.remove(path)
@@ -897,6 +1550,125 @@ class ArtifactsCache(object):
             bytes_reclaimed += stat.st_size
         return bytes_reclaimed
 
+    def _evict(self, target_size: int) -> int:
+        """Remove least recently used files in the object index until the cache
+        is below target_size, returns the bytes reclaimed."""
+        bytes_reclaimed = 0
+        total_size, _ = self._object_index.status()
+        if total_size is None:
+            return 0
+        linked = self._link_index.live_targets()
+        # linked files aren't removed, so they don't count towards the size
+        self._linked_bytes = sum(self._object_index.sizes(linked).values())
+        total_size -= self._linked_bytes
+        skipped = set()
+        while total_size > target_size:
+            batch = self._object_index.least_recently_used(self._EVICT_BATCH)
+            if not batch or all(path in skipped for path, _ in batch):
+                break
+            removed = []
+            in_use = []
+            for path, size in batch:
+                if total_size <= target_size:
+                    break
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    # removed by someone else
+                    removed.append(path)
+                    total_size -= size
+                    continue
+                if path in linked:
+                    in_use.append((path, size))
+                    continue
+                if stat.st_nlink > 1:
+                    # hardlinked by something we didn't record
+                    in_use.append((path, size))
+                    total_size -= size
+                    continue
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    logger.warning("Couldn't evict %s from cache: %s", path, e)
+                    in_use.append((path, size))
+                    continue
+                removed.append(path)
+                total_size -= size
+                bytes_reclaimed += size
+            skipped.update(path for path, _ in in_use)
+            self._object_index.remove(removed)
+            # move them to the back of the queue
+            self._object_index.touch(in_use)
+        return bytes_reclaimed
+
+    def _maybe_evict(self) -> None:
+        """Start evicting in the background if the cache has grown past max_size."""
+        if not self._max_size:
+            return
+        total_size, scanned = self._object_index.status()
+        if total_size is None:
+            return
+        if scanned and total_size - self._linked_bytes <= self._max_size:
+            return
+        if not scanned and self._scan_started:
+            return
+        if not self._evict_lock.acquire(False):
+            return
+        self._scan_started = True
+        self._evict_thread = threading.Thread(
+            target=self._evict_in_background, name="ArtifactsCacheEvict"
+        )
+        self._evict_thread.daemon = True
+        self._evict_thread.start()
+
+    def _evict_in_background(self) -> None:
+        try:
+            bytes_reclaimed = self.cleanup(int(self._max_size * self._EVICT_LOW_WATER))
+            logger.info("Evicted %d bytes from the artifacts cache", bytes_reclaimed)
+        except Exception:
+            logger.exception("Failed to evict from the artifacts cache")
+        finally:
+            self._evict_lock.release()
+
+    def partial_path(self, path: str) -> str:
+        """Where a download of the cache file path can be staged and resumed.
+
+        Move it into place with commit_partial() once it is complete. Partial files
+        have the temporary prefix, so a cleanup that lists the cache removes them.
+        The path is the same for every download of the file, so downloads have to
+        take turns using it.
+        """
+        dirname, name = os.path.split(path)
+        return os.path.join(dirname, "%s_%s.part" % (self._TMP_PREFIX, name))
+
+    def commit_partial(self, partial_path: str, path: str) -> None:
+        self._commit(partial_path, path)
+
+    def _commit(self, tmp_file: str, path: str) -> None:
+        try:
+            # Use replace where we can, as it implements an atomic
+            # move on most platforms. If it doesn't exist, we have
+            # to use rename which isn't atomic in all cases but there
+            # isn't a better option.
+            #
+            # The atomic replace is important in the event multiple processes
+            # attempt to write to / read from the cache at the same time. Each
+            # writer firsts stages its writes to a temporary file in the cache.
+            # Once it is finished, we issue an atomic replace operation to update
+            # the cache. Although this can result in redundant downloads, this
+            # guarantees that readers can NEVER read incomplete files from the
+            # cache.
+            #
+            # IMPORTANT: Replace is NOT atomic across different filesystems. This why
+            # it is critical that the temporary files sit directly in the cache --
+            # they need to be on the same filesystem!
+            os.replace(tmp_file, path)
+        except AttributeError:
+            os.rename(tmp_file, path)
+
+        self._object_index.touch([(os.path.abspath(path), os.path.getsize(path))])
+        self._maybe_evict()
+
     def _cache_opener(self, path):
         @contextlib.contextmanager
         def helper(mode="w"):
@@ -912,30 +1684,22 @@ class ArtifactsCache(object):
             with util.fsync_open(tmp_file, mode=mode) as f:
                 yield f
 
-            try:
-                # Use replace where we can, as it implements an atomic
-                # move on most platforms. If it doesn't exist, we have
-                # to use rename which isn't atomic in all cases but there
-                # isn't a better option.
-                #
-                # The atomic replace is important in the event multiple processes
-                # attempt to write to / read from the cache at the same time. Each
-                # writer firsts stages its writes to a temporary file in the cache.
-                # Once it is finished, we issue an atomic replace operation to update
-                # the cache. Although this can result in redundant downloads, this
-                # guarantees that readers can NEVER read incomplete files from the
-                # cache.
-                #
-                # IMPORTANT: Replace is NOT atomic across different filesystems. This why
-                # it is critical that the temporary files sit directly in the cache --
-                # they need to be on the same filesystem!
-                os.replace(tmp_file, path)
-            except AttributeError:
-                os.rename(tmp_file, path)
+            self._commit(tmp_file, path)
 
         return helper
 
 
+def _env_cache_max_size() -> Optional[int]:
+    max_size = env.get_artifact_cache_max_size()
+    if not max_size:
+        return None
+    try:
+        return util.from_human_size(max_size)
+    except ValueError:
+        logger.warning("Ignoring invalid artifacts cache max size %s", max_size)
+        return None
+
+
 _artifacts_cache = None
 
 
@@ -7,10 +7,11 @@ Manage backend sender.
 """
 
 from abc import abstractmethod
+import concurrent.futures
 import json
 import logging
 import os
-from typing import Any, Iterable, Optional, Tuple, Union
+from typing import Any, Iterable, List, Optional, Tuple, Union
 from typing import TYPE_CHECKING
 
 import six
@@ -30,6 +31,7 @@ from wandb.util import (
 from . import summary_record as sr
 from .artifacts import ArtifactManifest
 from .message_future import MessageFuture
+from ..lib import media_pool, proto_util
 from ..wandb_artifacts import Artifact
 
 if TYPE_CHECKING:
@@ -61,9 +63,13 @@ def file_enum_to_policy(enum: "pb.FilesItem.PolicyType.V") -> str:
 
 class InterfaceBase(object):
     _run: Optional["Run"]
+    _history_executor: Optional[concurrent.futures.ThreadPoolExecutor]
+    _history_future: Optional[concurrent.futures.Future]
 
     def __init__(self) -> None:
         self._run = None
+        self._history_executor = None
+        self._history_future = None
 
     def _hack_set_run(self, run: "Run") -> None:
         self._run = run
@@ -488,16 +494,70 @@ class InterfaceBase(object):
         self, data: dict, step: int = None, run: "Run" = None, publish_step: bool = True
     ) -> None:
         run = run or self._run
-        data = data_types.history_dict_to_json(run, data, step=step)
+        # Media in the row may still be encoding in the background. Everything
+        # else is serialized now, before the caller can change it.
+        encoding: Optional[List[str]] = None
+        if media_pool.get_media_pool() is not None:
+            encoding = []
+        namespace = step if step is not None else data.get("_step")
+        data = data_types.history_dict_to_json(run, data, step=step, encoding=encoding)
         history = pb.HistoryRecord()
         if publish_step:
             assert step is not None
             history.step.num = step
         data.pop("_step", None)
         for k, v in six.iteritems(data):
+            if encoding and k in encoding:
+                continue
             item = history.item.add()
             item.key = k
-            item.value_json = json_dumps_safer_history(v)  # type: ignore
+            proto_util.history_item_set_value(item, v, json_dumps_safer_history)
+
+        if not encoding and self._history_published():
+            self._publish_history(history)
+            return
+
+        # Rows waiting for media, and any rows after them, are published in
+        # order on a thread of their own.
+        if self._history_executor is None:
+            self._history_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="wandb-history"
+            )
+        media = {k: data[k] for k in encoding or ()}
+        self._history_future = self._history_executor.submit(
+            self._publish_history_media, history, media, namespace, run
+        )
+
+    def _history_published(self) -> bool:
+        future = self._history_future
+        return future is None or future.done()
+
+    def flush_history(self) -> None:
+        """Wait for history rows waiting on media encoding to be published.
+
+        Config, summary and metric records call this first, so they reach the
+        internal process after the rows logged before them.
+        """
+        future = self._history_future
+        if future is not None:
+            future.result()
+
+    def _publish_history_media(
+        self,
+        history: pb.HistoryRecord,
+        media: dict,
+        step: Optional[int],
+        run: Optional["Run"],
+    ) -> None:
+        for k, v in six.iteritems(media):
+            try:
+                v = data_types.history_dict_to_json(run, {k: v}, step=step)[k]
+                item = pb.HistoryItem(key=k)
+                proto_util.history_item_set_value(item, v, json_dumps_safer_history)
+            except Exception:
+                logger.exception("failed to encode %s logged at step %s", k, step)
+                continue
+            history.item.append(item)
         self._publish_history(history)
 
     @abstractmethod
@@ -79,16 +79,19 @@ class InterfaceGrpc(InterfaceBase):
         _ = self._stub.RunUpdate(run)
 
     def _publish_config(self, cfg: pb.ConfigRecord) -> None:
+        self.flush_history()
         assert self._stub
         self._assign(cfg)
         _ = self._stub.Config(cfg)
 
     def _publish_metric(self, metric: pb.MetricRecord) -> None:
+        self.flush_history()
         assert self._stub
         self._assign(metric)
         _ = self._stub.Metric(metric)
 
     def _publish_summary(self, summary: pb.SummaryRecord) -> None:
+        self.flush_history()
         assert self._stub
         self._assign(summary)
         _ = self._stub.Summary(summary)
@@ -293,6 +293,7 @@ class InterfaceQueue(InterfaceBase):
         self._publish(rec)
 
     def _publish_config(self, cfg: pb.ConfigRecord) -> None:
+        self.flush_history()
         rec = self._make_record(config=cfg)
         self._publish(rec)
 
@@ -301,10 +302,12 @@ class InterfaceQueue(InterfaceBase):
         self._publish_summary(pb_summary_record)
 
     def _publish_summary(self, summary: pb.SummaryRecord) -> None:
+        self.flush_history()
         rec = self._make_record(summary=summary)
         self._publish(rec)
 
     def _publish_metric(self, metric: pb.MetricRecord) -> None:
+        self.flush_history()
         rec = self._make_record(metric=metric)
         self._publish(rec)
 
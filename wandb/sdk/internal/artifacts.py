@@ -1,5 +1,6 @@
 #
 import json
+import logging
 import os
 import tempfile
 import threading
@@ -9,7 +10,7 @@ import wandb
 from wandb import util
 import wandb.filesync.step_prepare
 
-from ..interface.artifacts import ArtifactManifest
+from ..interface.artifacts import ArtifactManifest, get_artifacts_cache
 
 
 if TYPE_CHECKING:
@@ -17,6 +18,8 @@ if TYPE_CHECKING:
     from .file_pusher import FilePusher
     from wandb.proto import wandb_internal_pb2
 
+logger = logging.getLogger(__name__)
+
 
 def _manifest_json_from_proto(manifest: "wandb_internal_pb2.ArtifactManifest") -> Dict:
     if manifest.version == 1:
@@ -147,6 +150,14 @@ class ArtifactSaver(object):
         elif distributed_id:
             manifest_type = "PATCH"
             manifest_filename = "wandb_manifest.patch.json"
+
+        # An incremental manifest is applied on top of the latest version, so
+        # only the entries that differ from it need to be prepared and uploaded.
+        base_contents = None
+        if incremental and latest_artifact_id is not None:
+            base_contents = self._load_manifest_contents(latest_artifact_id)
+            if base_contents is not None:
+                self._remove_unchanged_entries(base_contents)
         artifact_manifest_id, _ = self._api.create_artifact_manifest(
             manifest_filename,
             "",
@@ -178,9 +189,10 @@ class ArtifactSaver(object):
 
         def before_commit() -> None:
             self._resolve_client_id_manifest_references()
+            manifest_json = self._manifest.to_manifest_json()
             with tempfile.NamedTemporaryFile("w+", suffix=".json", delete=False) as fp:
                 path = os.path.abspath(fp.name)
-                json.dump(self._manifest.to_manifest_json(), fp, indent=4)
+                json.dump(manifest_json, fp, indent=4)
             digest = wandb.util.md5_file(path)
             if distributed_id or incremental:
                 # If we're in the distributed flow, we want to update the
@@ -211,6 +223,17 @@ class ArtifactSaver(object):
             with open(path, "rb") as fp:  # type: ignore
                 self._api.upload_file_retry(upload_url, fp, extra_headers=extra_headers)
 
+            # Cache the complete manifest, so the next incremental version can
+            # diff against it without downloading it.
+            if base_contents is not None:
+                contents = dict(base_contents)
+                contents.update(manifest_json["contents"])
+                self._store_manifest_json(
+                    artifact_id, dict(manifest_json, contents=contents)
+                )
+            elif not distributed_id and not (incremental and latest_artifact_id):
+                self._store_manifest_json(artifact_id, manifest_json)
+
         def on_commit() -> None:
             if finalize and use_after_commit:
                 self._api.use_artifact(artifact_id)
@@ -232,6 +255,42 @@ class ArtifactSaver(object):
 
         return self._server_artifact
 
+    def _load_manifest_contents(self, artifact_id: str) -> Optional[Dict]:
+        """Returns the manifest contents of a committed artifact, or None."""
+        path, hit, _ = get_artifacts_cache().check_manifest_path(artifact_id)
+        try:
+            if hit:
+                with open(path) as f:
+                    return json.load(f)["contents"]
+            url = self._api.artifact_manifest_url(artifact_id)
+            if url is None:
+                return None
+            _, response = self._api.download_file(url)
+            manifest_json = json.loads(response.content)
+        except Exception:
+            logger.exception("failed to load manifest of artifact %s", artifact_id)
+            return None
+        self._store_manifest_json(artifact_id, manifest_json)
+        return manifest_json["contents"]
+
+    def _store_manifest_json(self, artifact_id: str, manifest_json: Dict) -> None:
+        _, hit, cache_open = get_artifacts_cache().check_manifest_path(artifact_id)
+        if not hit:
+            with cache_open() as f:
+                json.dump(manifest_json, f)
+
+    def _remove_unchanged_entries(self, base_contents: Dict) -> None:
+        entries = self._manifest.entries
+        unchanged = [
+            path
+            for path, entry in entries.sorted_items()
+            if path in base_contents
+            and entry["digest"] == base_contents[path]["digest"]
+            and entry.get("ref") == base_contents[path].get("ref")
+        ]
+        for path in unchanged:
+            del entries[path]
+
     def _resolve_client_id_manifest_references(self) -> None:
         for entry_path in self._manifest.entries:
             entry = self._manifest.entries[entry_path]
@@ -15,15 +15,34 @@ header :=
   ident: char[4]
   magic: uint16
   version: uint8
+
+An optional sidecar index (fname + ".idx") lists the offset, record type and
+history step of every record so readers can seek without a full scan:
+
+index := index_header entry*
+index_header :=
+  ident: char[4]
+  version: uint8
+  indexed: uint64      // bytes of the log covered by the index
+entry :=
+  offset: uint64       // offset of the first chunk of the record
+  type: uint16         // Record.record_type field number
+  step: int64          // history step, -1 if not a history record
 """
 from __future__ import print_function
 
+from array import array
 import logging
+import mmap
 import os
 import struct
+import time
 import zlib
 
 import wandb
+from wandb.proto import wandb_internal_pb2
+
+from ..lib import proto_util
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +61,10 @@ LEVELDBLOG_HEADER_MAGIC = (
 )
 LEVELDBLOG_HEADER_VERSION = 0
 
+LEVELDBLOG_INDEX_SUFFIX = ".idx"
+LEVELDBLOG_INDEX_IDENT = ":WBI"
+LEVELDBLOG_INDEX_VERSION = 0
+
 try:
     bytes("", "ascii")
 
@@ -57,6 +80,13 @@ except Exception:
     # bytestostr = str
 
 
+def _crc_table():
+    crc = [0] * (LEVELDBLOG_LAST + 1)
+    for x in range(1, LEVELDBLOG_LAST + 1):
+        crc[x] = zlib.crc32(strtobytes(chr(x))) & 0xFFFFFFFF
+    return crc
+
+
 class DataStore(object):
     def __init__(self):
         self._opened_for_scan = False
@@ -64,14 +94,59 @@ class DataStore(object):
         self._index = 0
         self._size_bytes = 0
 
-        self._crc = [0] * (LEVELDBLOG_LAST + 1)
-        for x in range(1, LEVELDBLOG_LAST + 1):
-            self._crc[x] = zlib.crc32(strtobytes(chr(x))) & 0xFFFFFFFF
+        self._crc = _crc_table()
+
+        # group commit state, see set_group_commit()
+        self._buf = None
+        self._fsync_seconds = 0
+        self._fsync_bytes = 0
+        self._unsynced_bytes = 0
+        self._fsync_time = 0
 
         assert (
             wandb._assert_is_internal_process
         ), "DataStore can only be used in the internal process"
 
+    def set_group_commit(self, fsync_seconds=0, fsync_bytes=0):
+        """Buffer records in memory until commit() is called.
+
+        Each commit writes the buffered blocks with a single write and fsyncs
+        once fsync_seconds have passed or fsync_bytes have been written since
+        the last fsync (0 disables that trigger). The bytes on disk are the same
+        as with unbuffered writes.
+        """
+        self._buf = bytearray()
+        self._fsync_seconds = fsync_seconds
+        self._fsync_bytes = fsync_bytes
+        self._fsync_time = time.time()
+
+    def pending_bytes(self):
+        return len(self._buf) if self._buf else 0
+
+    def commit(self):
+        if self._buf is None:
+            return
+        if self._buf:
+            self._fp.write(self._buf)
+            self._fp.flush()
+            self._unsynced_bytes += len(self._buf)
+            self._buf = bytearray()
+        if not self._unsynced_bytes:
+            return
+        now = time.time()
+        if (self._fsync_bytes and self._unsynced_bytes >= self._fsync_bytes) or (
+            self._fsync_seconds and now - self._fsync_time >= self._fsync_seconds
+        ):
+            os.fsync(self._fp.fileno())
+            self._unsynced_bytes = 0
+            self._fsync_time = now
+
+    def _write_bytes(self, data):
+        if self._buf is not None:
+            self._buf += data
+        else:
+            self._fp.write(data)
+
     def open_for_write(self, fname):
         self._fname = fname
         logger.info("open: %s", fname)
@@ -208,9 +283,9 @@ class DataStore(object):
         checksum = zlib.crc32(s, self._crc[dtype]) & 0xFFFFFFFF
         # logger.info("write_record: index=%d len=%d dtype=%d",
         #     self._index, dlength, dtype)
-        self._fp.write(struct.pack("<IHB", checksum, dlength, dtype))
+        self._write_bytes(struct.pack("<IHB", checksum, dlength, dtype))
         if dlength:
-            self._fp.write(s)
+            self._write_bytes(s)
         self._index += LEVELDBLOG_HEADER_LEN + len(s)
 
     def _write_data(self, s):
@@ -226,7 +301,7 @@ class DataStore(object):
         #     self._index, offset, data_left)
         if space_left < LEVELDBLOG_HEADER_LEN:
             pad = "\x00" * space_left
-            self._fp.write(strtobytes(pad))
+            self._write_bytes(strtobytes(pad))
             self._index += space_left
             offset = 0
             space_left = LEVELDBLOG_BLOCK_LEN
@@ -254,8 +329,9 @@ class DataStore(object):
 
             # write last and flush the entire block to disk
             self._write_record(s[data_used:], LEVELDBLOG_LAST)
-            self._fp.flush()
-            os.fsync(self._fp.fileno())
+            if self._buf is None:
+                self._fp.flush()
+                os.fsync(self._fp.fileno())
 
         return file_offset, self._index - file_offset, flush_index, flush_offset
 
@@ -277,6 +353,303 @@ class DataStore(object):
         return ret
 
     def close(self):
+        if self._fp is not None:
+            self.commit()
+            logger.info("close: %s", self._fname)
+            self._fp.close()
+            self._fp = None
+
+
+class DataStoreReader(object):
+    """Scan a transaction log through a read-only memory map.
+
+    Records that fit in a single block are returned as memoryview slices of the
+    map without copying, records that span blocks are joined into a new buffer.
+    Payloads must be released (or go out of scope) before calling close().
+    """
+
+    def __init__(self):
+        self._fname = None
+        self._fp = None
+        self._mm = None
+        self._view = None
+        self._index = 0
+        self._size_bytes = 0
+        self._crc = _crc_table()
+
+    def open_for_scan(self, fname):
+        self._fname = fname
+        logger.info("open for mmap scan: %s", fname)
+        self._fp = open(fname, "rb")
+        self._size_bytes = os.fstat(self._fp.fileno()).st_size
+        assert (
+            self._size_bytes >= LEVELDBLOG_HEADER_LEN
+        ), "header is {} bytes instead of the expected {}".format(
+            self._size_bytes, LEVELDBLOG_HEADER_LEN
+        )
+        self._mm = mmap.mmap(self._fp.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mm)
+        self._index = 0
+        self._read_header()
+
+    def in_last_block(self):
+        """When reading, we want to know if we're in the last block to
+           handle in progress writes"""
+        return self._index > self._size_bytes - LEVELDBLOG_DATA_LEN
+
+    def tell(self):
+        return self._index
+
+    def seek(self, offset):
+        assert (
+            LEVELDBLOG_HEADER_LEN <= offset <= self._size_bytes
+        ), "offset {} is outside of the log".format(offset)
+        self._index = offset
+
+    def _read_header(self):
+        ident, magic, version = struct.unpack_from("<4sHB", self._view, 0)
+        if ident != strtobytes(LEVELDBLOG_HEADER_IDENT):
+            raise Exception("Invalid header")
+        if magic != LEVELDBLOG_HEADER_MAGIC:
+            raise Exception("Invalid header")
+        if version != LEVELDBLOG_HEADER_VERSION:
+            raise Exception("Invalid header")
+        self._index = LEVELDBLOG_HEADER_LEN
+
+    def _skip_pad(self):
+        offset = self._index % LEVELDBLOG_BLOCK_LEN
+        space_left = LEVELDBLOG_BLOCK_LEN - offset
+        if space_left >= LEVELDBLOG_HEADER_LEN or self._index == self._size_bytes:
+            return
+        pad = self._view[self._index : self._index + space_left]  # noqa: E203
+        # verify they are zero
+        assert pad == b"\x00" * space_left, "invald padding"
+        self._index += space_left
+
+    def _scan_record(self):
+        if self._index == self._size_bytes:
+            return None
+        header_end = self._index + LEVELDBLOG_HEADER_LEN
+        assert (
+            header_end <= self._size_bytes
+        ), "record header is {} bytes instead of the expected {}".format(
+            self._size_bytes - self._index, LEVELDBLOG_HEADER_LEN
+        )
+        checksum, dlength, dtype = struct.unpack_from("<IHB", self._view, self._index)
+        assert (
+            header_end + dlength <= self._size_bytes
+        ), "record data is {} bytes instead of the expected {}".format(
+            self._size_bytes - header_end, dlength
+        )
+        data = self._view[header_end : header_end + dlength]  # noqa: E203
+        checksum_computed = zlib.crc32(data, self._crc[dtype]) & 0xFFFFFFFF
+        assert (
+            checksum == checksum_computed
+        ), "record checksum is invalid, data may be corrupt"
+        self._index = header_end + dlength
+        return dtype, data
+
+    def scan_data(self):
+        self._skip_pad()
+        record = self._scan_record()
+        if record is None:  # eof
+            return None
+        dtype, data = record
+        if dtype == LEVELDBLOG_FULL:
+            return data
+
+        assert (
+            dtype == LEVELDBLOG_FIRST
+        ), "expected record to be type {} but found {}".format(LEVELDBLOG_FIRST, dtype)
+        parts = [data]
+        while True:
+            record = self._scan_record()
+            if record is None:  # eof
+                return None
+            dtype, new_data = record
+            parts.append(new_data)
+            if dtype == LEVELDBLOG_LAST:
+                break
+            assert (
+                dtype == LEVELDBLOG_MIDDLE
+            ), "expected record to be type {} but found {}".format(
+                LEVELDBLOG_MIDDLE, dtype
+            )
+        return memoryview(b"".join(parts))
+
+    def scan_records(self):
+        """Yield (offset, data) for each record from the current position."""
+        while True:
+            self._skip_pad()
+            offset = self._index
+            data = self.scan_data()
+            if data is None:
+                return
+            yield offset, data
+
+    def read_at(self, offset):
+        """Return the data of the record starting at offset."""
+        self.seek(offset)
+        return self.scan_data()
+
+    def close(self):
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._mm is not None:
+            try:
+                self._mm.close()
+            except BufferError:
+                # a caller still holds a payload, the map is freed with it
+                logger.info("mmap still referenced: %s", self._fname)
+            self._mm = None
         if self._fp is not None:
             logger.info("close: %s", self._fname)
             self._fp.close()
+            self._fp = None
+
+
+def _record_type_number(name):
+    return wandb_internal_pb2.Record.DESCRIPTOR.fields_by_name[name].number
+
+
+def _record_step(record):
+    history = record.history
+    if history.HasField("step"):
+        return history.step.num
+    for item in history.item:
+        if item.key == "_step":
+            try:
+                return int(proto_util.history_item_value(item))
+            except (TypeError, ValueError):
+                return -1
+    return -1
+
+
+class DataStoreIndex(object):
+    """Sidecar index of record offsets, record types and history steps.
+
+    The transaction log is append only, so an index that covers a prefix of
+    the log is extended in place. If the log got shorter than the indexed
+    prefix the index is rebuilt.
+    """
+
+    _HEADER = struct.Struct("<4sBQ")
+    _ENTRY = struct.Struct("<QHq")
+
+    def __init__(self):
+        self.offsets = array("Q")
+        self.types = array("H")
+        self.steps = array("q")
+        self.indexed_bytes = 0
+
+    def __len__(self):
+        return len(self.offsets)
+
+    @staticmethod
+    def index_fname(fname):
+        return fname + LEVELDBLOG_INDEX_SUFFIX
+
+    @classmethod
+    def load(cls, index_fname):
+        """Load an index file, returns None if missing or unreadable."""
+        try:
+            with open(index_fname, "rb") as f:
+                buf = f.read()
+        except OSError:
+            return None
+        if len(buf) < cls._HEADER.size:
+            return None
+        ident, version, indexed_bytes = cls._HEADER.unpack_from(buf, 0)
+        if (
+            ident != strtobytes(LEVELDBLOG_INDEX_IDENT)
+            or version != LEVELDBLOG_INDEX_VERSION
+            or (len(buf) - cls._HEADER.size) % cls._ENTRY.size
+        ):
+            logger.info("ignoring invalid index: %s", index_fname)
+            return None
+        index = cls()
+        index.indexed_bytes = indexed_bytes
+        for offset, rtype, step in cls._ENTRY.iter_unpack(
+            memoryview(buf)[cls._HEADER.size :]  # noqa: E203
+        ):
+            index.offsets.append(offset)
+            index.types.append(rtype)
+            index.steps.append(step)
+        return index
+
+    def save(self, index_fname):
+        tmp_fname = index_fname + ".tmp"
+        with open(tmp_fname, "wb") as f:
+            f.write(
+                self._HEADER.pack(
+                    strtobytes(LEVELDBLOG_INDEX_IDENT),
+                    LEVELDBLOG_INDEX_VERSION,
+                    self.indexed_bytes,
+                )
+            )
+            for entry in zip(self.offsets, self.types, self.steps):
+                f.write(self._ENTRY.pack(*entry))
+        os.replace(tmp_fname, index_fname)
+
+    def update(self, reader):
+        """Index the records of an open reader past the indexed prefix."""
+        if self.indexed_bytes:
+            reader.seek(self.indexed_bytes)
+        record = wandb_internal_pb2.Record()
+        try:
+            for offset, data in reader.scan_records():
+                record.ParseFromString(data)
+                record_type = record.WhichOneof("record_type")
+                self.offsets.append(offset)
+                self.types.append(_record_type_number(record_type))
+                self.steps.append(_record_step(record))
+                self.indexed_bytes = reader.tell()
+        except AssertionError:
+            # a partially written record at the end of the log is picked up
+            # by the next update
+            if not reader.in_last_block():
+                raise
+
+    @classmethod
+    def for_file(cls, fname, save=True):
+        """Return the index for a log, building or extending the sidecar."""
+        index_fname = cls.index_fname(fname)
+        index = cls.load(index_fname)
+        size = os.stat(fname).st_size
+        if index is None or index.indexed_bytes > size:
+            index = cls()
+        if index.indexed_bytes < size:
+            reader = DataStoreReader()
+            reader.open_for_scan(fname)
+            try:
+                index.update(reader)
+            finally:
+                reader.close()
+            if save:
+                index.save(index_fname)
+        return index
+
+    def find(self, record_type=None, min_step=None, max_step=None):
+        """Return offsets of records matching a record type and step range.
+
+        Arguments:
+            record_type: name of the Record oneof, eg. "history" or "summary".
+            min_step: smallest history step to include.
+            max_step: largest history step to include.
+        """
+        type_num = _record_type_number(record_type) if record_type else None
+        check_step = min_step is not None or max_step is not None
+        offsets = []
+        for offset, rtype, step in zip(self.offsets, self.types, self.steps):
+            if type_num is not None and rtype != type_num:
+                continue
+            if check_step:
+                if step < 0:
+                    continue
+                if min_step is not None and step < min_step:
+                    continue
+                if max_step is not None and step > max_step:
+                    continue
+            offsets.append(offset)
+        return offsets
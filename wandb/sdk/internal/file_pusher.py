@@ -125,6 +125,9 @@ class FilePusher(object):
     def file_counts_by_category(self):
         return self._stats.file_counts_by_category()
 
+    def upload_class_stats(self):
+        return self._stats.upload_class_summary()
+
     def file_changed(
         self,
         save_name,
@@ -182,6 +185,7 @@ class FilePusher(object):
         logger.info("waiting for file pusher")
         while self.is_alive():
             time.sleep(0.5)
+        logger.info("upload stats by class: %s", self._stats.upload_class_summary())
 
     def is_alive(self):
         return self._step_checksum.is_alive() or self._step_upload.is_alive()
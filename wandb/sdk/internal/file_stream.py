@@ -1,11 +1,14 @@
 import base64
 import binascii
 import collections
+import gzip
 import itertools
+import json
 import logging
 import os
 import sys
 import random
+import re
 import requests
 import threading
 import time
@@ -17,8 +20,8 @@ from wandb import util
 from wandb import env
 
 import six
-from six.moves import queue
 
+from . import internal_util
 from ..lib import file_stream_utils
 
 logger = logging.getLogger(__name__)
@@ -92,6 +95,27 @@ class StreamCRState:
     last_normal = None
 
 
+@dataclass
+class StreamRawState:
+    """Where the cursor of a raw console stream is.
+    An instance holds state about:
+        line:           text of the line the cursor is on, as the UI shows it.
+        offset:         offset (line number) of that line, None until some of
+                        it has been sent.
+        pending_cr:     if the last chunk ended in \r, which is held back in
+                        case the next chunk starts with the \n of a \r\n.
+    """
+
+    line: str = ""
+    offset = None
+    pending_cr: bool = False
+
+
+# Cursor movement, erase and OSC sequences, which only make sense to a terminal.
+# Colors (SGR, "\033[...m") are kept since the UI renders them.
+_ANSI_CONTROL_RE = re.compile("\033\\[[\\d;?]*[A-Za-ln-z]|\033\\][^\a]*\a")
+
+
 class CRDedupeFilePolicy(DefaultFilePolicy):
     """File stream policy that removes characters that would be erased by
     carriage returns.
@@ -236,6 +260,82 @@ class CRDedupeFilePolicy(DefaultFilePolicy):
         return ret
 
 
+class RawCRDedupeFilePolicy(CRDedupeFilePolicy):
+    """File stream policy for console output captured with `console="raw"`.
+
+    Raw chunks are the bytes the process wrote, as they were read from the
+    console, so a chunk can end in the middle of a line and a progress bar
+    update can span chunks. Carriage returns are collapsed and terminal control
+    sequences are dropped here, once per batch of chunks, rather than in the
+    user process on every write.
+    """
+
+    def __init__(self, start_chunk_id=0):
+        super(RawCRDedupeFilePolicy, self).__init__(start_chunk_id=start_chunk_id)
+        self.raw_stderr = StreamRawState()
+        self.raw_stdout = StreamRawState()
+
+    def process_chunks(self, chunks: List) -> List[Dict]:
+        """
+        Args:
+            chunks: List of Chunk objects, the prefix of each followed by raw
+            console output.
+
+        Returns:
+            List[Dict], as `CRDedupeFilePolicy.process_chunks`. The line the
+            cursor is on is sent as it is and sent again, at the same offset,
+            when it changes.
+
+        Example:
+            >>> chunks = [
+                Chunk("output.log", "2020-08-25T20:38 epoch 1\n\r 10%"),
+                Chunk("output.log", "2020-08-25T20:39 \r 50%\r100%\n"),
+            ]
+            >>> process_chunks(chunks)
+            [
+                {"offset": 0, "content": [
+                    "2020-08-25T20:38 epoch 1\n",
+                    "2020-08-25T20:39 100%\n"
+                    ]
+                }
+            ]
+        """
+        console = {}
+
+        for c in chunks:
+            prefix, logs_str = self.split_chunk(c)
+            stream = self.raw_stderr if prefix.startswith("ERROR ") else self.raw_stdout
+            logs_str = _ANSI_CONTROL_RE.sub("", logs_str)
+            if stream.pending_cr:
+                logs_str = "\r" + logs_str
+            stream.pending_cr = logs_str.endswith("\r")
+            if stream.pending_cr:
+                logs_str = logs_str[:-1]
+            logs_str = logs_str.replace("\r\n", "\n")
+            logs = logs_str.split("\n")
+
+            for i, line in enumerate(logs):
+                if "\r" in line:
+                    stream.line = line.rsplit("\r", 1)[-1]
+                else:
+                    stream.line += line
+                terminated = i < len(logs) - 1
+                if stream.offset is None and (stream.line or terminated):
+                    stream.offset = self.global_offset
+                    self.global_offset += 1
+                if stream.offset is not None:
+                    console[stream.offset] = prefix + stream.line + "\n"
+                if terminated:
+                    stream.line = ""
+                    stream.offset = None
+
+        intervals = self.get_consecutive_offsets(console)
+        ret = []
+        for (a, b) in intervals:
+            ret.append({"offset": a, "content": [console[i] for i in range(a, b + 1)]})
+        return ret
+
+
 class BinaryFilePolicy(DefaultFilePolicy):
     def process_chunks(self, chunks):
         data = b"".join([c.data for c in chunks])
@@ -259,8 +359,28 @@ class FileStreamApi(object):
 
     HTTP_TIMEOUT = env.get_http_timeout(10)
     MAX_ITEMS_PER_PUSH = 10000
-
-    def __init__(self, api, run_id, start_time, settings=None):
+    # Posts are sized from the measured throughput so that each one finishes well
+    # within HTTP_TIMEOUT. They start small until a post has been timed, and a
+    # post that times out or fails is split up before it is resent.
+    POST_TARGET_SECONDS = HTTP_TIMEOUT / 4.0
+    INITIAL_POST_BYTES = 1 << 20
+    MIN_POST_BYTES = 256 << 10
+    # Factor the post size is cut by after a timed out or failed post
+    POST_BACKOFF = 0.5
+    # Weight of the newest sample in the throughput average
+    THROUGHPUT_SMOOTHING = 0.3
+    COMPRESSION_TYPES = ("gzip",)
+
+    def __init__(
+        self,
+        api,
+        run_id,
+        start_time,
+        settings=None,
+        compression=None,
+        queue_max_bytes=None,
+        queue_policy=None,
+    ):
         if settings is None:
             settings = dict()
         # NOTE: exc_info is set in thread_except_body context and readable by calling threads
@@ -279,9 +399,23 @@ class FileStreamApi(object):
                 "X-WANDB-USER-EMAIL": env.get_user_email(),
             }
         )
+        if compression is not None and compression not in self.COMPRESSION_TYPES:
+            raise ValueError(
+                "Unsupported file stream compression: {}".format(compression)
+            )
+        self._compression = compression
         self._file_policies = {}
         self._dropped_chunks = 0
-        self._queue = queue.Queue()
+        self._max_post_bytes = self.INITIAL_POST_BYTES
+        self._post_throughput = None
+        # Only file chunks count against the budget, control items always go in
+        self._queue = internal_util.BudgetQueue(
+            "file_stream",
+            max_bytes=queue_max_bytes,
+            policy=queue_policy or internal_util.QUEUE_POLICY_BLOCK,
+            sizer=lambda item: len(item.data) if isinstance(item, Chunk) else 0,
+            is_exempt=lambda item: not isinstance(item, Chunk),
+        )
         self._thread = threading.Thread(target=self._thread_except_body)
         # It seems we need to make this a daemon thread to get sync.py's atexit handler to run, which
         # cleans this thread up.
@@ -311,6 +445,14 @@ class FileStreamApi(object):
     def set_file_policy(self, filename, file_policy):
         self._file_policies[filename] = file_policy
 
+    @property
+    def dropped_chunks(self):
+        # Chunks the server rejected plus chunks the queue dropped for lack of room
+        return self._dropped_chunks + self._queue.dropped_items()
+
+    def queue_status(self):
+        return self._queue.status()
+
     @property
     def heartbeat_seconds(self):
         # Defaults to 30
@@ -339,6 +481,64 @@ class FileStreamApi(object):
             self._queue, self.MAX_ITEMS_PER_PUSH, self.rate_limit_seconds()
         )
 
+    def _shrink_posts(self):
+        """Cut the post size after a post that timed out or failed."""
+        self._max_post_bytes = max(
+            int(self._max_post_bytes * self.POST_BACKOFF), self.MIN_POST_BYTES
+        )
+        if self._post_throughput is not None:
+            self._post_throughput = min(
+                self._post_throughput, self._max_post_bytes / self.POST_TARGET_SECONDS
+            )
+
+    def _post(self, num_bytes, num_lines, **kwargs):
+        """Make one attempt at posting a batch of num_bytes, resizing later posts.
+
+        Raises _PostTooLarge instead of letting the caller resend a batch that no
+        longer fits the budget after a failed attempt.
+        """
+        start_time = time.time()
+        try:
+            response = self._client.post(self._endpoint, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            self._post_failed(num_bytes, num_lines)
+            raise
+        if response.status_code < 400:
+            self._record_post(num_bytes, time.time() - start_time)
+        elif response.status_code in (408, 413) or response.status_code >= 500:
+            self._post_failed(num_bytes, num_lines)
+        return response
+
+    def _post_failed(self, num_bytes, num_lines):
+        self._shrink_posts()
+        if num_lines > 1 and num_bytes > self._max_post_bytes:
+            raise _PostTooLarge()
+
+    def _record_post(self, num_bytes, seconds):
+        """Resize posts from the round trip time of the last successful one.
+
+        Small posts are dominated by latency rather than bandwidth, so only posts
+        that were at least half of the current budget update the estimate.
+        """
+        if seconds <= 0 or num_bytes < self._max_post_bytes / 2:
+            return
+        throughput = num_bytes / seconds
+        if self._post_throughput is None:
+            self._post_throughput = throughput
+        else:
+            self._post_throughput += self.THROUGHPUT_SMOOTHING * (
+                throughput - self._post_throughput
+            )
+        self._max_post_bytes = int(
+            min(
+                max(
+                    self._post_throughput * self.POST_TARGET_SECONDS,
+                    self.MIN_POST_BYTES,
+                ),
+                util.MAX_LINE_BYTES,
+            )
+        )
+
     def _thread_body(self):
         posted_data_time = time.time()
         posted_anything_time = time.time()
@@ -357,7 +557,7 @@ class FileStreamApi(object):
                         json={
                             "complete": False,
                             "preempting": True,
-                            "dropped": self._dropped_chunks,
+                            "dropped": self.dropped_chunks,
                             "uploaded": list(uploaded),
                         },
                     )
@@ -387,7 +587,7 @@ class FileStreamApi(object):
                         json={
                             "complete": False,
                             "failed": False,
-                            "dropped": self._dropped_chunks,
+                            "dropped": self.dropped_chunks,
                             "uploaded": list(uploaded),
                         },
                     )
@@ -400,7 +600,7 @@ class FileStreamApi(object):
             json={
                 "complete": True,
                 "exitcode": int(finished.exitcode),
-                "dropped": self._dropped_chunks,
+                "dropped": self.dropped_chunks,
                 "uploaded": list(uploaded),
             },
         )
@@ -449,15 +649,35 @@ class FileStreamApi(object):
             if not files[filename]:
                 del files[filename]
 
-        for fs in file_stream_utils.split_files(files, max_bytes=util.MAX_LINE_BYTES):
-            self._handle_response(
-                request_with_retry(
-                    self._client.post,
-                    self._endpoint,
-                    json={"files": fs, "dropped": self._dropped_chunks},
+        batches = file_stream_utils.split_files(files, max_bytes=self._max_post_bytes)
+        fs = next(batches, None)
+        while fs is not None:
+            lines = [line for f in fs.values() for line in f["content"]]
+            try:
+                response = request_with_retry(
+                    self._post,
+                    sum(len(line) for line in lines),
+                    len(lines),
                     retry_callback=self._api.retry_callback,
+                    **self._payload({"files": fs, "dropped": self.dropped_chunks})
                 )
-            )
+            except _PostTooLarge:
+                # resend it in pieces that fit, then carry on with the rest
+                batches = itertools.chain(
+                    file_stream_utils.split_files(fs, max_bytes=self._max_post_bytes),
+                    batches,
+                )
+            else:
+                self._handle_response(response)
+            fs = next(batches, None)
+
+    def _payload(self, data):
+        """Keyword arguments to post data, compressed if enabled."""
+        if self._compression is None:
+            return {"json": data}
+        body = gzip.compress(json.dumps(data).encode("utf-8"), compresslevel=6)
+        headers = {"Content-Type": "application/json", "Content-Encoding": "gzip"}
+        return {"data": body, "headers": headers}
 
     def stream_file(self, path):
         name = path.split("/")[-1]
@@ -503,6 +723,10 @@ class FileStreamApi(object):
             six.reraise(*self._exc_info)
 
 
+class _PostTooLarge(Exception):
+    """A post failed and its batch is now over the post size budget."""
+
+
 MAX_SLEEP_SECONDS = 60 * 5
 
 
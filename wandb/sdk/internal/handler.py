@@ -20,6 +20,7 @@ from typing import (
     List,
     Optional,
     Sequence,
+    Set,
     Tuple,
     TYPE_CHECKING,
 )
@@ -39,6 +40,9 @@ SummaryDict = Dict[str, Any]
 
 logger = logging.getLogger(__name__)
 
+# history rows to queue before feeding the sampled history accumulators
+SAMPLED_HISTORY_BATCH_ROWS = 256
+
 
 def _dict_nested_set(target: Dict[str, Any], key_list: Sequence[str], v: Any) -> None:
     # recurse down the dictionary structure:
@@ -55,7 +59,10 @@ def _dict_nested_set(target: Dict[str, Any], key_list: Sequence[str], v: Any) ->
 
 class HandleManager(object):
     _consolidated_summary: SummaryDict
+    _summary_dirty: Set[str]
+    _summary_removed: Set[str]
     _sampled_history: Dict[str, sample.UniformSampleAccumulator]
+    _sampled_history_pending: Dict[str, List[Any]]
     _settings: SettingsStatic
     _record_q: "Queue[Record]"
     _result_q: "Queue[Result]"
@@ -101,7 +108,12 @@ class HandleManager(object):
 
         # keep track of summary from key/val updates
         self._consolidated_summary = dict()
+        # top level summary keys changed since the last summary record was sent
+        self._summary_dirty = set()
+        self._summary_removed = set()
         self._sampled_history = dict()
+        self._sampled_history_pending = dict()
+        self._sampled_history_pending_rows = 0
         self._metric_defines = dict()
         self._metric_globs = dict()
         self._metric_track = dict()
@@ -157,6 +169,7 @@ class HandleManager(object):
                 self._tb_watcher.finish()
                 self._tb_watcher = None
         elif state == defer.FLUSH_SUM:
+            self._save_summary_delta()
             self._save_summary(self._consolidated_summary, flush=True)
 
         # defer is used to drive the sender finish state machine
@@ -198,14 +211,60 @@ class HandleManager(object):
         elif not self._settings._offline:
             self._sender_q.put(record)
 
-    def _save_history(self, record: Record) -> None:
-        for item in record.history.item:
+    def _summary_mark_dirty(self, key: str) -> None:
+        self._summary_dirty.add(key)
+        self._summary_removed.discard(key)
+
+    def _summary_mark_removed(self, key: str) -> None:
+        self._summary_removed.add(key)
+        self._summary_dirty.discard(key)
+
+    def _save_summary_delta(self) -> None:
+        """Send the top level summary keys that changed since the last send.
+
+        The sender merges these updates into its copy of the summary, so the cost
+        of each history step depends on the number of keys logged, not on the
+        size of the consolidated summary.
+        """
+        if not self._summary_dirty and not self._summary_removed:
+            return
+        summary = wandb_internal_pb2.SummaryRecord()
+        for k in self._summary_dirty:
+            update = summary.update.add()
+            update.key = k
+            update.value_json = json.dumps(self._consolidated_summary[k])
+        for k in self._summary_removed:
+            remove = summary.remove.add()
+            remove.key = k
+        self._summary_dirty.clear()
+        self._summary_removed.clear()
+        if not self._settings._offline:
+            self._sender_q.put(wandb_internal_pb2.Record(summary=summary))
+
+    def _save_history(self, history_dict: Dict[str, Any]) -> None:
+        # numeric values are queued per key and handed to the sample
+        # accumulators in batches, see _flush_sampled_history()
+        pending = self._sampled_history_pending
+        for k, v in six.iteritems(history_dict):
             # TODO(jhr) save nested keys?
-            k = item.key
-            v = json.loads(item.value_json)
             if isinstance(v, numbers.Real):
-                self._sampled_history.setdefault(k, sample.UniformSampleAccumulator())
-                self._sampled_history[k].add(v)
+                values = pending.get(k)
+                if values is None:
+                    values = pending[k] = []
+                values.append(v)
+        self._sampled_history_pending_rows += 1
+        if self._sampled_history_pending_rows >= SAMPLED_HISTORY_BATCH_ROWS:
+            self._flush_sampled_history()
+
+    def _flush_sampled_history(self) -> None:
+        for k, values in six.iteritems(self._sampled_history_pending):
+            sampled = self._sampled_history.get(k)
+            if sampled is None:
+                sampled = sample.UniformSampleAccumulator()
+                self._sampled_history[k] = sampled
+            sampled.add_many(values)
+        self._sampled_history_pending = dict()
+        self._sampled_history_pending_rows = 0
 
     def _update_summary_metrics(
         self,
@@ -346,10 +405,13 @@ class HandleManager(object):
         if not self._metric_defines:
             history_dict = self._update_summary_media_objects(history_dict)
             self._consolidated_summary.update(history_dict)
+            self._summary_dirty.update(history_dict)
+            self._summary_removed.difference_update(history_dict)
             return True
         updated = False
         for k, v in six.iteritems(history_dict):
             if self._update_summary_list(kl=[k], v=v):
+                self._summary_mark_dirty(k)
                 updated = True
         return updated
 
@@ -360,11 +422,11 @@ class HandleManager(object):
         if has_step:
             step = record.history.step.num
             history_dict["_step"] = step
-            item.value_json = json.dumps(step)
+            item.value_int = step
             self._step = step + 1
         else:
             history_dict["_step"] = self._step
-            item.value_json = json.dumps(self._step)
+            item.value_int = self._step
             self._step += 1
 
     def _history_define_metric(
@@ -438,10 +500,10 @@ class HandleManager(object):
             for k, v in six.iteritems(update_history):
                 item = record.history.item.add()
                 item.key = k
-                item.value_json = json.dumps(v)
+                proto_util.history_item_set_value(item, v)
 
     def handle_history(self, record: Record) -> None:
-        history_dict = proto_util.dict_from_proto_list(record.history.item)
+        history_dict = proto_util.history_dict_from_proto_list(record.history.item)
 
         # Inject _runtime if it is not present
         if history_dict is not None:
@@ -450,11 +512,11 @@ class HandleManager(object):
 
         self._history_update(record, history_dict)
         self._dispatch_record(record)
-        self._save_history(record)
+        self._save_history(history_dict)
 
         updated = self._update_summary(history_dict)
         if updated:
-            self._save_summary(self._consolidated_summary)
+            self._save_summary_delta()
 
     def handle_summary(self, record: Record) -> None:
         summary = record.summary
@@ -476,6 +538,7 @@ class HandleManager(object):
 
             # use the last element of the key to write the leaf:
             target[key[-1]] = json.loads(item.value_json)
+            self._summary_mark_dirty(key[0])
 
         for item in summary.remove:
             if len(item.nested_key) > 0:
@@ -495,8 +558,12 @@ class HandleManager(object):
 
             # use the last element of the key to erase the leaf:
             del target[key[-1]]
+            if len(key) == 1:
+                self._summary_mark_removed(key[0])
+            else:
+                self._summary_mark_dirty(key[0])
 
-        self._save_summary(self._consolidated_summary)
+        self._save_summary_delta()
 
     def handle_exit(self, record: Record) -> None:
         if self._track_time is not None:
@@ -710,6 +777,7 @@ class HandleManager(object):
 
     def handle_request_sampled_history(self, record: Record) -> None:
         result = wandb_internal_pb2.Result(uuid=record.uuid)
+        self._flush_sampled_history()
         for key, sampled in six.iteritems(self._sampled_history):
             item = wandb_internal_pb2.SampledHistoryItem()
             item.key = key
@@ -750,4 +818,4 @@ class HandleManager(object):
         )
         item = record.history.item.add()
         item.key = "_runtime"
-        item.value_json = json.dumps(history_dict[item.key])
+        proto_util.history_item_set_value(item, history_dict[item.key])
@@ -28,6 +28,7 @@ from typing import TYPE_CHECKING
 import psutil
 from six.moves import queue
 import wandb
+from wandb.proto import wandb_internal_pb2
 from wandb.util import sentry_exc
 
 from . import handler
@@ -95,7 +96,19 @@ def wandb_internal(
     stopped = threading.Event()
     threads: "List[RecordLoopThread]" = []
 
-    send_record_q: "Queue[Record]" = queue.Queue()
+    send_record_q = _record_queue(
+        "sender",
+        _settings,
+        _settings._sender_queue_max_bytes,
+        _settings._sender_queue_policy,
+    )
+    write_record_q = _record_queue(
+        "writer",
+        _settings,
+        _settings._writer_queue_max_bytes,
+        _settings._writer_queue_policy,
+    )
+
     record_sender_thread = SenderThread(
         settings=_settings,
         record_q=send_record_q,
@@ -103,10 +116,10 @@ def wandb_internal(
         stopped=stopped,
         interface=publish_interface,
         debounce_interval_ms=30000,
+        status_queues=[write_record_q],
     )
     threads.append(record_sender_thread)
 
-    write_record_q: "Queue[Record]" = queue.Queue()
     record_writer_thread = WriterThread(
         settings=_settings,
         record_q=write_record_q,
@@ -152,6 +165,9 @@ def wandb_internal(
     for thread in threads:
         thread.join()
 
+    send_record_q.close()
+    write_record_q.close()
+
     for thread in threads:
         exc_info = thread.get_exception()
         if exc_info:
@@ -163,6 +179,29 @@ def wandb_internal(
             sys.exit(-1)
 
 
+def _record_queue(
+    name: str, settings: "SettingsStatic", max_bytes: "Optional[int]", policy: str
+) -> "internal_util.BudgetQueue":
+    """Make a byte budgeted queue for records passed between internal threads.
+
+    Only history, stats and output records may be held back or dropped, anything
+    else (requests, config, summary, ...) is needed to finish the run correctly.
+    """
+    spill_path = None
+    if settings.sync_file:
+        spill_path = "{}.{}.spill".format(settings.sync_file, name)
+    return internal_util.BudgetQueue(
+        name,
+        max_bytes=max_bytes or 0,
+        policy=policy or internal_util.QUEUE_POLICY_BLOCK,
+        is_exempt=lambda record: record.WhichOneof("record_type")
+        not in ("history", "stats", "output"),
+        spill_path=spill_path,
+        serialize=lambda record: record.SerializeToString(),
+        deserialize=wandb_internal_pb2.Record.FromString,
+    )
+
+
 def configure_logging(log_fname: str, log_level: int, run_id: str = None) -> None:
     # TODO: we may want make prints and stdout make it into the logs
     # sys.stdout = open(settings.log_internal, "a")
@@ -266,6 +305,7 @@ class SenderThread(internal_util.RecordLoopThread):
         stopped: "Event",
         interface: "InterfaceQueue",
         debounce_interval_ms: "float" = 5000,
+        status_queues: "Optional[List[internal_util.BudgetQueue]]" = None,
     ) -> None:
         super(SenderThread, self).__init__(
             input_record_q=record_q,
@@ -278,6 +318,7 @@ class SenderThread(internal_util.RecordLoopThread):
         self._record_q = record_q
         self._result_q = result_q
         self._interface = interface
+        self._status_queues = status_queues
 
     def _setup(self) -> None:
         self._sm = sender.SendManager(
@@ -285,6 +326,7 @@ class SenderThread(internal_util.RecordLoopThread):
             record_q=self._record_q,
             result_q=self._result_q,
             interface=self._interface,
+            status_queues=self._status_queues,
         )
 
     def _process(self, record: "Record") -> None:
@@ -330,6 +372,15 @@ class WriterThread(internal_util.RecordLoopThread):
 
     def _process(self, record: "Record") -> None:
         self._wm.write(record)
+        # group commit: gather the records that are already queued so they
+        # go to disk with the same write
+        for _ in range(self._record_q.qsize()):
+            try:
+                record = self._record_q.get_nowait()
+            except queue.Empty:
+                break
+            self._wm.write(record)
+        self._wm.commit()
 
     def _finish(self) -> None:
         self._wm.finish()
@@ -11,15 +11,18 @@ import yaml
 import re
 import click
 import logging
+import math
 import requests
 import socket
 import sys
+import threading
 
 if os.name == "posix" and sys.version_info[0] < 3:
     import subprocess32 as subprocess  # type: ignore
 else:
     import subprocess  # type: ignore[no-redef]
 
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 import six
 from six import BytesIO
@@ -56,6 +59,10 @@ class Api(object):
     """
 
     HTTP_TIMEOUT = env.get_http_timeout(10)
+    # Connections kept alive per host for file uploads and downloads, sized to
+    # match FilePusher.MAX_UPLOAD_JOBS so concurrent uploads never queue for one.
+    UPLOAD_POOL_SIZE = 64
+    UPLOAD_PART_WORKERS = 4
 
     def __init__(
         self,
@@ -115,6 +122,8 @@ class Api(object):
         self.upload_file_retry = normalize_exceptions(
             retry.retriable(retry_timedelta=retry_timedelta)(self.upload_file)
         )
+        self._upload_session = None
+        self._upload_session_lock = threading.Lock()
         self._client_id_mapping = {}
 
         (
@@ -1525,7 +1534,7 @@ class Api(object):
         Returns:
             A tuple of the content length and the streaming response
         """
-        response = requests.get(url, stream=True)
+        response = self.upload_session.get(url, stream=True)
         response.raise_for_status()
         return (int(response.headers.get("content-length", 0)), response)
 
@@ -1568,24 +1577,140 @@ class Api(object):
         response = None
         progress = Progress(file, callback=callback)
         try:
-            response = requests.put(url, data=progress, headers=extra_headers)
+            response = self.upload_session.put(
+                url, data=progress, headers=extra_headers
+            )
             response.raise_for_status()
         except requests.exceptions.RequestException as e:
             logger.error("upload_file exception {} {}".format(url, e))
-            status_code = e.response.status_code if e.response != None else 0
             # We need to rewind the file for the next retry (the file passed in is seeked to 0)
             progress.rewind()
-            # Retry errors from cloud storage or local network issues
-            if status_code in (308, 408, 409, 429, 500, 502, 503, 504) or isinstance(
-                e, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)
-            ):
-                e = retry.TransientError(exc=e)
-                six.reraise(type(e), e, sys.exc_info()[2])
+            self._reraise_upload_exception(e)
+
+        return response
+
+    def upload_multipart_file(
+        self,
+        part_urls,
+        file,
+        part_size,
+        callback=None,
+        extra_headers={},
+        completed_parts=None,
+        max_workers=None,
+    ):
+        """Uploads a file as independent parts, one signed PUT url per part
+
+        Parts are uploaded in parallel over the shared upload session and each
+        part is retried on its own, so a transient failure only resends that
+        part rather than the whole file.
+
+        Arguments:
+            part_urls (list): Signed urls, one for each `part_size` slice of the file
+            file (file): An open binary file, it is read with seek so it can be shared
+            part_size (int): Size in bytes of every part except the last
+            callback (func, optional): Called with the bytes uploaded since the last
+                call and the total bytes uploaded so far
+            extra_headers (dict, optional): Headers sent with every part
+            completed_parts (dict, optional): Maps part number to ETag and is updated
+                as parts finish. Passing the dict from a failed attempt back in
+                resumes the upload, skipping the parts that already made it.
+            max_workers (int, optional): Number of parts in flight at once
+
+        Returns:
+            A list of {"partNumber", "etag"} dicts ordered by part number, as
+            expected by multipart completion APIs
+        """
+        size = os.fstat(file.fileno()).st_size
+        num_parts = max(1, int(math.ceil(size / float(part_size))))
+        if len(part_urls) != num_parts:
+            raise ValueError(
+                "Expected {} part urls for {} bytes in parts of {}, got {}".format(
+                    num_parts, size, part_size, len(part_urls)
+                )
+            )
+        if completed_parts is None:
+            completed_parts = {}
+        read_lock = threading.Lock()
+        progress = {"bytes": 0}
+
+        def report(nbytes):
+            with read_lock:
+                progress["bytes"] += nbytes
+                total = progress["bytes"]
+            if callback:
+                callback(nbytes, total)
+
+        def upload(part_number):
+            offset = (part_number - 1) * part_size
+            with read_lock:
+                file.seek(offset)
+                data = file.read(part_size)
+            # Retry keeps its attempt count and start time on the instance, so
+            # every part gets its own
+            upload_part = retry.Retry(
+                self._upload_part,
+                retry_timedelta=self.retry_timedelta,
+                num_retries=self.retry_uploads,
+                retryable_exceptions=(retry.TransientError,),
+            )
+            response = upload_part(part_urls[part_number - 1], data, extra_headers)
+            completed_parts[part_number] = response.headers.get("ETag")
+            report(len(data))
+
+        pending = []
+        for part_number in range(1, num_parts + 1):
+            if part_number in completed_parts:
+                report(min(part_size, size - (part_number - 1) * part_size))
             else:
-                util.sentry_reraise(e)
+                pending.append(part_number)
+
+        workers = min(max_workers or self.UPLOAD_PART_WORKERS, len(pending) or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # list() surfaces the first exception once every part has finished
+            list(executor.map(upload, pending))
+
+        return [
+            {"partNumber": part_number, "etag": completed_parts[part_number]}
+            for part_number in sorted(completed_parts)
+        ]
 
+    def _upload_part(self, url, data, extra_headers):
+        try:
+            response = self.upload_session.put(url, data=data, headers=extra_headers)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            logger.error("upload_part exception {} {}".format(url, e))
+            self._reraise_upload_exception(e)
         return response
 
+    def _reraise_upload_exception(self, e):
+        status_code = e.response.status_code if e.response != None else 0
+        # Retry errors from cloud storage or local network issues
+        if status_code in (308, 408, 409, 429, 500, 502, 503, 504) or isinstance(
+            e, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)
+        ):
+            e = retry.TransientError(exc=e)
+            six.reraise(type(e), e, sys.exc_info()[2])
+        else:
+            util.sentry_reraise(e)
+
+    @property
+    def upload_session(self):
+        """A keep-alive session shared by every file transfer of this Api"""
+        if self._upload_session is None:
+            with self._upload_session_lock:
+                if self._upload_session is None:
+                    session = requests.Session()
+                    adapter = requests.adapters.HTTPAdapter(
+                        pool_connections=self.UPLOAD_POOL_SIZE,
+                        pool_maxsize=self.UPLOAD_POOL_SIZE,
+                    )
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._upload_session = session
+        return self._upload_session
+
     @normalize_exceptions
     def register_agent(self, host, sweep_id=None, project_name=None, entity=None):
         """Register a new agent
@@ -2420,6 +2545,27 @@ class Api(object):
                     self._client_id_mapping[client_id] = server_id
         return server_id
 
+    def artifact_manifest_url(self, artifact_id):
+        """Returns the url of the current manifest of an artifact, or None."""
+        query = gql(
+            """
+            query ArtifactManifestURL($id: ID!) {
+                artifact(id: $id) {
+                    currentManifest {
+                        file {
+                            directUrl
+                        }
+                    }
+                }
+            }
+        """
+        )
+        response = self.gql(query, variable_values={"id": artifact_id})
+        manifest = ((response or {}).get("artifact") or {}).get("currentManifest")
+        if not manifest:
+            return None
+        return manifest["file"]["directUrl"]
+
     @normalize_exceptions
     def create_artifact_files(self, artifact_files):
         mutation = gql(
@@ -2597,7 +2743,7 @@ class Api(object):
 
     def _status_request(self, url, length):
         """Ask google how much we've uploaded"""
-        return requests.put(
+        return self.upload_session.put(
             url=url,
             headers={"Content-Length": "0", "Content-Range": "bytes */%i" % length},
         )
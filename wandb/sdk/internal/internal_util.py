@@ -9,6 +9,8 @@ Collection of classes to support the internal process.
 from __future__ import print_function
 
 import logging
+import os
+import struct
 import sys
 import threading
 import time
@@ -18,7 +20,7 @@ from six.moves import queue
 
 
 if TYPE_CHECKING:
-    from typing import Tuple, Type, Optional, Union
+    from typing import Any, Callable, Dict, Tuple, Type, Optional, Union
     from six.moves.queue import Queue
     from wandb.proto.wandb_internal_pb2 import Record, Result
     from threading import Event
@@ -32,6 +34,11 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+QUEUE_POLICY_BLOCK = "block"
+QUEUE_POLICY_SPILL = "spill"
+QUEUE_POLICY_DROP = "drop"
+QUEUE_POLICIES = (QUEUE_POLICY_BLOCK, QUEUE_POLICY_SPILL, QUEUE_POLICY_DROP)
+
 
 class ExceptionThread(threading.Thread):
     """Class to catch exceptions when running a thread."""
@@ -101,3 +108,153 @@ class RecordLoopThread(ExceptionThread):
                 continue
             self._process(record)
         self._finish()
+
+
+class BudgetQueue(queue.Queue):
+    """Queue bounded by the bytes of the items it holds rather than their count.
+
+    When an item would take the queue over max_bytes the policy decides:
+        block -- wait for the consumer to make room
+        spill -- append the item, and everything after it, to a file on disk.
+                 Spilled items are read back in order once memory drains.
+        drop -- discard the item and count it
+
+    Items for which is_exempt() is true (control records) are never blocked or
+    dropped. A queue that is empty always accepts one item, so a single item
+    larger than the budget can not wedge it. A max_bytes of 0 means unbounded.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_bytes: int = 0,
+        policy: str = QUEUE_POLICY_BLOCK,
+        sizer: "Callable[[Any], int]" = None,
+        is_exempt: "Callable[[Any], bool]" = None,
+        spill_path: str = None,
+        serialize: "Callable[[Any], bytes]" = None,
+        deserialize: "Callable[[bytes], Any]" = None,
+    ) -> None:
+        queue.Queue.__init__(self)
+        if policy not in QUEUE_POLICIES:
+            raise ValueError("Unknown queue policy: {}".format(policy))
+        if policy == QUEUE_POLICY_SPILL and not (
+            spill_path and serialize and deserialize
+        ):
+            logger.warning("Queue %s can not spill, blocking instead", name)
+            policy = QUEUE_POLICY_BLOCK
+        self.name = name
+        self._max_bytes = max_bytes or 0
+        self._policy = policy
+        self._sizer = sizer or (lambda item: item.ByteSize())
+        self._is_exempt = is_exempt or (lambda item: False)
+        self._spill_path = spill_path
+        self._serialize = serialize
+        self._deserialize = deserialize
+        self._spill_writer = None
+        self._spill_reader = None
+        self._bytes = 0
+        self._spilled = 0
+        self._dropped_items = 0
+        self._dropped_bytes = 0
+
+    def _over_budget(self, size: int) -> bool:
+        return bool(
+            self._max_bytes and self.queue and self._bytes + size > self._max_bytes
+        )
+
+    def put(self, item: "Any", block: bool = True, timeout: float = None) -> None:
+        size = self._sizer(item)
+        exempt = self._is_exempt(item)
+        with self.not_full:
+            if self._policy == QUEUE_POLICY_SPILL:
+                # Once spilling everything goes to disk until it drains, to keep order
+                if self._spilled or (not exempt and self._over_budget(size)):
+                    self._spill(item)
+                    self.unfinished_tasks += 1
+                    self.not_empty.notify()
+                    return
+            elif not exempt and self._over_budget(size):
+                if self._policy == QUEUE_POLICY_DROP:
+                    self._dropped_items += 1
+                    self._dropped_bytes += size
+                    return
+                if not block:
+                    raise queue.Full
+                endtime = time.time() + timeout if timeout is not None else None
+                while self._over_budget(size):
+                    if endtime is None:
+                        self.not_full.wait()
+                        continue
+                    remaining = endtime - time.time()
+                    if remaining <= 0:
+                        raise queue.Full
+                    self.not_full.wait(remaining)
+            self.queue.append((item, size))
+            self._bytes += size
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+    def _qsize(self) -> int:
+        return len(self.queue) + self._spilled
+
+    def _get(self) -> "Any":
+        if self.queue:
+            item, size = self.queue.popleft()
+            self._bytes -= size
+            return item
+        return self._unspill()
+
+    def _spill(self, item: "Any") -> None:
+        assert self._spill_path and self._serialize
+        if self._spill_writer is None:
+            self._spill_writer = open(self._spill_path, "wb")
+            self._spill_reader = open(self._spill_path, "rb")
+        data = self._serialize(item)
+        self._spill_writer.write(struct.pack("<I", len(data)))
+        self._spill_writer.write(data)
+        self._spill_writer.flush()
+        self._spilled += 1
+
+    def _unspill(self) -> "Any":
+        assert self._spill_reader and self._deserialize
+        (length,) = struct.unpack("<I", self._spill_reader.read(4))
+        item = self._deserialize(self._spill_reader.read(length))
+        self._spilled -= 1
+        if not self._spilled:
+            # Drained, start over with an empty file next time
+            self._close_spill()
+        return item
+
+    def _close_spill(self) -> None:
+        if self._spill_writer is None:
+            return
+        self._spill_writer.close()
+        self._spill_reader.close()
+        self._spill_writer = None
+        self._spill_reader = None
+        os.remove(self._spill_path)
+
+    def dropped_items(self) -> int:
+        return self._dropped_items
+
+    def status(self) -> "Dict[str, Any]":
+        with self.mutex:
+            return dict(
+                name=self.name,
+                policy=self._policy,
+                items=self._qsize(),
+                bytes=self._bytes,
+                max_bytes=self._max_bytes,
+                spilled_items=self._spilled,
+                dropped_items=self._dropped_items,
+                dropped_bytes=self._dropped_bytes,
+            )
+
+    def close(self) -> None:
+        with self.mutex:
+            if self._spilled:
+                logger.warning(
+                    "Queue %s closed with %d spilled items", self.name, self._spilled
+                )
+            self._close_spill()
@@ -3,71 +3,97 @@
 sample.
 """
 
-import math
+import numbers
+
+from wandb import util
+
+_INT64_MIN = -(2 ** 63)
+_INT64_MAX = 2 ** 63 - 1
 
 
 class UniformSampleAccumulator(object):
+    """Keep evenly spaced samples of a stream of numbers in a fixed size buffer.
+
+    Every stride-th value is stored. When the buffer (twice min_samples) fills up
+    every other stored value is dropped and the stride doubles, so get() returns
+    all values added or between min_samples and 2 * min_samples evenly spaced ones.
+
+    The buffer is a numpy array when numpy is available, and ints stay ints until
+    a float is added.
+    """
+
     def __init__(self, min_samples=None):
         self._samples = min_samples or 64
-        # force power of 2 samples
-        self._samples = 2 ** int(math.ceil(math.log(self._samples, 2)))
-        # target oversample by factor of 2
-        self._samples2 = self._samples * 2
-        # max size of each buffer
-        self._max = self._samples2 // 2
-        self._shift = 0
-        self._mask = (1 << self._shift) - 1
-        self._buckets = int(math.log(self._samples2, 2))
-        self._buckets_bits = int(math.log(self._buckets, 2))
-        self._buckets_mask = (1 << self._buckets_bits + 1) - 1
-        self._buckets_index = 0
-        self._bucket = []
-        self._index = [0] * self._buckets
+        self._capacity = self._samples * 2
+        self._stride = 1
         self._count = 0
-        self._log2 = [0]
+        self._size = 0
+        self._np = util.get_module("numpy")
+        if self._np:
+            self._buffer = None
+        else:
+            self._buffer = [0] * self._capacity
 
-        # pre-allocate buckets
-        for _ in range(self._buckets):
-            self._bucket.append([0] * self._max)
-        # compute integer log2
-        self._log2 += [int(math.log(i, 2)) for i in range(1, 2 ** self._buckets + 1)]
+    def _allocate(self, is_float):
+        np = self._np
+        dtype = np.float64 if is_float else np.int64
+        if self._buffer is None:
+            self._buffer = np.zeros(self._capacity, dtype=dtype)
+        elif is_float and self._buffer.dtype != np.float64:
+            self._buffer = self._buffer.astype(np.float64)
 
-    def _show(self):
-        print("=" * 20)
-        for b in range(self._buckets):
-            b = (b + self._buckets_index) % self._buckets
-            vals = [self._bucket[b][i] for i in range(self._index[b])]
-            print("{}: {}".format(b, vals))
+    def _compact(self):
+        half = self._size // 2
+        self._buffer[:half] = self._buffer[: self._size : 2]
+        self._size = half
+        self._stride *= 2
 
     def add(self, val):
-        self._count += 1
-        cnt = self._count
-        if cnt & self._mask:
+        count = self._count
+        self._count = count + 1
+        if count % self._stride:
             return
-        b = cnt >> self._shift
-        b = self._log2[b]  # b = int(math.log(b, 2))
-        if b >= self._buckets:
-            self._index[self._buckets_index] = 0
-            self._buckets_index = (self._buckets_index + 1) % self._buckets
-            self._shift += 1
-            self._mask = (self._mask << 1) | 1
-            b += self._buckets - 1
-        b = (b + self._buckets_index) % self._buckets
-        self._bucket[b][self._index[b]] = val
-        self._index[b] += 1
+        if self._np:
+            is_float = not isinstance(val, numbers.Integral) or not (
+                _INT64_MIN <= val <= _INT64_MAX
+            )
+            if self._buffer is None or is_float:
+                self._allocate(is_float)
+        self._buffer[self._size] = val
+        self._size += 1
+        if self._size == self._capacity:
+            self._compact()
+
+    def add_many(self, values):
+        """Add a sequence of numbers, same as calling add() on each in turn."""
+        np = self._np
+        if np:
+            values = np.asarray(values)
+            if values.dtype.kind not in "bif":
+                values = values.astype(np.float64)
+            if len(values):
+                self._allocate(values.dtype.kind == "f")
+        elif not isinstance(values, (list, tuple)):
+            values = list(values)
+        num = len(values)
+        pos = 0
+        while pos < num:
+            start = pos + (-self._count) % self._stride
+            if start >= num:
+                self._count += num - pos
+                break
+            picks = values[start :: self._stride][: self._capacity - self._size]
+            self._buffer[self._size : self._size + len(picks)] = picks
+            self._size += len(picks)
+            end = start + (len(picks) - 1) * self._stride + 1
+            self._count += end - pos
+            pos = end
+            if self._size == self._capacity:
+                self._compact()
 
     def get(self):
-        full = []
-        sampled = []
-        # self._show()
-        for b in range(self._buckets):
-            max_num = 2 ** b
-            b = (b + self._buckets_index) % self._buckets
-            modb = self._index[b] // max_num
-            for i in range(self._index[b]):
-                if not modb or i % modb == 0:
-                    sampled.append(self._bucket[b][i])
-                full.append(self._bucket[b][i])
-        if len(sampled) < self._samples:
-            return tuple(full)
-        return tuple(sampled)
+        if self._buffer is None:
+            return ()
+        if self._np:
+            return tuple(self._buffer[: self._size].tolist())
+        return tuple(self._buffer[: self._size])
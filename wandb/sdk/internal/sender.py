@@ -27,6 +27,7 @@ from wandb.proto import wandb_internal_pb2
 from . import artifacts
 from . import file_stream
 from . import internal_api
+from . import internal_util
 from . import update
 from .file_pusher import FilePusher
 from .settings_static import SettingsDict, SettingsStatic
@@ -126,6 +127,7 @@ class SendManager(object):
         record_q: "Queue[Record]",
         result_q: "Queue[Result]",
         interface: InterfaceQueue,
+        status_queues: "Optional[List[internal_util.BudgetQueue]]" = None,
     ) -> None:
         self._settings = settings
         self._record_q = record_q
@@ -151,6 +153,8 @@ class SendManager(object):
         self._config_metric_pbdict_list: List[Dict[int, Any]] = []
         self._metadata_summary: Dict[str, Any] = defaultdict()
         self._cached_summary: Dict[str, Any] = dict()
+        self._summary_needs_debounce: bool = False
+        self._summary_flush_time: float = 0
         self._config_metric_index_dict: Dict[str, int] = {}
         self._config_metric_dict: Dict[str, wandb_internal_pb2.MetricRecord] = {}
 
@@ -174,6 +178,9 @@ class SendManager(object):
         # queue filled by retry_callback
         self._retry_q: "Queue[HttpResponse]" = queue.Queue()
 
+        # queues reported by network_status besides our own and the file stream
+        self._status_queues = status_queues or []
+
         # do we need to debounce?
         self._config_needs_debounce: bool = False
 
@@ -207,6 +214,10 @@ class SendManager(object):
             save_code=None,
             email=None,
             silent=None,
+            console=None,
+            _file_stream_compression=None,
+            _file_stream_queue_max_bytes=None,
+            _file_stream_queue_policy=None,
         )
         settings = SettingsStatic(sd)
         record_q: "Queue[Record]" = queue.Queue()
@@ -317,6 +328,8 @@ class SendManager(object):
     def debounce(self) -> None:
         if self._config_needs_debounce:
             self._debounce_config()
+        if self._summary_needs_debounce:
+            self._update_summary()
 
     def _debounce_config(self) -> None:
         config_value_dict = self._config_format(self._consolidated_config)
@@ -345,6 +358,15 @@ class SendManager(object):
                 break
             except Exception as e:
                 logger.warning("Error emptying retry queue: {}".format(e))
+        queue_status = [
+            q.status()
+            for q in [self._record_q] + self._status_queues
+            if isinstance(q, internal_util.BudgetQueue)
+        ]
+        if self._fs:
+            queue_status.append(self._fs.queue_status())
+        for status in queue_status:
+            status_resp.queue_status.add(**status)
         self._result_q.put(result)
 
     def send_request_login(self, record: "Record") -> None:
@@ -796,6 +818,9 @@ class SendManager(object):
             self._run.run_id,
             self._run.start_time.ToSeconds(),
             settings=self._api_settings,
+            compression=self._settings._file_stream_compression,
+            queue_max_bytes=self._settings._file_stream_queue_max_bytes,
+            queue_policy=self._settings._file_stream_queue_policy,
         )
         # Ensure the streaming polices have the proper offsets
         self._fs.set_file_policy("wandb-summary.json", file_stream.SummaryFilePolicy())
@@ -807,10 +832,20 @@ class SendManager(object):
             "wandb-events.jsonl",
             file_stream.JsonlFilePolicy(start_chunk_id=self._resume_state.events),
         )
-        self._fs.set_file_policy(
-            "output.log",
-            file_stream.CRDedupeFilePolicy(start_chunk_id=self._resume_state.output),
-        )
+        if self._settings.console == "raw":
+            self._fs.set_file_policy(
+                "output.log",
+                file_stream.RawCRDedupeFilePolicy(
+                    start_chunk_id=self._resume_state.output
+                ),
+            )
+        else:
+            self._fs.set_file_policy(
+                "output.log",
+                file_stream.CRDedupeFilePolicy(
+                    start_chunk_id=self._resume_state.output
+                ),
+            )
         util.sentry_set_scope(
             "internal",
             entity=self._run.entity,
@@ -834,15 +869,39 @@ class SendManager(object):
 
     def send_history(self, record: "Record") -> None:
         history = record.history
-        history_dict = proto_util.dict_from_proto_list(history.item)
+        history_dict = proto_util.history_dict_from_proto_list(history.item)
         self._save_history(history_dict)
 
     def send_summary(self, record: "Record") -> None:
-        summary_dict = proto_util.dict_from_proto_list(record.summary.update)
-        self._cached_summary = summary_dict
-        self._update_summary()
+        # summary records carry only the keys that changed, merge them into
+        # the cached copy and write it out at most once per debounce interval
+        summary = record.summary
+        for item in summary.update:
+            key = tuple(item.nested_key) or (item.key,)
+            target = self._cached_summary
+            for prop in key[:-1]:
+                target = target.setdefault(prop, {})
+            target[key[-1]] = json.loads(item.value_json)
+        for item in summary.remove:
+            key = tuple(item.nested_key) or (item.key,)
+            target = self._cached_summary
+            for prop in key[:-1]:
+                target = target.get(prop, {})
+            target.pop(key[-1], None)
+        self._summary_needs_debounce = True
+        if time.time() - self._summary_flush_time >= self._summary_debounce_seconds():
+            self._update_summary()
+
+    def _summary_debounce_seconds(self) -> float:
+        # the file stream only posts the latest summary chunk once per rate
+        # limit interval, so flushing more often than that is wasted work
+        if self._fs:
+            return float(self._fs.rate_limit_seconds())
+        return 1.0
 
     def _update_summary(self) -> None:
+        self._summary_needs_debounce = False
+        self._summary_flush_time = time.time()
         summary_dict = self._cached_summary.copy()
         summary_dict.pop("_wandb", None)
         if self._metadata_summary:
@@ -886,6 +945,12 @@ class SendManager(object):
             stream = "stderr"
             prepend = "ERROR "
         line = out.line
+        if self._settings.console == "raw":
+            # raw output is split into lines by the file stream policy
+            cur_time = time.time()
+            timestamp = datetime.utcfromtimestamp(cur_time).isoformat() + " "
+            self._fs.push(filenames.OUTPUT_FNAME, prepend + timestamp + line)
+            return
         if not line.endswith("\n"):
             self._partial_output.setdefault(stream, "")
             if line.startswith("\r"):
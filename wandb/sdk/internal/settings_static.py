@@ -18,6 +18,17 @@ class SettingsStatic(object):
     files_dir: str
     log_internal: str
     _internal_check_process: bool
+    _sync_commit_bytes: "Optional[int]"
+    _sync_fsync_seconds: "Optional[float]"
+    _sync_fsync_bytes: "Optional[int]"
+    _file_stream_compression: "Optional[str]"
+    _sender_queue_max_bytes: "Optional[int]"
+    _sender_queue_policy: "Optional[str]"
+    _writer_queue_max_bytes: "Optional[int]"
+    _writer_queue_policy: "Optional[str]"
+    _file_stream_queue_max_bytes: "Optional[int]"
+    _file_stream_queue_policy: "Optional[str]"
+    console: "Optional[str]"
     resume: "Optional[str]"
     program: "Optional[str]"
     silent: "Optional[bool]"
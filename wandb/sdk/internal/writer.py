@@ -24,6 +24,11 @@ class WriteManager(object):
     def open(self):
         self._ds = datastore.DataStore()
         self._ds.open_for_write(self._settings.sync_file)
+        if self._settings._sync_commit_bytes:
+            self._ds.set_group_commit(
+                fsync_seconds=self._settings._sync_fsync_seconds or 0,
+                fsync_bytes=self._settings._sync_fsync_bytes or 0,
+            )
 
     def write(self, record):
         if not self._ds:
@@ -33,10 +38,18 @@ class WriteManager(object):
         assert record_type
 
         self._ds.write(record)
+        if self._ds.pending_bytes() >= (self._settings._sync_commit_bytes or 0):
+            self._ds.commit()
+
+    def commit(self):
+        """Write out records gathered since the last commit."""
+        if self._ds:
+            self._ds.commit()
 
     def finish(self):
         if self._ds:
             self._ds.close()
 
     def debounce(self) -> None:
-        pass
+        # lets the time based fsync policy run while no records arrive
+        self.commit()
@@ -0,0 +1,79 @@
+#
+"""Encode logged media on background threads.
+
+Creating a wandb.Image, Video or Audio from raw data encodes it to a file,
+which can take long enough to stall a training loop. With
+WANDB_MEDIA_ENCODE_THREADS set, that encoding runs on a shared pool of threads
+instead. History rows are serialized when they are logged, except for the media
+in them, which a thread of their own adds in order once it is encoded. Image
+and audio encoders and hashlib release the GIL, so the pool uses more than one
+cpu.
+"""
+
+import concurrent.futures
+import threading
+from typing import Any, Callable, Optional
+
+from wandb import env
+
+
+class MediaPool(object):
+    """Runs media encoding tasks on a pool of threads.
+
+    submit() blocks while the tasks that haven't finished hold more than
+    max_pending_bytes of input, so media created faster than it can be encoded
+    slows the caller down instead of piling up in memory. A single task larger
+    than the bound runs on its own.
+    """
+
+    MAX_PENDING_BYTES = 256 * 1024 * 1024
+
+    def __init__(
+        self, max_workers: int, max_pending_bytes: Optional[int] = None
+    ) -> None:
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="wandb-media"
+        )
+        self._max_pending_bytes = max_pending_bytes or self.MAX_PENDING_BYTES
+        self._pending_bytes = 0
+        self._cond = threading.Condition()
+
+    @property
+    def pending_bytes(self) -> int:
+        return self._pending_bytes
+
+    def submit(self, fn: Callable[[], Any], nbytes: int) -> concurrent.futures.Future:
+        """Run fn on the pool, where nbytes is about how much memory it holds."""
+        with self._cond:
+            while (
+                self._pending_bytes
+                and self._pending_bytes + nbytes > self._max_pending_bytes
+            ):
+                self._cond.wait()
+            self._pending_bytes += nbytes
+
+        def release(_: concurrent.futures.Future) -> None:
+            with self._cond:
+                self._pending_bytes -= nbytes
+                self._cond.notify_all()
+
+        future = self._executor.submit(fn)
+        future.add_done_callback(release)
+        return future
+
+
+_media_pool: Optional[MediaPool] = None
+_media_pool_lock = threading.Lock()
+
+
+def get_media_pool() -> Optional[MediaPool]:
+    """Returns the shared pool, or None if media is encoded on the caller's thread."""
+    global _media_pool
+    if _media_pool is None:
+        workers = env.get_media_encode_threads()
+        if not workers or workers < 1:
+            return None
+        with _media_pool_lock:
+            if _media_pool is None:
+                _media_pool = MediaPool(workers)
+    return _media_pool
@@ -1,6 +1,6 @@
 #
 import json
-from typing import Any, Dict, Union
+from typing import Any, Callable, Dict, Iterable, Union
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:  # pragma: no cover
@@ -15,6 +15,45 @@ def dict_from_proto_list(obj_list):
     return d
 
 
+# strings longer than this go through value_json like any other object
+HISTORY_STRING_MAX_LEN = 1024
+_INT64_MIN = -(2**63)
+_INT64_MAX = 2**63 - 1
+
+
+def history_item_set_value(
+    item: "pb.HistoryItem", value: Any, dumps: Callable[[Any], str] = json.dumps
+) -> None:
+    """Store value in a history item, natively when it is a plain scalar.
+
+    Only exact int, float and str are stored natively (bool and numpy types are
+    json encoded as before), so the decoded value is the same either way.
+    """
+    value_type = type(value)
+    if value_type is float:
+        item.value_float = value
+    elif value_type is int and _INT64_MIN <= value <= _INT64_MAX:
+        item.value_int = value
+    elif value_type is str and len(value) <= HISTORY_STRING_MAX_LEN:
+        item.value_string = value
+    else:
+        item.value_json = dumps(value)
+
+
+def history_item_value(item: "pb.HistoryItem") -> Any:
+    typed_value = item.WhichOneof("typed_value")
+    if typed_value is None:
+        return json.loads(item.value_json)
+    return getattr(item, typed_value)
+
+
+def history_dict_from_proto_list(obj_list: Iterable["pb.HistoryItem"]) -> Dict:
+    d = dict()
+    for item in obj_list:
+        d[item.key] = history_item_value(item)
+    return d
+
+
 def proto_encode_to_dict(
     pb_obj: Union["tpb.TelemetryRecord", "pb.MetricRecord"]
 ) -> Dict[int, Any]:
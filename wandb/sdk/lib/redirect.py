@@ -6,6 +6,7 @@ try:
 except ImportError:  # windows
     pty = tty = termios = fcntl = None  # type: ignore
 
+import codecs
 from collections import defaultdict
 import itertools
 import logging
@@ -483,6 +484,134 @@ class TerminalEmulator(object):
         return ret
 
 
+_STYLE_ATTRS = Char.__slots__[1:]
+_DEFAULT_STYLE = tuple(_defchar[k] for k in _STYLE_ATTRS)
+
+
+def _get_style_change(attr, value):
+    if attr == "fg" or attr == "bg":
+        return _get_char(value)
+    return _get_char(ANSI_STYLES_REV[attr if value else "/" + attr])
+
+
+class _Line(object):
+    """
+    A line of the compact emulator: its characters and, in a parallel list, the id of
+    the style of each character. Style id 0 is the default style.
+    """
+
+    __slots__ = ("chars", "styles", "rendered")
+
+    def __init__(self):
+        self.chars = []
+        self.styles = []
+        self.rendered = None  # Cache of CompactTerminalEmulator._get_line
+
+    def __len__(self):
+        return len(self.chars)
+
+    def write(self, x, text, style):
+        if x < 0:  # characters left of the first column are never displayed
+            text = text[-x:]
+            x = 0
+        if x > len(self.chars):
+            pad = x - len(self.chars)
+            self.chars.extend(" " * pad)
+            self.styles.extend([0] * pad)
+        self.chars[x : x + len(text)] = text
+        self.styles[x : x + len(text)] = [style] * len(text)
+        self.rendered = None
+
+    def erase(self, start, end):
+        start = max(start, 0)
+        end = min(end, len(self.chars))
+        if start < end:
+            self.chars[start:end] = " " * (end - start)
+            self.styles[start:end] = [0] * (end - start)
+            self.rendered = None
+
+    def clear(self):
+        self.chars = []
+        self.styles = []
+        self.rendered = None
+
+
+class CompactTerminalEmulator(TerminalEmulator):
+    """
+    A TerminalEmulator that stores each line as a list of characters and a parallel list
+    of style ids instead of a Char per cell, and renders a line a run of same styled
+    characters at a time. Its output is identical to that of TerminalEmulator.
+    """
+
+    def __init__(self):
+        super(CompactTerminalEmulator, self).__init__()
+        self.buffer = defaultdict(_Line)
+        self._styles = [_DEFAULT_STYLE]
+        self._style_ids = {_DEFAULT_STYLE: 0}
+
+    def _get_style_id(self):
+        style = tuple(self.cursor.char[k] for k in _STYLE_ATTRS)
+        style_id = self._style_ids.get(style)
+        if style_id is None:
+            style_id = self._style_ids[style] = len(self._styles)
+            self._styles.append(style)
+        return style_id
+
+    def _get_line_len(self, n):
+        if n not in self.buffer:
+            return 0
+        line = self.buffer[n]
+        chars, styles = line.chars, line.styles
+        i = len(chars)
+        while i and chars[i - 1] == " " and not styles[i - 1]:
+            i -= 1
+        return i
+
+    def display(self):
+        return [
+            self.buffer[i].chars[: self._get_line_len(i)] for i in range(self.num_lines)
+        ]
+
+    def erase_line(self, mode=0):
+        curr_line = self.buffer[self.cursor.y]
+        if mode == 0:
+            curr_line.erase(self.cursor.x, self._get_line_len(self.cursor.y))
+        elif mode == 1:
+            curr_line.erase(0, self.cursor.x + 1)
+        else:
+            curr_line.clear()
+
+    def _write_plain_text(self, plain_text):
+        self.buffer[self.cursor.y].write(
+            self.cursor.x, plain_text, self._get_style_id()
+        )
+        self.cursor.x += len(plain_text)
+
+    def _get_line(self, n):
+        line = self.buffer[n]
+        if line.rendered is not None:
+            return line.rendered
+        line_len = self._get_line_len(n)
+        chars = line.chars
+        out = []
+        prev_style = _DEFAULT_STYLE
+        start = 0
+        for style_id, run in itertools.groupby(line.styles[:line_len]):
+            end = start + sum(1 for _ in run)
+            style = self._styles[style_id]
+            if style != prev_style:
+                out.extend(
+                    _get_style_change(attr, value)
+                    for attr, prev_value, value in zip(_STYLE_ATTRS, prev_style, style)
+                    if value != prev_value
+                )
+                prev_style = style
+            out.append("".join(chars[start:end]))
+            start = end
+        line.rendered = "".join(out)
+        return line.rendered
+
+
 _MIN_CALLBACK_INTERVAL = 2  # seconds
 
 
@@ -544,7 +673,7 @@ class StreamWrapper(RedirectBase):
     def __init__(self, src, cbs=()):
         super(StreamWrapper, self).__init__(src=src, cbs=cbs)
         self._installed = False
-        self._emulator = TerminalEmulator()
+        self._emulator = CompactTerminalEmulator()
 
     def _emulator_write(self):
         while True:
@@ -688,10 +817,12 @@ class Redirect(RedirectBase):
     Redirects low level file descriptors.
     """
 
+    _read_size = 4096
+
     def __init__(self, src, cbs=()):
         super(Redirect, self).__init__(src=src, cbs=cbs)
         self._installed = False
-        self._emulator = TerminalEmulator()
+        self._emulator = CompactTerminalEmulator()
 
     def _pipe(self):
         if pty:
@@ -776,10 +907,10 @@ class Redirect(RedirectBase):
         while True:
             try:
                 brk = False
-                data = os.read(self._pipe_read_fd, 4096)
+                data = os.read(self._pipe_read_fd, self._read_size)
                 if self._stopped.is_set():
                     if _LAST_WRITE_TOKEN not in data:
-                        # _LAST_WRITE_TOKEN could have gotten split up at the 4096 border
+                        # _LAST_WRITE_TOKEN could have gotten split up at the read border
                         n = len(_LAST_WRITE_TOKEN)
                         while n and data[-n:] != _LAST_WRITE_TOKEN[:n]:
                             n -= 1
@@ -794,12 +925,15 @@ class Redirect(RedirectBase):
                 if i is not None:  # python 3 w/ unbuffered i/o: we need to keep writing
                     while i < len(data):
                         i += self._orig_src.write(data[i:])
-                self._queue.put(data)
+                self._relay(data)
                 if brk:
                     return
             except OSError:
                 return
 
+    def _relay(self, data):
+        self._queue.put(data)
+
     def _emulator_write(self):
         while True:
             if self._queue.empty():
@@ -819,3 +953,55 @@ class Redirect(RedirectBase):
                 self._emulator.write(b"".join(data).decode("utf-8"))
             except Exception:
                 pass
+
+
+_RAW_FLUSH_BYTES = 1 << 20
+
+
+class RawRedirect(Redirect):
+    """
+    Redirects low level file descriptors without interpreting the output.
+
+    Bytes read from the pipe are handed to the callbacks as they are, in large
+    batches, instead of going through a queue and the terminal emulator.
+    Carriage returns and ANSI sequences are left for the consumer to process.
+    A UTF-8 character split across reads is held back until the rest of it is
+    read, and invalid bytes are replaced, so every batch is valid UTF-8.
+    """
+
+    _read_size = 65536
+
+    def __init__(self, src, cbs=()):
+        super(RawRedirect, self).__init__(src=src, cbs=cbs)
+        self._emulator = None
+        self._buffer = []
+        self._buffer_size = 0
+        self._buffer_lock = threading.Lock()
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def flush(self, data=None):
+        with self._buffer_lock:
+            if data is None:
+                data = b"".join(self._buffer)
+                self._buffer = []
+                self._buffer_size = 0
+            # after uninstall() nothing more is read, so flush what was held back
+            data = self._decoder.decode(data, final=not self._installed)
+            data = data.encode("utf-8")
+            if data:
+                for cb in self.cbs:
+                    try:
+                        cb(data)
+                    except Exception:
+                        pass  # TODO(frz)
+
+    def _relay(self, data):
+        with self._buffer_lock:
+            self._buffer.append(data)
+            self._buffer_size += len(data)
+            full = self._buffer_size >= _RAW_FLUSH_BYTES
+        if full:
+            self.flush()
+
+    def _emulator_write(self):
+        return
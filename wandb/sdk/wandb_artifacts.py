@@ -1,10 +1,15 @@
 #
+import array
 import base64
+import bisect
+import concurrent.futures
 import contextlib
 import hashlib
+import heapq
+import math
 import os
 import re
-import shutil
+import threading
 import time
 from typing import (
     Any,
@@ -12,8 +17,10 @@ from typing import (
     Dict,
     Generator,
     IO,
+    Iterator,
     List,
     Mapping,
+    MutableMapping,
     Optional,
     Sequence,
     Tuple,
@@ -21,6 +28,11 @@ from typing import (
     Union,
 )
 
+try:
+    import fcntl
+except ImportError:  # windows
+    fcntl = None  # type: ignore
+
 import requests
 from six.moves.urllib.parse import quote, urlparse
 import wandb
@@ -40,6 +52,8 @@ from .interface.artifacts import (  # noqa: F401 pylint: disable=unused-import
     ArtifactManifest,
     ArtifactsCache,
     b64_string_to_hex,
+    copy_file_data,
+    FileHasher,
     get_artifacts_cache,
     md5_file_b64,
     md5_string,
@@ -66,9 +80,80 @@ _REQUEST_POOL_CONNECTIONS = 64
 
 _REQUEST_POOL_MAXSIZE = 64
 
+_DOWNLOAD_CHUNK_BYTES = 1024 * 1024
+
+# Files at least this big are downloaded as parallel, resumable HTTP ranges
+_RANGE_DOWNLOAD_MIN_BYTES = 64 * 1024 * 1024
+
+_RANGE_PART_BYTES = 16 * 1024 * 1024
+
+_RANGE_DOWNLOAD_WORKERS = 16
+
+# retries of a range whose connection drops mid-stream, connecting and error
+# statuses are retried by the session
+_RANGE_RETRIES = 2
+
+_range_download_executor = None
+
+_range_download_executor_lock = threading.Lock()
+
 ARTIFACT_TMP = compat_tempfile.TemporaryDirectory("wandb-artifacts")
 
 
+def _get_range_download_executor() -> concurrent.futures.ThreadPoolExecutor:
+    """Threads for range downloads, shared by every file in the process so that
+    downloading many large files at once doesn't open unbounded connections."""
+    global _range_download_executor
+    with _range_download_executor_lock:
+        if _range_download_executor is None:
+            _range_download_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=_RANGE_DOWNLOAD_WORKERS
+            )
+        return _range_download_executor
+
+
+class _RangesNotSupported(Exception):
+    pass
+
+
+class _PartialLocked(Exception):
+    pass
+
+
+@contextlib.contextmanager
+def _lock_partial(partial_path: str) -> Generator[None, None, None]:
+    """Hold the lock on downloading into partial_path.
+
+    Raises _PartialLocked if another download, in this process or another one,
+    holds it, or if file locks aren't available. The lock is released if the
+    process dies, so an interrupted download can be resumed.
+    """
+    if fcntl is None:
+        raise _PartialLocked()
+    lock_path = partial_path + ".lock"
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            # the holder we waited on may have removed the lock file
+            if os.fstat(fd).st_ino != os.stat(lock_path).st_ino:
+                raise _PartialLocked()
+        except OSError:
+            raise _PartialLocked()
+        try:
+            yield
+        finally:
+            os.remove(lock_path)
+    finally:
+        os.close(fd)
+
+
+def _hash_summary(hasher: FileHasher) -> str:
+    if not hasher.last_stats.files:
+        return ""
+    return ", hashed %s" % (hasher.last_stats,)
+
+
 class _AddedObj(object):
     def __init__(self, entry: ArtifactEntry, obj: data_types.WBValue):
         self.entry = entry
@@ -97,6 +182,9 @@ class Artifact(ArtifactInterface):
         metadata: (dict, optional) Structured data associated with the artifact,
             for example class distribution of a dataset. This will eventually be queryable
             and plottable in the UI. There is a hard limit of 100 total keys.
+        incremental: (bool, optional) Experimental. Log this artifact as changes to
+            the latest version of the artifact: only files that differ from that
+            version are uploaded, and its files that aren't in this artifact are kept.
 
     Examples:
         Basic usage
@@ -249,13 +337,7 @@ class Artifact(ArtifactInterface):
     def size(self) -> int:
         if self._logged_artifact:
             return self._logged_artifact.size
-        sizes: List[int]
-        sizes = []
-        for entry in self._manifest.entries:
-            e_size = self._manifest.entries[entry].size
-            if e_size is not None:
-                sizes.append(e_size)
-        return sum(sizes)
+        return self._manifest.entries.total_size()
 
     @property
     def commit_hash(self) -> str:
@@ -377,7 +459,7 @@ class Artifact(ArtifactInterface):
             raise ValueError("Path is not a file: %s" % local_path)
 
         name = name or os.path.basename(local_path)
-        digest = md5_file_b64(local_path)
+        digest = self._cache.md5_file_b64(local_path)
 
         if is_tmp:
             file_path, file_name = os.path.split(name)
@@ -399,28 +481,39 @@ class Artifact(ArtifactInterface):
         )
         start_time = time.time()
 
-        paths = []
+        logical_paths = []
+        physical_paths = []
+        stats = []
         for dirpath, _, filenames in os.walk(local_path, followlinks=True):
             for fname in filenames:
                 physical_path = os.path.join(dirpath, fname)
                 logical_path = os.path.relpath(physical_path, start=local_path)
                 if name is not None:
                     logical_path = os.path.join(name, logical_path)
-                paths.append((logical_path, physical_path))
+                logical_paths.append(logical_path)
+                physical_paths.append(physical_path)
+                stats.append(os.stat(physical_path))
+
+        def add_manifest_file(entry: Tuple[str, str, str]) -> None:
+            logical_path, physical_path, digest = entry
+            self._add_local_file(logical_path, physical_path, digest=digest)
 
-        def add_manifest_file(log_phy_path: Tuple[str, str]) -> None:
-            logical_path, physical_path = log_phy_path
-            self._add_local_file(logical_path, physical_path)
+        # unchanged files get their digest from the index, the rest are hashed
+        hasher = FileHasher()
+        digests = self._cache.md5_files_b64(physical_paths, stats, hasher=hasher)
 
         import multiprocessing.dummy  # this uses threads
 
         num_threads = 8
         pool = multiprocessing.dummy.Pool(num_threads)
-        pool.map(add_manifest_file, paths)
+        pool.map(add_manifest_file, zip(logical_paths, physical_paths, digests))
         pool.close()
         pool.join()
 
-        termlog("Done. %.1fs" % (time.time() - start_time), prefix=False)
+        termlog(
+            "Done. %.1fs%s" % (time.time() - start_time, _hash_summary(hasher)),
+            prefix=False,
+        )
 
     def add_reference(
         self,
@@ -687,13 +780,13 @@ class Artifact(ArtifactInterface):
     def _add_local_file(
         self, name: str, path: str, digest: Optional[str] = None
     ) -> ArtifactEntry:
-        digest = digest or md5_file_b64(path)
+        digest = digest or self._cache.md5_file_b64(path)
         size = os.path.getsize(path)
 
         cache_path, hit, cache_open = self._cache.check_md5_obj_path(digest, size)
         if not hit:
-            with cache_open() as f:
-                shutil.copyfile(path, f.name)
+            with cache_open(mode="wb") as f:
+                copy_file_data(path, f)
 
         entry = ArtifactManifestEntry(
             name, None, digest=digest, size=size, local_path=cache_path,
@@ -710,6 +803,207 @@ class Artifact(ArtifactInterface):
         return self.get(name)
 
 
+class ManifestEntries(MutableMapping[str, ArtifactEntry]):
+    """The entries of an ArtifactManifestV1, by path.
+
+    Entries loaded from manifest json are kept as sorted columns of paths, digests
+    and sizes, and only become ArtifactManifestEntry objects when looked up. That
+    object is kept from then on, so changes made to it stick. Entries that are set
+    are kept as they are. Paths are found by binary search, and a directory's
+    entries by searching for its prefix.
+    """
+
+    def __init__(self, entries: Optional[Mapping[str, ArtifactEntry]] = None) -> None:
+        self._paths: List[str] = []
+        self._digests: List[str] = []
+        self._sizes = array.array("q")
+        # the fields most entries don't have, by path
+        self._other: Dict[str, Dict] = {}
+        self._deleted: set = set()
+        # entries that were looked up or set
+        self._objects: Dict[str, ArtifactEntry] = {}
+        # paths of the entries that were set and aren't in the columns, in order
+        self._added: Dict[str, None] = {}
+        self._sorted_added: Optional[List[str]] = None
+        for path, entry in (entries or {}).items():
+            self[path] = entry
+
+    @classmethod
+    def from_contents(cls, contents: Dict[str, Dict]) -> "ManifestEntries":
+        """Build from the "contents" of manifest json."""
+        entries = cls()
+        entries._paths = sorted(contents)
+        for path in entries._paths:
+            val = contents[path]
+            entries._digests.append(val["digest"])
+            other = {}
+            if len(val) > 2 or "size" not in val:
+                other = {k: v for k, v in val.items() if k not in ("digest", "size")}
+            size = val.get("size")
+            try:
+                entries._sizes.append(-1 if size is None else size)
+            except (TypeError, OverflowError):
+                entries._sizes.append(-1)
+                other["size"] = size
+            if other:
+                entries._other[path] = other
+        return entries
+
+    def _index(self, path: str) -> int:
+        """Return the column index of path, -1 if it isn't in the columns."""
+        i = bisect.bisect_left(self._paths, path)
+        if i < len(self._paths) and self._paths[i] == path:
+            if path not in self._deleted:
+                return i
+        return -1
+
+    def _load(self, i: int) -> ArtifactEntry:
+        path = self._paths[i]
+        other = self._other.get(path, {})
+        size = self._sizes[i]
+        return ArtifactManifestEntry(
+            path=path,
+            digest=self._digests[i],
+            birth_artifact_id=other.get("birthArtifactID"),
+            ref=other.get("ref"),
+            size=other.get("size") if size < 0 else size,
+            extra=other.get("extra"),
+            local_path=other.get("local_path"),
+        )
+
+    def __getitem__(self, path: str) -> ArtifactEntry:
+        entry = self._objects.get(path)
+        if entry is None:
+            i = self._index(path)
+            if i < 0:
+                raise KeyError(path)
+            entry = self._objects[path] = self._load(i)
+        return entry
+
+    def __setitem__(self, path: str, entry: ArtifactEntry) -> None:
+        if path not in self._objects and self._index(path) < 0:
+            self._added[path] = None
+            self._sorted_added = None
+        self._objects[path] = entry
+
+    def __delitem__(self, path: str) -> None:
+        if path in self._added:
+            del self._added[path]
+            self._sorted_added = None
+        elif self._index(path) >= 0:
+            self._deleted.add(path)
+        else:
+            raise KeyError(path)
+        self._objects.pop(path, None)
+
+    def __contains__(self, path: object) -> bool:
+        return path in self._objects or (
+            isinstance(path, str) and self._index(path) >= 0
+        )
+
+    def __len__(self) -> int:
+        return len(self._paths) - len(self._deleted) + len(self._added)
+
+    def __iter__(self) -> Iterator[str]:
+        for path in self._paths:
+            if path not in self._deleted:
+                yield path
+        for path in list(self._added):
+            yield path
+
+    def _added_in_order(self) -> List[str]:
+        if self._sorted_added is None:
+            self._sorted_added = sorted(self._added)
+        return self._sorted_added
+
+    def _sorted_indexes(self) -> Iterator[Tuple[str, int]]:
+        """Yield (path, column index or -1) in path order."""
+        columns: Iterator[Tuple[str, int]] = zip(self._paths, range(len(self._paths)))
+        if self._deleted:
+            columns = (item for item in columns if item[0] not in self._deleted)
+        if not self._added:
+            return columns
+        added = ((path, -1) for path in self._added_in_order())
+        return heapq.merge(columns, added)
+
+    def sorted_digests(self) -> Iterator[Tuple[str, str]]:
+        """Yield (path, digest) in path order."""
+        objects = self._objects
+        digests = self._digests
+        for path, i in self._sorted_indexes():
+            entry = objects.get(path)
+            yield path, entry.digest if entry is not None else digests[i]
+
+    def sorted_items(self) -> Iterator[Tuple[str, Dict]]:
+        """Yield (path, manifest json of the entry) in path order.
+
+        Entries that were never looked up aren't turned into objects.
+        """
+        for path, i in self._sorted_indexes():
+            entry = self._objects.get(path)
+            if entry is not None:
+                yield path, _entry_json(
+                    entry.digest,
+                    entry.birth_artifact_id,
+                    entry.ref,
+                    entry.extra,
+                    entry.size,
+                )
+            else:
+                other = self._other.get(path, {})
+                size = self._sizes[i]
+                yield path, _entry_json(
+                    self._digests[i],
+                    other.get("birthArtifactID"),
+                    other.get("ref"),
+                    other.get("extra"),
+                    other.get("size") if size < 0 else size,
+                )
+
+    def in_directory(self, directory: str) -> List[ArtifactEntry]:
+        # entries use forward slash even for windows
+        prefix = directory + "/"
+        paths = [
+            path
+            for path in _with_prefix(self._paths, prefix)
+            if path not in self._deleted
+        ]
+        paths.extend(_with_prefix(self._added_in_order(), prefix))
+        return [self[path] for path in paths]
+
+    def total_size(self) -> int:
+        """Return the sum of the sizes of the entries that have one."""
+        return sum(json_entry.get("size", 0) for _, json_entry in self.sorted_items())
+
+
+def _with_prefix(sorted_paths: List[str], prefix: str) -> Iterator[str]:
+    i = bisect.bisect_left(sorted_paths, prefix)
+    while i < len(sorted_paths) and sorted_paths[i].startswith(prefix):
+        yield sorted_paths[i]
+        i += 1
+
+
+def _entry_json(
+    digest: str,
+    birth_artifact_id: Optional[str],
+    ref: Optional[str],
+    extra: Optional[Dict],
+    size: Optional[int],
+) -> Dict[str, Any]:
+    json_entry: Dict[str, Any] = {
+        "digest": digest,
+    }
+    if birth_artifact_id:
+        json_entry["birthArtifactID"] = birth_artifact_id
+    if ref:
+        json_entry["ref"] = ref
+    if extra:
+        json_entry["extra"] = extra
+    if size is not None:
+        json_entry["size"] = size
+    return json_entry
+
+
 class ArtifactManifestV1(ArtifactManifest):
     @classmethod
     def version(cls) -> int:
@@ -730,19 +1024,7 @@ class ArtifactManifestV1(ArtifactManifest):
         if storage_policy_cls is None:
             raise ValueError('Failed to find storage policy "%s"' % storage_policy_name)
 
-        entries: Mapping[str, ArtifactManifestEntry]
-        entries = {
-            name: ArtifactManifestEntry(
-                path=name,
-                digest=val["digest"],
-                birth_artifact_id=val.get("birthArtifactID"),
-                ref=val.get("ref"),
-                size=val.get("size"),
-                extra=val.get("extra"),
-                local_path=val.get("local_path"),
-            )
-            for name, val in manifest_json["contents"].items()
-        }
+        entries = ManifestEntries.from_contents(manifest_json["contents"])
 
         return cls(
             artifact, storage_policy_cls.from_config(storage_policy_config), entries
@@ -754,6 +1036,8 @@ class ArtifactManifestV1(ArtifactManifest):
         storage_policy: StoragePolicy,
         entries: Optional[Mapping[str, ArtifactEntry]] = None,
     ) -> None:
+        if not isinstance(entries, ManifestEntries):
+            entries = ManifestEntries(entries)
         super(ArtifactManifestV1, self).__init__(
             artifact, storage_policy, entries=entries
         )
@@ -766,20 +1050,7 @@ class ArtifactManifestV1(ArtifactManifest):
         system. We don't need to include the local paths in the artifact manifest
         contents.
         """
-        contents = {}
-        for entry in sorted(self.entries.values(), key=lambda k: k.path):
-            json_entry: Dict[str, Any] = {
-                "digest": entry.digest,
-            }
-            if entry.birth_artifact_id:
-                json_entry["birthArtifactID"] = entry.birth_artifact_id
-            if entry.ref:
-                json_entry["ref"] = entry.ref
-            if entry.extra:
-                json_entry["extra"] = entry.extra
-            if entry.size is not None:
-                json_entry["size"] = entry.size
-            contents[entry.path] = json_entry
+        contents = dict(self.entries.sorted_items())
         return {
             "version": self.__class__.version(),
             "storagePolicy": self.storage_policy.name(),
@@ -790,10 +1061,13 @@ class ArtifactManifestV1(ArtifactManifest):
     def digest(self) -> str:
         hasher = hashlib.md5()
         hasher.update("wandb-artifact-manifest-v1\n".encode())
-        for (name, entry) in sorted(self.entries.items(), key=lambda kv: kv[0]):
-            hasher.update("{}:{}\n".format(name, entry.digest).encode())
+        for name, digest in self.entries.sorted_digests():
+            hasher.update("{}:{}\n".format(name, digest).encode())
         return hasher.hexdigest()
 
+    def get_entries_in_directory(self, directory: str) -> List[ArtifactEntry]:
+        return self.entries.in_directory(directory)
+
 
 class ArtifactManifestEntry(ArtifactEntry):
     def __init__(
@@ -882,18 +1156,134 @@ class WandbStoragePolicy(StoragePolicy):
         if hit:
             return path
 
-        response = self._session.get(
-            self._file_url(self._api, artifact.entity, manifest_entry),
-            auth=("api", self._api.api_key),
-            stream=True,
-        )
+        url = self._file_url(self._api, artifact.entity, manifest_entry)
+        if (manifest_entry.size or 0) >= _RANGE_DOWNLOAD_MIN_BYTES:
+            try:
+                self._load_ranges(url, path, manifest_entry.size)
+                return path
+            except (_RangesNotSupported, _PartialLocked):
+                pass
+
+        response = self._session.get(url, auth=("api", self._api.api_key), stream=True)
         response.raise_for_status()
 
         with cache_open(mode="wb") as file:
-            for data in response.iter_content(chunk_size=16 * 1024):
+            for data in response.iter_content(chunk_size=_DOWNLOAD_CHUNK_BYTES):
                 file.write(data)
         return path
 
+    def _load_ranges(self, url: str, path: str, size: int) -> None:
+        """Download the file at url into the cache at path as parallel ranges.
+
+        The ranges are written into a partial file in the cache, and the ones that
+        finished are listed next to it. If the download fails on a connection
+        error, the next call only fetches the missing ranges. On any other error,
+        including a server that doesn't serve ranges, both files are removed.
+
+        Only one download at a time uses the partial file. Raises _PartialLocked
+        if another one holds it, and the caller downloads the file on its own.
+        """
+        partial_path = self._cache.partial_path(path)
+        with _lock_partial(partial_path):
+            if os.path.isfile(path) and os.path.getsize(path) == size:
+                # the download that held the lock finished it
+                return
+            self._load_ranges_locked(url, path, partial_path, size)
+
+    def _load_ranges_locked(
+        self, url: str, path: str, partial_path: str, size: int
+    ) -> None:
+        done_path = partial_path + ".done"
+        num_parts = int(math.ceil(size / float(_RANGE_PART_BYTES)))
+
+        completed = set()
+        if os.path.isfile(partial_path):
+            try:
+                with open(done_path) as f:
+                    completed = {int(line) for line in f if line.strip()}
+            except (IOError, ValueError):
+                pass
+        else:
+            open(done_path, "w").close()
+        with open(partial_path, "ab") as f:
+            if os.fstat(f.fileno()).st_size != size:
+                f.truncate(size)
+                completed = set()
+        done_lock = threading.Lock()
+
+        def download(part: int) -> None:
+            start = part * _RANGE_PART_BYTES
+            end = min(start + _RANGE_PART_BYTES, size)
+            for attempt in range(_RANGE_RETRIES + 1):
+                try:
+                    self._load_range(url, partial_path, start, end)
+                    break
+                except (
+                    requests.exceptions.ConnectionError,
+                    requests.exceptions.ChunkedEncodingError,
+                ):
+                    if attempt == _RANGE_RETRIES:
+                        raise
+            with done_lock, open(done_path, "a") as f:
+                f.write("%d\n" % part)
+
+        pending = [part for part in range(num_parts) if part not in completed]
+        executor = _get_range_download_executor()
+        futures = [executor.submit(download, part) for part in pending]
+        # let every range finish, so the ones that succeeded are recorded
+        concurrent.futures.wait(futures)
+        try:
+            for future in futures:
+                future.result()
+        except (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.ChunkedEncodingError,
+            requests.exceptions.Timeout,
+        ):
+            # keep the finished ranges, the next call resumes from them
+            raise
+        except Exception:
+            self._remove_partial(partial_path, done_path)
+            raise
+
+        try:
+            self._cache.commit_partial(partial_path, path)
+        except OSError:
+            # someone else finished the same download first
+            if not os.path.isfile(path) or os.path.getsize(path) != size:
+                self._remove_partial(partial_path, done_path)
+                raise
+        self._remove_partial(partial_path, done_path)
+
+    def _remove_partial(self, partial_path: str, done_path: str) -> None:
+        for p in (partial_path, done_path):
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+
+    def _load_range(self, url: str, partial_path: str, start: int, end: int) -> None:
+        with self._session.get(
+            url,
+            auth=("api", self._api.api_key),
+            headers={"Range": "bytes=%d-%d" % (start, end - 1)},
+            stream=True,
+        ) as response:
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise _RangesNotSupported()
+            with open(partial_path, "r+b") as f:
+                f.seek(start)
+                for data in response.iter_content(chunk_size=_DOWNLOAD_CHUNK_BYTES):
+                    f.write(data)
+                if f.tell() != end:
+                    raise IOError(
+                        "Expected bytes %d-%d of %s, got %d"
+                        % (start, end - 1, url, f.tell() - start)
+                    )
+                f.flush()
+                os.fsync(f.fileno())
+
     def store_reference(
         self,
         artifact: ArtifactInterface,
@@ -954,8 +1344,8 @@ class WandbStoragePolicy(StoragePolicy):
             entry.digest, entry.size if entry.size is not None else 0
         )
         if not hit and entry.local_path is not None:
-            with cache_open() as f:
-                shutil.copyfile(entry.local_path, f.name)
+            with cache_open(mode="wb") as f:
+                copy_file_data(entry.local_path, f)
             entry.local_path = cache_path
 
         resp = preparer.prepare(
@@ -1190,7 +1580,7 @@ class LocalFileHandler(StorageHandler):
         if hit:
             return path
 
-        md5 = md5_file_b64(local_path)
+        md5 = self._cache.md5_file_b64(local_path)
         if md5 != manifest_entry.digest:
             raise ValueError(
                 "Local file reference: Digest mismatch for path %s: expected %s but found %s"
@@ -1199,8 +1589,8 @@ class LocalFileHandler(StorageHandler):
 
         util.mkdir_exists_ok(os.path.dirname(path))
 
-        with cache_open() as f:
-            shutil.copy(local_path, f.name)
+        with cache_open(mode="wb") as f:
+            copy_file_data(local_path, f)
         return path
 
     def store_path(
@@ -1218,12 +1608,12 @@ class LocalFileHandler(StorageHandler):
         # Note, we follow symlinks for files contained within the directory
         entries = []
 
-        def md5(path: str) -> str:
-            return (
-                md5_file_b64(path)
-                if checksum
-                else md5_string(str(os.stat(path).st_size))
-            )
+        hasher = FileHasher()
+
+        def md5s(paths: List[str], stats: List[os.stat_result]) -> List[str]:
+            if checksum:
+                return self._cache.md5_files_b64(paths, stats, hasher=hasher)
+            return [md5_string(str(stat.st_size)) for stat in stats]
 
         if os.path.isdir(local_path):
             i = 0
@@ -1234,6 +1624,9 @@ class LocalFileHandler(StorageHandler):
                     % (max_objects, local_path),
                     newline=False,
                 )
+            logical_paths = []
+            physical_paths = []
+            stats = []
             for root, _, files in os.walk(local_path):
                 for sub_path in files:
                     i += 1
@@ -1246,20 +1639,29 @@ class LocalFileHandler(StorageHandler):
                     logical_path = os.path.relpath(physical_path, start=local_path)
                     if name is not None:
                         logical_path = os.path.join(name, logical_path)
-
-                    entry = ArtifactManifestEntry(
-                        logical_path,
-                        os.path.join(path, logical_path),
-                        size=os.path.getsize(physical_path),
-                        digest=md5(physical_path),
-                    )
-                    entries.append(entry)
+                    logical_paths.append(logical_path)
+                    physical_paths.append(physical_path)
+                    stats.append(os.stat(physical_path))
+
+            digests = md5s(physical_paths, stats)
+            for logical_path, stat, digest in zip(logical_paths, stats, digests):
+                entry = ArtifactManifestEntry(
+                    logical_path,
+                    os.path.join(path, logical_path),
+                    size=stat.st_size,
+                    digest=digest,
+                )
+                entries.append(entry)
             if checksum:
-                termlog("Done. %.1fs" % (time.time() - start_time), prefix=False)
+                termlog(
+                    "Done. %.1fs%s" % (time.time() - start_time, _hash_summary(hasher)),
+                    prefix=False,
+                )
         elif os.path.isfile(local_path):
             name = name or os.path.basename(local_path)
+            stat = os.stat(local_path)
             entry = ArtifactManifestEntry(
-                name, path, size=os.path.getsize(local_path), digest=md5(local_path),
+                name, path, size=stat.st_size, digest=md5s([local_path], [stat])[0],
             )
             entries.append(entry)
         else:
@@ -1703,7 +2105,7 @@ class HTTPHandler(StorageHandler):
             )
 
         with cache_open(mode="wb") as file:
-            for data in response.iter_content(chunk_size=16 * 1024):
+            for data in response.iter_content(chunk_size=_DOWNLOAD_CHUNK_BYTES):
                 file.write(data)
         return path
 
@@ -49,6 +49,8 @@ class History(object):
         self._step = self._run.starting_step
 
     def _flush(self):
+        if self._torch:
+            self._torch._flush_gradients()
         if len(self._data) > 0:
             self._data["_step"] = self._step
             self._data["_runtime"] = int(
@@ -277,7 +277,7 @@ class Run(object):
     _out_redir: Optional[redirect.RedirectBase]
     _err_redir: Optional[redirect.RedirectBase]
     _redirect_cb: Optional[Callable[[str, str], None]]
-    _output_writer: Optional["filesystem.CRDedupedFile"]
+    _output_writer: Optional["filesystem.WriteSerializingFile"]
     _quiet: Optional[bool]
 
     _atexit_cleanup_called: bool
@@ -1723,6 +1723,22 @@ class Run(object):
                     self._redirect(None, None, console=self._settings.Console.WRAP)
 
                 add_import_hook("tensorflow", wrap_fallback)
+        elif console == self._settings.Console.RAW:
+            logger.info("Redirecting raw console output.")
+            out_redir = redirect.RawRedirect(
+                src="stdout",
+                cbs=[
+                    lambda data: self._redirect_cb("stdout", data),  # type: ignore
+                    self._output_writer.write,  # type: ignore
+                ],
+            )
+            err_redir = redirect.RawRedirect(
+                src="stderr",
+                cbs=[
+                    lambda data: self._redirect_cb("stderr", data),  # type: ignore
+                    self._output_writer.write,  # type: ignore
+                ],
+            )
         elif console == self._settings.Console.WRAP:
             logger.info("Wrapping output streams.")
             out_redir = redirect.StreamWrapper(
@@ -1827,7 +1843,14 @@ class Run(object):
             self._redirect_cb = self._console_callback
 
         output_log_path = os.path.join(self.dir, filenames.OUTPUT_FNAME)
-        self._output_writer = filesystem.CRDedupedFile(open(output_log_path, "wb"))
+        if self._settings._console == self._settings.Console.RAW:
+            # raw output arrives in large batches and is archived as it is,
+            # carriage returns are only collapsed for streaming
+            self._output_writer = filesystem.WriteSerializingFile(
+                open(output_log_path, "wb")
+            )
+        else:
+            self._output_writer = filesystem.CRDedupedFile(open(output_log_path, "wb"))
         self._redirect(self._stdout_slave_fd, self._stderr_slave_fd)
 
     def _console_stop(self) -> None:
@@ -1924,6 +1947,12 @@ class Run(object):
                     return poll_exit_resp
             time.sleep(0.1)
 
+    def _flush_history(self) -> None:
+        """Make sure all uncommitted history, and its media, is published."""
+        self.history._flush()
+        if self._backend and self._backend.interface:
+            self._backend.interface.flush_history()
+
     def _on_finish(self) -> None:
         trigger.call("on_finished")
 
@@ -1934,8 +1963,7 @@ class Run(object):
         if self._run_status_checker:
             self._run_status_checker.stop()
 
-        # make sure all uncommitted history is flushed
-        self.history._flush()
+        self._flush_history()
 
         self._console_stop()  # TODO: there's a race here with jupyter console logging
         if not self._settings._silent:
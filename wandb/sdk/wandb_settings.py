@@ -206,6 +206,7 @@ class SettingsConsole(enum.Enum):
     OFF = 0
     WRAP = 1
     REDIRECT = 2
+    RAW = 3
 
 
 class Settings(object):
@@ -405,6 +406,16 @@ class Settings(object):
         summary_warnings: int = None,
         _internal_queue_timeout: float = 2,
         _internal_check_process: float = 8,
+        _sync_commit_bytes: int = 1024 * 1024,
+        _sync_fsync_seconds: float = 5,
+        _sync_fsync_bytes: int = 16 * 1024 * 1024,
+        _file_stream_compression: str = None,
+        _sender_queue_max_bytes: int = 128 * 1024 * 1024,
+        _sender_queue_policy: str = "spill",
+        _writer_queue_max_bytes: int = 128 * 1024 * 1024,
+        _writer_queue_policy: str = "block",
+        _file_stream_queue_max_bytes: int = 64 * 1024 * 1024,
+        _file_stream_queue_policy: str = "block",
         _disable_meta: bool = None,
         _disable_stats: bool = None,
         _jupyter_path: str = None,
@@ -509,6 +520,7 @@ class Settings(object):
             off=SettingsConsole.OFF,
             wrap=SettingsConsole.WRAP,
             redirect=SettingsConsole.REDIRECT,
+            raw=SettingsConsole.RAW,
         )
         console: str = self.console
         if console == "auto":
@@ -640,7 +652,7 @@ class Settings(object):
 
     def _validate_console(self, value: str) -> Optional[str]:
         # choices = {"auto", "redirect", "off", "file", "iowrap", "notebook"}
-        choices = {"auto", "redirect", "off", "wrap"}
+        choices = {"auto", "redirect", "off", "wrap", "raw"}
         if value in choices:
             return None
         return _error_choices(value, choices)
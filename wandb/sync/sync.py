@@ -244,7 +244,7 @@ class SyncThread(threading.Thread):
                 self._send_tensorboard(tb_root, tb_logdirs, sm)
                 continue
 
-            ds = datastore.DataStore()
+            ds = datastore.DataStoreReader()
             try:
                 ds.open_for_scan(sync_item)
             except AssertionError as e:
@@ -286,6 +286,7 @@ class SyncThread(threading.Thread):
                         sys.stdout.flush()
                         shown = True
             sm.finish()
+            ds.close()
             # Only mark synced if the run actually finished
             if self._mark_synced and not self._view and finished:
                 synced_file = "{}{}".format(sync_item, SYNCED_SUFFIX)
@@ -67,6 +67,24 @@ def log_track_update(log_track):
     return True
 
 
+# Elements reduced at once when computing histograms of a batch of tensors
+_STATS_BATCH_NUMEL = 1 << 22
+
+
+class _TensorBatch(object):
+    """Tensors held until one has been added under each of `names`
+    """
+
+    def __init__(self):
+        self.names = set()
+        self.tensors = {}
+
+    def pop(self):
+        tensors = self.tensors
+        self.tensors = {}
+        return tensors
+
+
 class TorchHistory(object):
     """History methods specific to PyTorch
     """
@@ -79,6 +97,7 @@ class TorchHistory(object):
         self._num_bins = 64
         self._is_cuda_histc_supported = None
         self._jupyter_run = None
+        self._gradient_batches = []
         self.hook_torch = TorchGraph.hook_torch
 
     def add_log_hooks_to_pytorch_module(
@@ -110,13 +129,15 @@ class TorchHistory(object):
             def parameter_log_hook(module, input_, output, log_track):
                 if not log_track_update(log_track):
                     return
+                tensors = {}
                 for name, parameter in module.named_parameters():
                     # for pytorch 0.3 Variables
                     if isinstance(parameter, torch.autograd.Variable):
                         data = parameter.data
                     else:
                         data = parameter
-                    self.log_tensor_stats(data.cpu(), "parameters/" + prefix + name)
+                    tensors["parameters/" + prefix + name] = data
+                self.log_tensors_stats(tensors)
 
             log_track_params = log_track_init(log_freq)
             hook = module.register_forward_hook(
@@ -128,12 +149,15 @@ class TorchHistory(object):
             module._wandb_hook_names.append("parameters/" + prefix)
 
         if log_gradients:
+            batch = _TensorBatch()
+            self._gradient_batches.append(batch)
             for name, parameter in module.named_parameters():
                 if parameter.requires_grad:
                     log_track_grad = log_track_init(log_freq)
                     module._wandb_hook_names.append("gradients/" + prefix + name)
+                    batch.names.add("gradients/" + prefix + name)
                     self._hook_variable_gradient_stats(
-                        parameter, "gradients/" + prefix + name, log_track_grad
+                        parameter, "gradients/" + prefix + name, log_track_grad, batch
                     )
 
     def log_tensor_stats(self, tensor, name):
@@ -154,6 +178,143 @@ class TorchHistory(object):
             raise TypeError(
                 "Expected Tensor, not {}.{}".format(cls.__module__, cls.__name__)
             )
+        history = self._get_history()
+        if history is None or not history.compute:
+            return
+        histogram = self._tensor_histogram(tensor)
+        if histogram is not None:
+            history._row_update({name: histogram})
+
+    def log_tensors_stats(self, tensors):
+        """Add distribution statistics on the elements of several tensors to the current
+        History entry, in a single update
+
+        `tensors` maps names to tensors. Dense floating point tensors are reduced on
+        their own device a batch at a time, only the bin counts and ranges are copied
+        to host memory.
+        """
+        history = self._get_history()
+        if history is None or not history.compute:
+            return
+
+        row = {}
+        groups = {}
+        for name, tensor in tensors.items():
+            if (
+                not hasattr(tensor, "detach")
+                or tensor.is_sparse
+                or not tensor.is_floating_point()
+            ):
+                histogram = self._tensor_histogram(tensor)
+                if histogram is not None:
+                    row[name] = histogram
+                continue
+            flat = tensor.detach().reshape(-1)
+            # half precision summary ops are not supported everywhere
+            if flat.element_size() < 4:
+                flat = flat.float()
+            if flat.numel():
+                groups.setdefault((flat.device, flat.dtype), []).append((name, flat))
+
+        for group in groups.values():
+            batch, numel = [], 0
+            for name, flat in group:
+                if batch and numel + flat.numel() > _STATS_BATCH_NUMEL:
+                    row.update(self._batch_histograms(batch))
+                    batch, numel = [], 0
+                batch.append((name, flat))
+                numel += flat.numel()
+            row.update(self._batch_histograms(batch))
+
+        if row:
+            history._row_update(row)
+
+    def _batch_histograms(self, batch):
+        """Histograms of a list of (name, flat tensor) sharing a device and dtype
+
+        Instead of a min, max and histc per tensor, each synchronizing with the device,
+        the whole batch is reduced with a fixed number of tensor operations: segmented
+        reductions give the min and max of every tensor, and one bincount counts the
+        bins of all tensors, offset by their position in the batch.
+        """
+        num_bins = self._num_bins
+        lengths = [flat.numel() for _, flat in batch]
+        data = torch.cat([flat for _, flat in batch])
+        finite = torch.isfinite(data)
+
+        # Leave nans and infs out, there's no good way to represent them in histograms.
+        inf = data.new_tensor(float("inf"))
+        for_min = torch.where(finite, data, inf)
+        for_max = torch.where(finite, data, -inf)
+        if len(batch) > 1:
+            segment = torch.repeat_interleave(
+                torch.arange(len(batch), device=data.device),
+                torch.tensor(lengths, device=data.device),
+            )
+            mins, maxs = self._segment_min_max(for_min, for_max, segment, lengths)
+        else:
+            mins, maxs = for_min.min().reshape(1), for_max.max().reshape(1)
+        # like histc, widen an empty range by one on each side
+        same = mins == maxs
+        low = torch.where(same, mins - 1, mins)
+        scale = num_bins / (torch.where(same, maxs + 1, maxs) - low)
+
+        if len(batch) > 1:
+            low, scale = low[segment], scale[segment]
+        index = ((torch.where(finite, data, low) - low) * scale).long()
+        index = index.clamp_(0, num_bins - 1)
+        if len(batch) > 1:
+            index += segment * num_bins
+        counts = torch.bincount(
+            index, weights=finite.to(data.dtype), minlength=len(batch) * num_bins
+        )
+
+        stats = torch.cat([mins, maxs, counts.to(data.dtype)]).cpu()
+        mins = stats[: len(batch)].tolist()
+        maxs = stats[len(batch) : 2 * len(batch)].tolist()
+        counts = stats[2 * len(batch) :].reshape(len(batch), num_bins)
+        histograms = {}
+        for i, (name, _) in enumerate(batch):
+            # Often the whole tensor is nan or inf. Just don't log it in that case.
+            if mins[i] > maxs[i]:
+                continue
+            bins = torch.linspace(mins[i], maxs[i], steps=num_bins + 1)
+            histograms[name] = wandb.Histogram(
+                np_histogram=(counts[i].tolist(), bins.tolist())
+            )
+        return histograms
+
+    def _segment_min_max(self, for_min, for_max, segment, lengths):
+        """Min of for_min and max of for_max over each run of equal `segment` ids,
+        `lengths` long, with scatter_reduce where torch has it (1.12+), or else with
+        a padded 2d tensor reduced along its rows
+        """
+        num = len(lengths)
+        try:
+            mins = for_min.new_empty(num).scatter_reduce(
+                0, segment, for_min, "amin", include_self=False
+            )
+            maxs = for_max.new_empty(num).scatter_reduce(
+                0, segment, for_max, "amax", include_self=False
+            )
+            return mins, maxs
+        except (AttributeError, TypeError, RuntimeError):
+            pass
+
+        starts = [0] * num
+        for i in range(1, num):
+            starts[i] = starts[i - 1] + lengths[i - 1]
+        column = torch.arange(for_min.numel(), device=for_min.device)
+        column -= torch.tensor(starts, device=for_min.device)[segment]
+        padded = for_min.new_full((num, max(lengths)), float("inf"))
+        padded[segment, column] = for_min
+        mins = padded.min(dim=1)[0]
+        padded.fill_(float("-inf"))
+        padded[segment, column] = for_max
+        maxs = padded.max(dim=1)[0]
+        return mins, maxs
+
+    def _get_history(self):
         history = self._history()
 
         # recover history from run if using jupyter
@@ -162,9 +323,12 @@ class TorchHistory(object):
             if jupyter_run:
                 history = jupyter_run.history
 
-        if history is None or not history.compute:
-            return
+        return history
 
+    def _tensor_histogram(self, tensor):
+        """Histogram of a tensor's elements, computed with histc, or None if none of
+        them are finite
+        """
         # HalfTensors on cpu do not support view(), upconvert to 32bit
         if isinstance(tensor, torch.HalfTensor):
             tensor = tensor.clone().type(torch.FloatTensor).detach()
@@ -187,8 +351,7 @@ class TorchHistory(object):
         # For pytorch 0.3 we use unoptimized numpy histograms (detach is new in 0.4)
         if not hasattr(flat, "detach"):
             tensor = flat.cpu().clone().numpy()
-            history._row_update({name: wandb.Histogram(tensor)})
-            return
+            return wandb.Histogram(tensor)
 
         if flat.is_cuda:
             # TODO(jhr): see if pytorch will accept something upstream to check cuda support for ops
@@ -221,7 +384,7 @@ class TorchHistory(object):
         flat = flat[~torch.isinf(flat)]
         if flat.shape == torch.Size([0]):
             # Often the whole tensor is nan or inf. Just don't log it in that case.
-            return
+            return None
         tmin = flat.min().item()
         tmax = flat.max().item()
         if sparse_zeros:
@@ -257,13 +420,14 @@ class TorchHistory(object):
             tensor = torch.Tensor(tensor_np)
             bins = torch.Tensor(bins_np)
 
-        history._row_update(
-            {name: wandb.Histogram(np_histogram=(tensor.tolist(), bins.tolist()))}
-        )
+        return wandb.Histogram(np_histogram=(tensor.tolist(), bins.tolist()))
 
-    def _hook_variable_gradient_stats(self, var, name, log_track):
+    def _hook_variable_gradient_stats(self, var, name, log_track, batch=None):
         """Logs a Variable's gradient's distribution statistics next time backward()
         is called on it.
+
+        With a `batch`, the gradient is held in it and the batch is logged once the
+        gradients of all of its names have arrived.
         """
         if not isinstance(var, torch.autograd.Variable):
             cls = type(var)
@@ -280,20 +444,38 @@ class TorchHistory(object):
         def _callback(grad, log_track):
             if not log_track_update(log_track):
                 return
-            self.log_tensor_stats(grad.data, name)
+            if batch is None:
+                self.log_tensor_stats(grad.data, name)
+                return
+            batch.tensors[name] = grad.data
+            if len(batch.tensors) == len(batch.names):
+                self.log_tensors_stats(batch.pop())
 
         handle = var.register_hook(lambda grad: _callback(grad, log_track))
         self._hook_handles[name] = handle
         return handle
 
+    def _flush_gradients(self):
+        """Log the gradients still held in batches, eg. of parameters that were not
+        used in the last backward pass.
+        """
+        for batch in self._gradient_batches:
+            if batch.tensors:
+                self.log_tensors_stats(batch.pop())
+
     def unhook_all(self):
         for handle in self._hook_handles.values():
             handle.remove()
-        self._hook_handles = []
+        self._hook_handles = {}
+        self._gradient_batches = []
 
     def unhook(self, name):
         handle = self._hook_handles.pop(name)
         handle.remove()
+        for batch in self._gradient_batches:
+            batch.names.discard(name)
+            batch.tensors.pop(name, None)
+        self._gradient_batches = [b for b in self._gradient_batches if b.names]
 
     def _torch_hook_handle_is_valid(self, handle):
         d = handle.hooks_dict_ref()